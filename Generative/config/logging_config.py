@@ -0,0 +1,126 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+from config.settings import settings
+from services.metrics import log_records_dropped
+from services.tracing import RequestContextFilter
+
+# Pass as extra= on high-frequency success messages so they are sampled
+SAMPLED: Dict[str, Any] = {"sample": True}
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sample"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, extra= fields and any traceback"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every 1/rate of the records marked with extra=SAMPLED, per logger and
+    message template; other records always pass. Kept records carry sample_rate so
+    counts can be scaled back up.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._seen: Dict[tuple, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sample", False) or record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        if not self.every:
+            return False
+        key = (record.name, record.msg)
+        seen = self._seen.get(key, 0)
+        self._seen[key] = seen + 1
+        if seen % self.every:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks the caller: records go onto a bounded queue and are
+    dropped (and counted) when the writer thread falls behind.
+    """
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and traceback now, but keep extra= fields for the JSON formatter
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """StreamHandler bound to whatever sys.stdout is when a record is written"""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+_listener: Optional[QueueListener] = None
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    Send every log record through a background queue to stdout, as JSON lines
+    (LOG_FORMAT=json) or plain text. Safe to call more than once.
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel((level or settings.LOG_LEVEL).upper())
+    if _listener is not None:
+        return
+
+    output = _StdoutHandler()
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    handler = NonBlockingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    handler.addFilter(SamplingFilter(settings.LOG_SUCCESS_SAMPLE_RATE))
+    handler.addFilter(RequestContextFilter())
+    root.addHandler(handler)
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
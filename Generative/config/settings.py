@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import List, Dict
 
 class Settings:
     """Application settings and configuration"""
@@ -35,6 +35,157 @@ class Settings:
     # AI Configuration
     AI_MODEL_NAME: str = "gemini-1.0-pro"
     
+    # AI provider HTTP connection pool (one long-lived client per provider)
+    AI_HTTP_MAX_CONNECTIONS: int = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "100"))
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("AI_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    AI_HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY", "30"))
+    
+    # Hedged provider requests - fire the next provider if the current one is slow
+    AI_HEDGING_ENABLED: bool = os.getenv("AI_HEDGING_ENABLED", "False").lower() == "true"
+    AI_HEDGE_DELAY_SECONDS: float = float(os.getenv("AI_HEDGE_DELAY_SECONDS", "3"))
+    AI_CHAT_HEDGE_DELAY_SECONDS: float = float(os.getenv("AI_CHAT_HEDGE_DELAY_SECONDS", "0"))
+    
+    # Per-provider circuit breakers - skip a provider after repeated failures until the cool-down ends
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", "3"))
+    AI_CIRCUIT_RECOVERY_SECONDS: float = float(os.getenv("AI_CIRCUIT_RECOVERY_SECONDS", "30"))
+    
+    # Background provider health checks
+    AI_HEALTH_CHECK_INTERVAL_SECONDS: float = float(os.getenv("AI_HEALTH_CHECK_INTERVAL_SECONDS", "60"))
+    AI_HEALTH_CHECK_TIMEOUT_SECONDS: float = float(os.getenv("AI_HEALTH_CHECK_TIMEOUT_SECONDS", "5"))
+    
+    # End-to-end latency budgets per endpoint - once spent, the static fallback is returned
+    AI_DEFAULT_LATENCY_BUDGET_SECONDS: float = float(os.getenv("AI_DEFAULT_LATENCY_BUDGET_SECONDS", "20"))
+    AI_LATENCY_BUDGETS: Dict[str, float] = {
+        "chat": float(os.getenv("AI_BUDGET_CHAT_SECONDS", "8")),
+        "analyze": float(os.getenv("AI_BUDGET_ANALYZE_SECONDS", "20")),
+        "mock_test": float(os.getenv("AI_BUDGET_MOCK_TEST_SECONDS", "20")),
+        "update_skills": float(os.getenv("AI_BUDGET_UPDATE_SKILLS_SECONDS", "10")),
+        "enhance_analysis": float(os.getenv("AI_BUDGET_ENHANCE_ANALYSIS_SECONDS", "20")),
+        # Background jobs aren't held to a proxy timeout, so they get a longer budget
+        "job": float(os.getenv("AI_BUDGET_JOB_SECONDS", "120")),
+    }
+    
+    # Completion cache in front of the provider cascade (set AI_CACHE_SQLITE_PATH to persist across restarts)
+    AI_CACHE_ENABLED: bool = os.getenv("AI_CACHE_ENABLED", "True").lower() == "true"
+    AI_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_MAX_ENTRIES", "1000"))
+    AI_CACHE_MAX_BYTES: int = int(os.getenv("AI_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+    AI_CACHE_TTL_SECONDS: float = float(os.getenv("AI_CACHE_TTL_SECONDS", "86400"))
+    AI_CACHE_SQLITE_PATH: str = os.getenv("AI_CACHE_SQLITE_PATH", "")
+    # Seconds between batched writes of new completions to the cache database
+    AI_CACHE_FLUSH_SECONDS: float = float(os.getenv("AI_CACHE_FLUSH_SECONDS", "5"))
+    
+    # Adaptive provider ordering from a moving window of latency and success rate.
+    # AI_PROVIDER_ORDER (comma-separated, e.g. "groq,google_genai") pins a fixed order instead;
+    # AI_GEMINI_TRANSPORT may be "sdk", "rest" or "auto".
+    AI_ADAPTIVE_ROUTING_ENABLED: bool = os.getenv("AI_ADAPTIVE_ROUTING_ENABLED", "True").lower() == "true"
+    AI_PROVIDER_ORDER: List[str] = [name.strip() for name in os.getenv("AI_PROVIDER_ORDER", "").split(",") if name.strip()]
+    AI_ROUTING_WINDOW: int = int(os.getenv("AI_ROUTING_WINDOW", "50"))
+    AI_ROUTING_MIN_SAMPLES: int = int(os.getenv("AI_ROUTING_MIN_SAMPLES", "5"))
+    AI_GEMINI_TRANSPORT: str = os.getenv("AI_GEMINI_TRANSPORT", "auto").lower()
+    
+    # Provider endpoints; point these at tools/stub_llm_server.py to load-test without spending quota
+    GOOGLE_GENAI_BASE_URL: str = os.getenv("GOOGLE_GENAI_BASE_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+    GROQ_BASE_URL: str = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai").rstrip("/")
+    HUGGINGFACE_INFERENCE_URL: str = os.getenv("HUGGINGFACE_INFERENCE_URL", "https://api-inference.huggingface.co").rstrip("/")
+    HUGGINGFACE_HUB_URL: str = os.getenv("HUGGINGFACE_HUB_URL", "https://huggingface.co").rstrip("/")
+    
+    # Client-side rate limits per provider (requests and tokens per minute, 0 = unlimited).
+    # Defaults follow the free tiers; override with e.g. AI_RATE_LIMIT_GROQ_RPM / AI_RATE_LIMIT_GROQ_TPM.
+    # Every call reserves its prompt plus max_output_tokens up front, so a TPM limit must fit a
+    # few of those at once (groq's leaves room for about ten) or concurrent calls skip the provider.
+    AI_RATE_LIMITS: Dict[str, Dict[str, int]] = {
+        provider: {
+            "rpm": int(os.getenv(f"AI_RATE_LIMIT_{provider.upper()}_RPM", str(rpm))),
+            "tpm": int(os.getenv(f"AI_RATE_LIMIT_{provider.upper()}_TPM", str(tpm))),
+        }
+        for provider, rpm, tpm in [
+            ("google_genai", 15, 1000000),
+            ("groq", 30, 15000),
+            ("huggingface", 60, 0),
+            ("ollama", 0, 0),
+            ("openai_free", 0, 0),
+        ]
+    }
+    AI_RATE_LIMIT_MAX_WAIT_SECONDS: float = float(os.getenv("AI_RATE_LIMIT_MAX_WAIT_SECONDS", "2"))
+    AI_RATE_LIMIT_MAX_QUEUE: int = int(os.getenv("AI_RATE_LIMIT_MAX_QUEUE", "10"))
+    
+    # Retries of transient provider failures (429, 5xx, dropped connections) with capped exponential
+    # backoff and full jitter. AI_RETRY_BASE_DELAY_SECONDS / AI_RETRY_MAX_DELAY_SECONDS set the defaults;
+    # override per provider with e.g. AI_RETRY_GROQ_MAX_RETRIES or AI_RETRY_GROQ_BASE_DELAY_SECONDS.
+    AI_RETRY_POLICIES: Dict[str, Dict[str, float]] = {
+        provider: {
+            "max_retries": int(os.getenv(f"AI_RETRY_{provider.upper()}_MAX_RETRIES", str(max_retries))),
+            "base_delay": float(os.getenv(f"AI_RETRY_{provider.upper()}_BASE_DELAY_SECONDS", os.getenv("AI_RETRY_BASE_DELAY_SECONDS", "0.25"))),
+            "max_delay": float(os.getenv(f"AI_RETRY_{provider.upper()}_MAX_DELAY_SECONDS", os.getenv("AI_RETRY_MAX_DELAY_SECONDS", "4"))),
+        }
+        for provider, max_retries in [
+            ("google_genai", 2),
+            ("groq", 2),
+            ("huggingface", 1),
+            ("ollama", 1),
+            ("openai_free", 2),
+        ]
+    }
+    # A Retry-After longer than this sends the cascade to the next provider instead of waiting
+    AI_RETRY_MAX_RETRY_AFTER_SECONDS: float = float(os.getenv("AI_RETRY_MAX_RETRY_AFTER_SECONDS", "10"))
+    
+    # Daily free-tier quotas per provider (0 = no quota), tracked in a SQLite ledger that survives restarts.
+    # Providers are moved to the back once below AI_QUOTA_LOW_RATIO headroom and skipped after AI_QUOTA_STOP_RATIO is used.
+    AI_DAILY_QUOTAS: Dict[str, Dict[str, int]] = {
+        provider: {
+            "requests": int(os.getenv(f"AI_DAILY_QUOTA_{provider.upper()}_REQUESTS", str(requests))),
+            "tokens": int(os.getenv(f"AI_DAILY_QUOTA_{provider.upper()}_TOKENS", str(tokens))),
+        }
+        for provider, requests, tokens in [
+            ("google_genai", 1500, 0),
+            ("groq", 14400, 500000),
+            ("huggingface", 1000, 0),
+            ("ollama", 0, 0),
+            ("openai_free", 0, 0),
+        ]
+    }
+    AI_QUOTA_DB_PATH: str = os.getenv("AI_QUOTA_DB_PATH", "ai_quota.db")
+    AI_QUOTA_STOP_RATIO: float = float(os.getenv("AI_QUOTA_STOP_RATIO", "0.98"))
+    AI_QUOTA_LOW_RATIO: float = float(os.getenv("AI_QUOTA_LOW_RATIO", "0.2"))
+    AI_QUOTA_RESET_UTC_OFFSET_HOURS: float = float(os.getenv("AI_QUOTA_RESET_UTC_OFFSET_HOURS", "0"))
+    # Seconds between batched writes of usage to the ledger database
+    AI_QUOTA_FLUSH_SECONDS: float = float(os.getenv("AI_QUOTA_FLUSH_SECONDS", "5"))
+    
+    # Batch analysis (/analyze/batch)
+    ANALYZE_BATCH_MAX_ITEMS: int = int(os.getenv("ANALYZE_BATCH_MAX_ITEMS", "1000"))
+    ANALYZE_BATCH_CONCURRENCY: int = int(os.getenv("ANALYZE_BATCH_CONCURRENCY", "8"))
+    
+    # Ask providers that support it for JSON matching the response schema. Only the providers in
+    # AI_STRUCTURED_OUTPUT_PROVIDERS (comma-separated) are asked: OPENAI_FREE_API_URL can be any
+    # OpenAI-compatible server and older Ollama builds reject `format`, so those two are opt-in.
+    AI_STRUCTURED_OUTPUT_ENABLED: bool = os.getenv("AI_STRUCTURED_OUTPUT_ENABLED", "true").lower() == "true"
+    AI_STRUCTURED_OUTPUT_PROVIDERS: List[str] = [
+        name.strip() for name in os.getenv("AI_STRUCTURED_OUTPUT_PROVIDERS", "google_genai,groq").split(",") if name.strip()
+    ]
+    
+    # Background jobs (/jobs); set JOB_QUEUE_DB_PATH to "" to keep the queue in memory
+    JOB_QUEUE_DB_PATH: str = os.getenv("JOB_QUEUE_DB_PATH", "jobs.db")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_RETENTION_HOURS: float = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+    # Runs a job gets before one that keeps crashing or hanging the worker is marked failed
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    
+    # Per-request phase timings in a Server-Timing header and a JSON log line
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    SERVER_TIMING_LOG_ENABLED: bool = os.getenv("SERVER_TIMING_LOG_ENABLED", "true").lower() == "true"
+    
+    # Request tracing, exported as OTLP/JSON lines to a file and/or an OTLP/HTTP collector
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "student-compass-api")
+    TRACING_EXPORT_PATH: str = os.getenv("TRACING_EXPORT_PATH", "traces/traces.jsonl")
+    TRACING_EXPORT_ENDPOINT: str = os.getenv("TRACING_EXPORT_ENDPOINT", "")  # e.g. http://localhost:4318/v1/traces
+    TRACING_QUEUE_SIZE: int = int(os.getenv("TRACING_QUEUE_SIZE", "1000"))
+    # Hosts that outbound AI calls send traceparent and X-Request-ID to (comma-separated); keep
+    # this to services we run ourselves, never third-party APIs
+    TRACING_PROPAGATE_HOSTS: List[str] = [
+        host.strip() for host in os.getenv("TRACING_PROPAGATE_HOSTS", "localhost,127.0.0.1").split(",") if host.strip()
+    ]
+    
     # Authentication Configuration
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
     ALGORITHM: str = "HS256"
@@ -42,6 +193,11 @@ class Settings:
     
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json").lower()  # json or text
+    # Share of high-frequency success messages (e.g. each provider success) that are logged
+    LOG_SUCCESS_SAMPLE_RATE: float = float(os.getenv("LOG_SUCCESS_SAMPLE_RATE", "0.1"))
+    # Records waiting for the log writer thread; further records are dropped, never blocking a request
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
 # Global settings instance
 settings = Settings()
\ No newline at end of file
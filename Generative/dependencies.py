@@ -3,58 +3,60 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.schemas import User
 from services.auth_service import auth_service
 from services.mock_user_service import user_service
+from services.ai_service import AIService, warm_up_ai_service, is_ai_service_ready, get_ai_service as get_shared_ai_service
+from services.server_timing import timed
+from services.tracing import span
 from typing import Optional
+import asyncio
 
 security = HTTPBearer(auto_error=False)
 
-async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Optional[User]:
-    """Get current authenticated user (optional)"""
+async def _authenticate(credentials: Optional[HTTPAuthorizationCredentials]) -> Optional[User]:
+    """User for a bearer token, or None if the token or its user is not valid"""
     if not credentials:
         return None
     
-    token_data = auth_service.verify_token(credentials.credentials)
-    if token_data is None:
-        return None
-    
-    user = await user_service.get_user_by_email(token_data.email)
-    if user is None:
-        return None
-    
-    return User(
-        id=user["id"],
-        email=user["email"],
-        full_name=user["full_name"],
-        skills=user.get("skills", ""),
-        expertise=user.get("expertise", ""),
-        created_at=user["created_at"],
-        updated_at=user["updated_at"]
-    )
+    with timed("auth"), span("get_current_user") as current:
+        token_data = auth_service.verify_token(credentials.credentials)
+        if token_data is None:
+            current.set_attribute("auth.result", "invalid_token")
+            return None
+        
+        user = await user_service.get_user_by_email(token_data.email)
+        if user is None:
+            current.set_attribute("auth.result", "unknown_user")
+            return None
+        
+        current.set_attribute("auth.result", "ok")
+        current.set_attribute("enduser.id", user["id"])
+        return User(
+            id=user["id"],
+            email=user["email"],
+            full_name=user["full_name"],
+            skills=user.get("skills", ""),
+            expertise=user.get("expertise", ""),
+            created_at=user["created_at"],
+            updated_at=user["updated_at"]
+        )
+
+async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Optional[User]:
+    """Get current authenticated user (optional)"""
+    return await _authenticate(credentials)
 
 async def get_current_user_required(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     """Get current authenticated user (required)"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    if not credentials:
-        raise credentials_exception
-    
-    token_data = auth_service.verify_token(credentials.credentials)
-    if token_data is None:
-        raise credentials_exception
-    
-    user = await user_service.get_user_by_email(token_data.email)
+    user = await _authenticate(credentials)
     if user is None:
-        raise credentials_exception
-    
-    return User(
-        id=user["id"],
-        email=user["email"],
-        full_name=user["full_name"],
-        skills=user.get("skills", ""),
-        expertise=user.get("expertise", ""),
-        created_at=user["created_at"],
-        updated_at=user["updated_at"]
-    )
\ No newline at end of file
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+async def get_ai_service() -> AIService:
+    """Get the shared AI service, warming it up off the event loop if startup has not done so yet"""
+    with timed("ai_service"):
+        if not is_ai_service_ready():
+            return await asyncio.to_thread(warm_up_ai_service)
+        return get_shared_ai_service()
@@ -1,19 +1,44 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-import os
+import asyncio
 
 # Load environment variables
 load_dotenv()
 
 from config.settings import settings
-from routes import analyze, health, mock_test, auth, chat, update_skills, ai_search
+from config.logging_config import configure_logging
+
+# Before the routes are imported, so import-time messages are formatted too
+configure_logging()
+
+from routes import analyze, health, mock_test, auth, chat, update_skills, ai_search, metrics, jobs
+from services.ai_service import warm_up_ai_service, shutdown_ai_service
+from services.job_queue import job_queue
+from services.server_timing import ServerTimingMiddleware
+from services.tracing import TracingMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up shared services before the app starts accepting traffic"""
+    # AIService construction does blocking SDK and client setup, so keep it off the event loop
+    ai_service = await asyncio.to_thread(warm_up_ai_service)
+    # Provider discovery happens in the background, never on a user request
+    ai_service.health_monitor.start()
+    # Pick up jobs left over from the last run and start draining the queue
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await ai_service.health_monitor.stop()
+    await shutdown_ai_service()
 
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
-    description=settings.API_DESCRIPTION
+    description=settings.API_DESCRIPTION,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -23,8 +48,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID"],
 )
 
+# Per-request phase timings (Server-Timing header and a JSON log line)
+app.add_middleware(ServerTimingMiddleware)
+
+# Request IDs and, with TRACING_ENABLED, a trace per request (outermost, so it covers everything)
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(health.router)
@@ -33,6 +65,8 @@ app.include_router(mock_test.router)
 app.include_router(chat.router)
 app.include_router(update_skills.router)
 app.include_router(ai_search.router)
+app.include_router(metrics.router)
+app.include_router(jobs.router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 class AnalyzeRequest(BaseModel):
@@ -49,6 +49,10 @@ class AnalyzeResponse(BaseModel):
     courses: List[Course]
     certifications: List[Certification]
 
+class AnalyzeBatchRequest(BaseModel):
+    """Request model for batch career analysis"""
+    items: List[AnalyzeRequest]
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
@@ -142,4 +146,14 @@ class UpdateSkillsResponse(BaseModel):
     """Update skills response model"""
     extracted_skills: List[SkillExtraction]
     updated_skills_list: List[str]
-    user: Optional[User] = None
\ No newline at end of file
+    user: Optional[User] = None
+
+class JobResponse(BaseModel):
+    """Background job status, with the result or error once it has finished"""
+    job_id: str
+    kind: str
+    status: str
+    created_at: str
+    updated_at: str
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
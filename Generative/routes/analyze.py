@@ -1,57 +1,183 @@
 from fastapi import APIRouter, HTTPException, Depends
-from models.schemas import AnalyzeRequest, AnalyzeResponse, CareerPath, RoadmapStep, Course, Certification, User
+from fastapi.responses import StreamingResponse
+from models.schemas import AnalyzeRequest, AnalyzeBatchRequest, AnalyzeResponse, CareerPath, RoadmapStep, Course, Certification, User
 from services.ai_service import AIService
-from dependencies import get_current_user
-from typing import Optional
+from dependencies import get_current_user, get_ai_service
+from config.settings import settings
+from services.deadline import Deadline
+from services.skill_profile import normalize_skill_profile, SkillProfile
+from services.server_timing import TimedRoute, timed
+from routes.sse import sse_event
+from typing import Optional, Dict, Any, List
+import asyncio
+import json
+import logging
 
-router = APIRouter(tags=["analyze"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["analyze"], route_class=TimedRoute)
+
+def _default_certification_url(name: str, provider: str) -> str:
+    """Search URL for a certification the AI gave no link for"""
+    return f"https://www.google.com/search?q={name.replace(' ', '+')}+certification+{provider.replace(' ', '+')}"
+
+def _build_analyze_response(analysis: Dict[str, Any]) -> AnalyzeResponse:
+    """Convert an AIService career analysis into the response model"""
+    with timed("validate"):
+        # Convert to Pydantic models
+        career_paths = [CareerPath(**path) for path in analysis["career_paths"]]
+        selected_path = CareerPath(**analysis["selected_path"])
+        roadmap = [RoadmapStep(**step) for step in analysis["roadmap"]]
+        courses = [Course(**course) for course in analysis["courses"]]
+        certifications = [Certification(**cert) for cert in analysis.get("certifications", [])]
+        
+        # Ensure all certifications have proper URLs
+        for cert in certifications:
+            if not cert.url or cert.url == "":
+                cert.url = _default_certification_url(cert.name, cert.provider)
+        
+        return AnalyzeResponse(
+            career_paths=career_paths,
+            selected_path=selected_path,
+            roadmap=roadmap,
+            courses=courses,
+            certifications=certifications
+        )
 
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_career_paths(
     request: AnalyzeRequest,
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[User] = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """
     Analyze skills and expertise to generate career paths, roadmap, and courses.
     Can be used with or without authentication.
     """
-    # Initialize AIService inside the function to ensure environment variables are loaded
-    ai_service = AIService()
+    deadline = Deadline.for_endpoint("analyze")
     
     try:
         # Use skills and expertise from request or user profile
         skills = request.skills or (current_user.skills if current_user else "")
         expertise = request.expertise or (current_user.expertise if current_user else "")
         
-        if not skills or not expertise:
+        # Canonicalise so equivalent skill lists share prompts and cached completions
+        profile = normalize_skill_profile(skills, expertise)
+        if not profile:
             raise HTTPException(
                 status_code=400, 
                 detail="Skills and expertise are required. Please provide them in the request or update your profile."
             )
         
         # Generate analysis using AI service
-        analysis = ai_service.generate_career_analysis(skills, expertise)
-        
-        # Convert to Pydantic models
-        career_paths = [CareerPath(**path) for path in analysis["career_paths"]]
-        selected_path = CareerPath(**analysis["selected_path"])
-        roadmap = [RoadmapStep(**step) for step in analysis["roadmap"]]
-        courses = [Course(**course) for course in analysis["courses"]]
-        certifications = [Certification(**cert) for cert in analysis.get("certifications", [])]
+        analysis = await ai_service.generate_career_analysis_async(profile.skills_text, profile.expertise, deadline=deadline)
         
-        # Ensure all certifications have proper URLs
-        for cert in certifications:
-            if not cert.url or cert.url == "":
-                # Provide a default search URL if no specific URL is provided
-                cert.url = f"https://www.google.com/search?q={cert.name.replace(' ', '+')}+certification+{cert.provider.replace(' ', '+')}"
+        return _build_analyze_response(analysis)
         
-        return AnalyzeResponse(
-            career_paths=career_paths,
-            selected_path=selected_path,
-            roadmap=roadmap,
-            courses=courses,
-            certifications=certifications
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing career paths: {str(e)}")
+
+@router.post("/analyze/stream")
+async def stream_career_analysis(
+    request: AnalyzeRequest,
+    current_user: Optional[User] = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """
+    Stream a career analysis as server-sent events, one "item" event per career path,
+    selected path, roadmap step, course and certification as soon as the model finishes it:
+    {"section": "career_paths", "index": 0, "item": {...}}. A final "done" event closes the stream.
+    """
+    skills = request.skills or (current_user.skills if current_user else "")
+    expertise = request.expertise or (current_user.expertise if current_user else "")
+    profile = normalize_skill_profile(skills, expertise)
+    if not profile:
+        raise HTTPException(
+            status_code=400, 
+            detail="Skills and expertise are required. Please provide them in the request or update your profile."
         )
+    
+    deadline = Deadline.for_endpoint("analyze")
+    
+    async def events():
+        try:
+            async for section, index, item in ai_service.stream_career_analysis_async(
+                profile.skills_text, profile.expertise, deadline
+            ):
+                if section == "certifications" and not item.get("url"):
+                    item = {**item, "url": _default_certification_url(item["name"], item["provider"])}
+                yield sse_event("item", {"section": section, "index": index, "item": item})
+        except Exception as e:
+            logger.warning("Analysis stream error: %s", e)
+            yield sse_event("error", {"detail": f"Error analyzing career paths: {str(e)}"})
+        yield sse_event("done", {})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/analyze/batch")
+async def analyze_career_paths_batch(
+    request: AnalyzeBatchRequest,
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """
+    Analyze many skill profiles in one call, e.g. a whole student cohort.
+    
+    Items with the same canonical profile are analyzed once. Unique profiles run
+    concurrently (up to ANALYZE_BATCH_CONCURRENCY at a time) and results stream back
+    as NDJSON, one line per item in completion order:
+    {"index": 3, "profile_key": "...", "status": "ok", "result": {...}}
+    """
+    if len(request.items) > settings.ANALYZE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch can contain at most {settings.ANALYZE_BATCH_MAX_ITEMS} items."
+        )
+    
+    # Group item indexes by canonical profile so duplicates share one analysis
+    profiles: Dict[str, SkillProfile] = {}
+    indexes: Dict[str, List[int]] = {}
+    invalid: List[int] = []
+    for index, item in enumerate(request.items):
+        profile = normalize_skill_profile(item.skills, item.expertise)
+        if not profile:
+            invalid.append(index)
+            continue
+        profiles.setdefault(profile.key, profile)
+        indexes.setdefault(profile.key, []).append(index)
+    
+    semaphore = asyncio.Semaphore(max(1, settings.ANALYZE_BATCH_CONCURRENCY))
+    
+    async def analyze(key: str):
+        profile = profiles[key]
+        async with semaphore:
+            try:
+                analysis = await ai_service.generate_career_analysis_async(
+                    profile.skills_text,
+                    profile.expertise,
+                    deadline=Deadline.for_endpoint("analyze")
+                )
+                return key, {"status": "ok", "result": _build_analyze_response(analysis).model_dump()}
+            except Exception as e:
+                return key, {"status": "error", "detail": f"Error analyzing career paths: {str(e)}"}
+    
+    async def lines():
+        for index in invalid:
+            yield json.dumps({"index": index, "status": "error", "detail": "Skills and expertise are required."}) + "\n"
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error analyzing career paths: {str(e)}")
\ No newline at end of file
+        tasks = [asyncio.create_task(analyze(key)) for key in profiles]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                key, outcome = await finished
+                for index in indexes[key]:
+                    yield json.dumps({"index": index, "profile_key": key, **outcome}) + "\n"
+        finally:
+            # Stop outstanding work if the client disconnects mid-stream; an analysis shared
+            # with another request through single-flight keeps running until that one is done
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -4,9 +4,10 @@ from models.schemas import UserCreate, UserLogin, UserUpdate, User, Token
 from services.mock_user_service import user_service
 from services.auth_service import auth_service
 from dependencies import get_current_user_required
+from services.server_timing import TimedRoute
 from config.settings import settings
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=TimedRoute)
 
 @router.post("/register", response_model=Token)
 async def register(user_data: UserCreate):
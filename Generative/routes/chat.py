@@ -1,43 +1,34 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from models.schemas import ChatMessage, ChatResponse, User
 from services.ai_service import AIService
 from services.mock_user_service import user_service
-from dependencies import get_current_user
-from typing import Optional
-import json
+from dependencies import get_current_user, get_ai_service
+from config.settings import settings
+from services.deadline import Deadline
+from services.metrics import static_fallbacks
+from services.server_timing import TimedRoute
+from routes.sse import sse_event
+from typing import Optional, Dict, Any, List, Tuple
+import asyncio
+import logging
 
-router = APIRouter(prefix="/chat", tags=["chat"])
+logger = logging.getLogger(__name__)
 
-# Move AIService initialization inside the function to ensure proper environment loading
-# ai_service = AIService()  # This line will be removed
+router = APIRouter(prefix="/chat", tags=["chat"], route_class=TimedRoute)
 
-@router.post("/", response_model=ChatResponse)
-async def chat_with_career_assistant(
-    chat_message: ChatMessage,
-    current_user: Optional[User] = Depends(get_current_user)
-):
-    """
-    Interactive career guidance chat powered by Gemini AI.
-    Provides personalized roadmap guidance based on user's current skills and goals.
-    """
-    # Initialize AIService inside the function to ensure environment variables are loaded
-    ai_service = AIService()
-    
-    try:
-        # Get user context
-        user_skills = current_user.skills if current_user else ""
-        user_expertise = current_user.expertise if current_user else "Beginner"
-        user_name = current_user.full_name if current_user else "there"
-        
-        # Create context-aware prompt for personalized career mentorship
-        career_guidance_prompt = f"""
+SKILL_MENTION_KEYWORDS = ['learned', 'learning', 'studying', 'know', 'experience', 'worked with', 'using']
+
+def _build_career_guidance_prompt(user_name: str, user_skills: str, user_expertise: str, message: str) -> str:
+    """Context-aware prompt for personalized career mentorship"""
+    return f"""
 You are "CareerMentor", an expert personal career coach and roadmap guide. You are having a one-on-one mentoring session with {user_name}.
 
 CURRENT USER PROFILE:
 - Name: {user_name}
 - Skills: {user_skills or "Just starting their journey"}
 - Experience: {user_expertise}
-- Latest Question: "{chat_message.message}"
+- Latest Question: "{message}"
 
 YOUR ROLE AS PERSONAL CAREER MENTOR:
 
@@ -76,13 +67,10 @@ I recommend starting with [specific resource] because it aligns perfectly with y
 What specific aspect of [related to their question] would you like to focus on first?"
 
 Remember: You're their dedicated career mentor who cares about their success and provides personalized guidance, not generic advice."""
-        
-        # Get AI response
-        ai_response = ai_service._generate_with_fallback_ai(career_guidance_prompt)
-        
-        if not ai_response:
-            # Enhanced personalized fallback with user context
-            ai_response = f"""Hi {user_name}! 🚀 I'm your dedicated Career Mentor, and I'm here to guide you on your unique journey.
+
+def _fallback_reply(user_name: str, user_skills: str, user_expertise: str) -> str:
+    """Enhanced personalized fallback with user context"""
+    return f"""Hi {user_name}! 🚀 I'm your dedicated Career Mentor, and I'm here to guide you on your unique journey.
             
 📋 **Your Current Profile:**
 • Skills: {user_skills or "Let's identify your strengths together!"}
@@ -112,46 +100,171 @@ For example:
 • "I'm unsure about my next career move"
             
 Let's create your personalized roadmap together! 🚪"""
+
+def _mentions_skills(message: str) -> bool:
+    """Whether a chat message looks like it describes the user's skills"""
+    return any(keyword in message.lower() for keyword in SKILL_MENTION_KEYWORDS)
+
+async def _extract_and_save_skills(
+    ai_service: AIService,
+    message: str,
+    current_user: Optional[User],
+    deadline: Deadline
+) -> Tuple[List[Dict[str, Any]], str, str]:
+    """
+    Extract skills from the message and save any new ones to the user's profile.
+    
+    Returns:
+        The extracted skills, the updated skills string and a note to append to the reply
+    """
+    user_skills = current_user.skills if current_user else ""
+    skill_extraction = await ai_service.extract_skills_from_message_async(
+        message,
+        user_skills or "",
+        deadline=deadline
+    )
+    extracted_skills = skill_extraction.get("extracted_skills", [])
+    updated_skills = skill_extraction.get("updated_skills", user_skills or "")
+    note = ""
+    
+    # Update user skills if new skills found
+    if current_user and extracted_skills:
+        try:
+            from models.schemas import UserUpdate
+            user_update = UserUpdate(skills=updated_skills)
+            await user_service.update_user(current_user.id, user_update)
+            note = f"\n\n✨ Great! I've noted that you have experience with: {', '.join([skill['skill'] for skill in extracted_skills])}. This opens up new opportunities for you!"
+        except Exception as e:
+            logger.warning("Error updating user skills: %s", e)
+    
+    return extracted_skills, updated_skills, note
+
+@router.post("/", response_model=ChatResponse)
+async def chat_with_career_assistant(
+    chat_message: ChatMessage,
+    current_user: Optional[User] = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """
+    Interactive career guidance chat powered by Gemini AI.
+    Provides personalized roadmap guidance based on user's current skills and goals.
+    """
+    deadline = Deadline.for_endpoint("chat")
+    
+    try:
+        # Get user context
+        user_skills = current_user.skills if current_user else ""
+        user_expertise = current_user.expertise if current_user else "Beginner"
+        user_name = current_user.full_name if current_user else "there"
+        
+        career_guidance_prompt = _build_career_guidance_prompt(user_name, user_skills, user_expertise, chat_message.message)
+        
+        # Get AI response - chat is interactive, so when hedging is on race providers right away
+        ai_response = await ai_service._generate_with_fallback_ai_async(
+            career_guidance_prompt,
+            hedge_delay=settings.AI_CHAT_HEDGE_DELAY_SECONDS if settings.AI_HEDGING_ENABLED else None,
+            deadline=deadline,
+            use_cache=False  # Mentoring replies are personal, so don't reuse them across users
+        )
+        
+        if not ai_response:
+            static_fallbacks.inc(kind="chat")
+            ai_response = _fallback_reply(user_name, user_skills, user_expertise)
         
         # Check if message contains skills for extraction
         extracted_skills = []
         updated_skills = user_skills or ""
         
-        if any(keyword in chat_message.message.lower() for keyword in ['learned', 'learning', 'studying', 'know', 'experience', 'worked with', 'using']):
-            skill_extraction = ai_service.extract_skills_from_message(chat_message.message, user_skills or "")
-            extracted_skills = skill_extraction.get("extracted_skills", [])
-            updated_skills = skill_extraction.get("updated_skills", user_skills or "")
-            
-            # Update user skills if new skills found
-            if current_user and extracted_skills:
-                try:
-                    from models.schemas import UserUpdate
-                    user_update = UserUpdate(skills=updated_skills)
-                    await user_service.update_user(current_user.id, user_update)
-                    ai_response += f"\n\n✨ Great! I've noted that you have experience with: {', '.join([skill['skill'] for skill in extracted_skills])}. This opens up new opportunities for you!"
-                except Exception as e:
-                    print(f"Error updating user skills: {e}")
+        if _mentions_skills(chat_message.message):
+            extracted_skills, updated_skills, note = await _extract_and_save_skills(
+                ai_service, chat_message.message, current_user, deadline
+            )
+            ai_response += note
         
         return ChatResponse(
             bot_message=ai_response,
-            extracted_skills=extracted_skills,
+            extracted_skills=[skill["skill"] for skill in extracted_skills],
             updated_skills=updated_skills,
             user=current_user
         )
         
     except Exception as e:
-        print(f"Chat error: {e}")
+        logger.exception("Chat error: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Sorry, I'm having trouble connecting right now. Please try again!"
         )
 
+@router.post("/stream")
+async def stream_chat_with_career_assistant(
+    chat_message: ChatMessage,
+    current_user: Optional[User] = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """
+    Streaming variant of the career chat using server-sent events.
+    
+    Emits "token" events ({"text": ...}) as the reply is generated, then a "skills"
+    event with the extracted and updated skills, then a final "done" event.
+    """
+    deadline = Deadline.for_endpoint("chat")
+    user_skills = current_user.skills if current_user else ""
+    user_expertise = current_user.expertise if current_user else "Beginner"
+    user_name = current_user.full_name if current_user else "there"
+    career_guidance_prompt = _build_career_guidance_prompt(user_name, user_skills, user_expertise, chat_message.message)
+    
+    async def events():
+        # Extract skills while the reply streams so the final event isn't delayed
+        skills_task = None
+        if _mentions_skills(chat_message.message):
+            skills_task = asyncio.create_task(
+                _extract_and_save_skills(ai_service, chat_message.message, current_user, deadline)
+            )
+        
+        try:
+            streamed = False
+            try:
+                async for text in ai_service.stream_with_fallback_ai_async(career_guidance_prompt, deadline=deadline):
+                    streamed = True
+                    yield sse_event("token", {"text": text})
+            except Exception as e:
+                logger.warning("Chat stream error: %s", e)
+            
+            if not streamed:
+                static_fallbacks.inc(kind="chat")
+                yield sse_event("token", {"text": _fallback_reply(user_name, user_skills, user_expertise)})
+            
+            extracted_skills, updated_skills = [], user_skills or ""
+            if skills_task is not None:
+                try:
+                    extracted_skills, updated_skills, note = await skills_task
+                    if note:
+                        yield sse_event("token", {"text": note})
+                except Exception as e:
+                    logger.warning("Chat skill extraction error: %s", e)
+            
+            yield sse_event("skills", {
+                "extracted_skills": [skill["skill"] for skill in extracted_skills],
+                "updated_skills": updated_skills
+            })
+            yield sse_event("done", {})
+        finally:
+            if skills_task is not None and not skills_task.done():
+                skills_task.cancel()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/update-skills", response_model=ChatResponse)
 async def update_skills_via_chat(
     chat_message: ChatMessage,
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[User] = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """
     Legacy endpoint - redirects to main chat endpoint
     """
-    return await chat_with_career_assistant(chat_message, current_user)
\ No newline at end of file
+    return await chat_with_career_assistant(chat_message, current_user, ai_service)
\ No newline at end of file
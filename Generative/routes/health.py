@@ -1,7 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
 from models.schemas import HealthResponse, RootResponse
+from services.ai_service import AIService, is_ai_service_ready
+from dependencies import get_ai_service
+from services.job_queue import job_queue
+from services.server_timing import TimedRoute
+import asyncio
 
-router = APIRouter(tags=["health"])
+router = APIRouter(tags=["health"], route_class=TimedRoute)
 
 @router.get("/", response_model=RootResponse)
 async def root():
@@ -12,3 +18,48 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     return HealthResponse(status="healthy", service="career-analyzer")
+
+@router.get("/health/ready", response_model=HealthResponse)
+async def readiness_check():
+    """Readiness probe - reports ready only once the shared AI service has warmed up"""
+    if not is_ai_service_ready():
+        return JSONResponse(
+            status_code=503,
+            content=HealthResponse(status="warming_up", service="career-analyzer").model_dump()
+        )
+    return HealthResponse(status="ready", service="career-analyzer")
+
+@router.get("/health/circuits")
+async def circuit_status(ai_service: AIService = Depends(get_ai_service)):
+    """Circuit breaker state (closed/open/half_open) for each AI provider"""
+    return {"providers": ai_service.get_circuit_status()}
+
+@router.get("/health/providers")
+async def provider_health(ai_service: AIService = Depends(get_ai_service)):
+    """Latest background health check result and probe latency for each AI provider"""
+    return {"providers": ai_service.health_monitor.snapshot()}
+
+@router.get("/health/cache")
+async def cache_status(ai_service: AIService = Depends(get_ai_service)):
+    """Completion cache hit/miss counters, size and request coalescing counts"""
+    return ai_service.get_cache_stats()
+
+@router.get("/health/routing")
+async def routing_status(ai_service: AIService = Depends(get_ai_service)):
+    """Adaptive provider order with the latency percentiles and success rates behind it"""
+    return ai_service.get_routing_status()
+
+@router.get("/health/rate-limits")
+async def rate_limit_status(ai_service: AIService = Depends(get_ai_service)):
+    """Client-side RPM/TPM buckets, queue depth and rejections per provider"""
+    return {"providers": ai_service.get_rate_limit_status()}
+
+@router.get("/health/quota")
+async def quota_status(ai_service: AIService = Depends(get_ai_service)):
+    """Today's requests and tokens per provider against their daily free-tier quotas"""
+    return ai_service.get_quota_status()
+
+@router.get("/health/jobs")
+async def job_status():
+    """Background job queue depth and worker count"""
+    return await asyncio.to_thread(job_queue.snapshot)
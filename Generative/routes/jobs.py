@@ -0,0 +1,96 @@
+from fastapi import APIRouter, HTTPException, Depends
+from models.schemas import AnalyzeRequest, MockTestRequest, MockTestQuestion, JobResponse, User
+from services.ai_service import get_ai_service as get_shared_ai_service
+from services.job_queue import job_queue
+from services.deadline import Deadline
+from services.skill_profile import normalize_skill_profile
+from dependencies import get_current_user
+from services.server_timing import TimedRoute
+from routes.analyze import _build_analyze_response
+from datetime import datetime
+from typing import Optional, Dict, Any
+import asyncio
+
+router = APIRouter(prefix="/jobs", tags=["jobs"], route_class=TimedRoute)
+
+async def _run_analyze_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker side of POST /jobs/analyze"""
+    analysis = await get_shared_ai_service().generate_career_analysis_async(
+        payload["skills"],
+        payload["expertise"],
+        deadline=Deadline.for_endpoint("job")
+    )
+    return _build_analyze_response(analysis).model_dump()
+
+async def _run_mock_test_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker side of POST /jobs/mock-test"""
+    test_data = await get_shared_ai_service().generate_mock_test_async(
+        skills=payload["skills"],
+        expertise=payload["expertise"],
+        topic=payload["topic"],
+        user_id=payload["user_id"],
+        deadline=Deadline.for_endpoint("job")
+    )
+    return {
+        "questions": [MockTestQuestion.model_validate(q).model_dump() for q in test_data["questions"]],
+        "user_id": payload["user_id"] or None,
+        "created_at": test_data.get("generated_at", datetime.now().isoformat())
+    }
+
+job_queue.register("analyze", _run_analyze_job)
+job_queue.register("mock_test", _run_mock_test_job)
+
+def _require_profile(skills: str, expertise: str, current_user: Optional[User]):
+    """Canonical profile from the request or the user's saved profile, or a 400"""
+    profile = normalize_skill_profile(
+        skills or (current_user.skills if current_user else ""),
+        expertise or (current_user.expertise if current_user else "")
+    )
+    if not profile:
+        raise HTTPException(
+            status_code=400,
+            detail="Skills and expertise are required. Please provide them in the request or update your profile."
+        )
+    return profile
+
+def _job_response(job: Dict[str, Any]) -> JobResponse:
+    return JobResponse(**{field: job[field] for field in JobResponse.model_fields})
+
+@router.post("/analyze", response_model=JobResponse, status_code=202)
+async def submit_analyze_job(
+    request: AnalyzeRequest,
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    """
+    Queue a career analysis and return its job id right away.
+    Poll GET /jobs/{job_id} for the result.
+    """
+    profile = _require_profile(request.skills, request.expertise, current_user)
+    job = await asyncio.to_thread(job_queue.submit, "analyze", {"skills": profile.skills_text, "expertise": profile.expertise})
+    return _job_response(job)
+
+@router.post("/mock-test", response_model=JobResponse, status_code=202)
+async def submit_mock_test_job(
+    request: MockTestRequest,
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    """
+    Queue a mock test and return its job id right away.
+    Poll GET /jobs/{job_id} for the result.
+    """
+    profile = _require_profile(request.skills, request.expertise, current_user)
+    job = await asyncio.to_thread(job_queue.submit, "mock_test", {
+        "skills": profile.skills_text,
+        "expertise": profile.expertise,
+        "topic": request.topic or "",
+        "user_id": current_user.id if current_user else ""
+    })
+    return _job_response(job)
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Job status (queued, running, succeeded or failed) and, once finished, its result"""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
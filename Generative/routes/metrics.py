@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services.metrics import metrics
+from services.server_timing import TimedRoute
+
+router = APIRouter(tags=["metrics"], route_class=TimedRoute)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """AI provider latency, outcome, size and fallback metrics in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
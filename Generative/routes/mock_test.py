@@ -2,54 +2,61 @@ from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import HTTPBearer
 from models.schemas import MockTestRequest, MockTestResponse, MockTestQuestion, User
 from services.ai_service import AIService
-from dependencies import get_current_user
+from dependencies import get_current_user, get_ai_service
+from services.deadline import Deadline
+from services.skill_profile import normalize_skill_profile
+from services.server_timing import TimedRoute, timed
 from typing import Optional
+from datetime import datetime
+import uuid
 
-router = APIRouter(prefix="/mock-test", tags=["mock-test"])
-# Move AIService initialization inside the function to ensure proper environment loading
-# ai_service = AIService()  # This line will be removed
+router = APIRouter(prefix="/mock-test", tags=["mock-test"], route_class=TimedRoute)
 security = HTTPBearer()
 
 @router.post("", response_model=MockTestResponse)
 async def generate_mock_test(
     request: MockTestRequest, 
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[User] = Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """
     Generate a mock test based on skills and expertise using Vertex AI
     and save it to Firestore. Requires authentication.
     """
-    # Initialize AIService inside the function to ensure environment variables are loaded
-    ai_service = AIService()
+    deadline = Deadline.for_endpoint("mock_test")
     
     try:
         # Use skills and expertise from request or user profile
         skills = request.skills or (current_user.skills if current_user else "")
         expertise = request.expertise or (current_user.expertise if current_user else "")
         
-        if not skills or not expertise:
+        # Canonicalise so equivalent skill lists share prompts and cached completions
+        profile = normalize_skill_profile(skills, expertise)
+        if not profile:
             raise HTTPException(
                 status_code=400, 
                 detail="Skills and expertise are required. Please provide them in the request or update your profile."
             )
         
         # Generate mock test using Vertex AI
-        test_data = ai_service.generate_mock_test(
-            skills=skills,
-            expertise=expertise,
+        test_data = await ai_service.generate_mock_test_async(
+            skills=profile.skills_text,
+            expertise=profile.expertise,
             topic=request.topic or "",
-            user_id=current_user.id if current_user else ""
+            user_id=current_user.id if current_user else "",
+            deadline=deadline
         )
         
         # Convert questions to Pydantic models
-        questions = [MockTestQuestion(**q) for q in test_data["questions"]]
-        
-        return MockTestResponse(
-            test_id=test_data["test_id"],
-            questions=questions,
-            user_id=test_data["user_id"],
-            created_at=test_data["created_at"]
-        )
+        with timed("validate"):
+            questions = [MockTestQuestion.model_validate(q) for q in test_data["questions"]]
+            
+            return MockTestResponse(
+                test_id=test_data.get("test_id") or str(uuid.uuid4()),
+                questions=questions,
+                user_id=current_user.id if current_user else None,
+                created_at=test_data.get("generated_at", datetime.now().isoformat())
+            )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating mock test: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,6 @@
+import json
+from typing import Any, Dict
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -1,20 +1,20 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from models.schemas import UpdateSkillsRequest, UpdateSkillsResponse, SkillExtraction, UserUpdate
 from services.ai_service import AIService
 from services.mock_user_service import user_service
+from dependencies import get_ai_service
+from services.deadline import Deadline
+from services.server_timing import TimedRoute
 from typing import List
 
-router = APIRouter(tags=["skills"])
-# Move AIService initialization inside the function to ensure proper environment loading
-# ai_service = AIService()  # This line will be removed
+router = APIRouter(tags=["skills"], route_class=TimedRoute)
 
 @router.post("/update-skills", response_model=UpdateSkillsResponse)
-async def update_skills(request: UpdateSkillsRequest):
+async def update_skills(request: UpdateSkillsRequest, ai_service: AIService = Depends(get_ai_service)):
     """
     Extract skills from message using Vertex AI and merge into user's Firestore document
     """
-    # Initialize AIService inside the function to ensure environment variables are loaded
-    ai_service = AIService()
+    deadline = Deadline.for_endpoint("update_skills")
     
     try:
         # Get current user
@@ -23,7 +23,11 @@ async def update_skills(request: UpdateSkillsRequest):
             raise HTTPException(status_code=404, detail="User not found")
         
         # Extract skills using Vertex AI (using the available method)
-        extraction_result = ai_service.extract_skills_from_message(request.message, user.skills if user.skills else "")
+        extraction_result = await ai_service.extract_skills_from_message_async(
+            request.message,
+            user.skills if user.skills else "",
+            deadline=deadline
+        )
         extracted_skills_data = extraction_result.get("extracted_skills", [])
         
         # Convert to Pydantic models
@@ -1,11 +1,18 @@
+import asyncio
 import json
+import logging
 import os
+import httpx
 import requests
-from typing import Dict, Any, List
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator, Set
 from datetime import datetime
 import re
 import random
 
+logger = logging.getLogger(__name__)
+
 # Handle optional imports with try/except blocks
 VERTEX_AI_AVAILABLE = False
 GOOGLE_GENAI_AVAILABLE = False
@@ -16,7 +23,7 @@ try:
     from vertexai.generative_models import GenerativeModel as GenerativeModelClass
     VERTEX_AI_AVAILABLE = True
 except ImportError:
-    print("Warning: Vertex AI not available. Using fallback AI services.")
+    logger.warning("Vertex AI not available; using fallback AI services")
     # Create dummy modules to prevent NameError
     class DummyAiplatform:
         @staticmethod
@@ -37,6 +44,9 @@ except ImportError:
                 def __init__(self):
                     self.text = ""
             return DummyResponse()
+        
+        async def generate_content_async(self, *args, **kwargs):
+            return self.generate_content(*args, **kwargs)
 
     aiplatform_module = DummyAiplatform()
     firestore_module = DummyFirestore()
@@ -45,7 +55,7 @@ try:
     import google.generativeai as genai_module
     GOOGLE_GENAI_AVAILABLE = True
 except ImportError:
-    print("Warning: Google Generative AI not available.")
+    logger.warning("Google Generative AI SDK not available")
     # Create dummy module to prevent NameError
     class DummyGenai:
         @staticmethod
@@ -61,10 +71,34 @@ except ImportError:
                     def __init__(self):
                         self.text = ""
                 return DummyResponse()
+            
+            async def generate_content_async(self, *args, **kwargs):
+                return self.generate_content(*args, **kwargs)
     
     genai_module = DummyGenai()
 
+from config.settings import settings
 from models.schemas import CareerPath, Course, RoadmapStep, MockTestQuestion
+from services.circuit_breaker import CircuitBreaker
+from services.provider_health import ProviderHealthMonitor
+from services.deadline import Deadline, within_deadline
+from services.completion_cache import CompletionCache
+from services.skill_profile import normalize_skill_profile
+from services.single_flight import SingleFlight
+from services.provider_router import ProviderRouter
+from services.rate_limiter import ProviderRateLimiter
+from services.quota_ledger import QuotaLedger
+from services.structured_output import (
+    repair_json, gemini_schema, openai_schema, parse_career_analysis, parse_mock_test_questions, CareerAnalysisStream
+)
+from services.metrics import (
+    provider_latency, provider_requests, provider_first_token, prompt_size, response_size,
+    parse_failures, static_fallbacks, cache_lookups, rate_limited, provider_retries
+)
+from services.retry_policy import RetryPolicy, OnRetry, parse_retry_after
+from services.server_timing import timed, record as record_span
+from services.tracing import SPAN_KIND_CLIENT, current_span, propagation_headers, span, start_span, traced
+from config.logging_config import SAMPLED
 
 # Currency conversion utility
 def convert_usd_to_inr(usd_range: str) -> str:
@@ -118,24 +152,67 @@ def convert_usd_to_inr(usd_range: str) -> str:
     
     return usd_range  # Return original if parsing fails
 
+class ProviderError(Exception):
+    """Raised when an AI provider answers with a non-success HTTP status"""
+    
+    def __init__(self, provider: str, status_code: int, body: str = "", retry_after: Optional[float] = None):
+        self.provider = provider
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(f"HTTP {status_code}: {body[:200]}")
+
 class AIService:
     """Service for handling AI-related operations with multiple AI provider fallbacks"""
     
+    # Order in which the fallback chain tries each provider
+    PROVIDER_ORDER = ['google_genai', 'ollama', 'huggingface', 'groq', 'openai_free']
+    
+    # Human readable provider names used in status messages
+    PROVIDER_LABELS = {
+        'google_genai': 'Google Generative AI',
+        'ollama': 'Ollama',
+        'huggingface': 'Hugging Face',
+        'groq': 'Groq',
+        'openai_free': 'OpenAI-compatible API'
+    }
+    
+    # Providers with a token streaming API (Hugging Face inference only returns whole responses)
+    STREAMING_PROVIDERS = ('google_genai', 'ollama', 'groq', 'openai_free')
+    
+    # Bump whenever a prompt template changes so completions cached for the old wording are not reused
+    PROMPT_TEMPLATE_VERSION = "1"
+    
+    # A 400 whose body matches this is the provider refusing the structured-output parameter
+    STRUCTURED_OUTPUT_REJECTION = re.compile(r"response_format|json_schema|\bformat\b", re.IGNORECASE)
+    
+    # HTTP statuses that open a provider's circuit straight away (rate limited or key rejected)
+    CIRCUIT_TRIP_STATUSES = {401, 403, 429}
+    
+    # Enhanced Gemini configuration for better responses
+    GEMINI_GENERATION_CONFIG = {
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "top_k": 40,
+        "max_output_tokens": 1000,
+    }
+    
     def __init__(self):
         """Initialize the AI service with Vertex AI as primary and fallbacks"""
         self.project_id = os.getenv("GOOGLE_CLOUD_PROJECT", "your-project-id")
         self.vertex_ai_available = VERTEX_AI_AVAILABLE
         self.model = None
         self.firestore_client = None
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self._http_clients_loop = None
         
         # Initialize Vertex AI if available
         if self.vertex_ai_available:
             try:
                 aiplatform_module.init(project=self.project_id)
                 self.model = GenerativeModelClass("gemini-1.0-pro")
-                print("✅ Vertex AI initialized successfully")
+                logger.info("Vertex AI initialized")
             except Exception as e:
-                print(f"Warning: Could not initialize Vertex AI: {e}")
+                logger.warning("Could not initialize Vertex AI: %s", e)
                 self.vertex_ai_available = False
         
         # Initialize Firestore client with error handling
@@ -143,7 +220,7 @@ class AIService:
             try:
                 self.firestore_client = firestore_module.Client(project=self.project_id)
             except Exception as e:
-                print(f"Warning: Could not initialize Firestore client: {e}")
+                logger.warning("Could not initialize Firestore client: %s", e)
                 self.firestore_client = None
         
         # Initialize fallback AI services
@@ -155,19 +232,46 @@ class AIService:
             'groq': self._init_groq()
         }
         
-        print(f"🤖 AI Service initialized. Vertex AI: {'✅' if self.vertex_ai_available else '❌'}")
+        # One circuit breaker per provider so failing services are skipped instead of timing out
+        self.circuit_breakers = {name: CircuitBreaker(name) for name in self.fallback_apis}
+        
+        # Background prober keeps provider health current (started by the app lifespan)
+        self.health_monitor = ProviderHealthMonitor(self)
+        
+        # Completion cache in front of the provider cascade
+        self.completion_cache = CompletionCache.from_settings() if settings.AI_CACHE_ENABLED else None
+        
+        # Identical in-flight generations share one provider cascade
+        self.single_flight = SingleFlight()
+        
+        # Providers that answered a structured-output request with a 400 refusing the parameter
+        self.structured_output_rejected: Set[str] = set()
+        
+        # Cascade order adapts to observed provider latency and success
+        self.provider_router = ProviderRouter(self.PROVIDER_ORDER)
+        
+        # Client-side RPM/TPM limits so bursts skip ahead instead of collecting 429s
+        self.rate_limiters = {name: ProviderRateLimiter.from_settings(name) for name in self.fallback_apis}
+        
+        # Transient failures (429, 5xx, dropped connections) are retried before moving down the cascade
+        self.retry_policies = {name: RetryPolicy.from_settings(name) for name in self.fallback_apis}
+        
+        # Daily quota usage per provider, persisted so a restart doesn't forget the day's spend
+        self.quota_ledger = QuotaLedger()
+        
         available_fallbacks = [name for name, available in self.fallback_apis.items() if available]
-        print(f"📡 Available fallback AI services: {available_fallbacks if available_fallbacks else 'None - using static responses'}")
+        logger.info(
+            "AI service initialized",
+            extra={"vertex_ai": self.vertex_ai_available, "fallback_providers": available_fallbacks}
+        )
         
         # If no AI services are available, inform user about setup options
         if not self.vertex_ai_available and not any(self.fallback_apis.values()):
-            print("\n⚠️  No AI services configured!")
-            print("To enable AI features, you can:")
-            print("1. Use Google Generative AI (Gemini): Add GOOGLE_GENAI_API_KEY to .env")
-            print("2. Use Hugging Face: Add HUGGINGFACE_API_KEY to .env")
-            print("3. Use Ollama: Install from https://ollama.com/ and run locally")
-            print("4. Use Groq: Add GROQ_API_KEY to .env")
-            print("5. Use OpenAI-compatible services: Add OPENAI_FREE_API_URL and OPENAI_FREE_API_KEY to .env")
+            logger.warning(
+                "No AI services configured; answering from static responses. To enable AI features: "
+                "add GOOGLE_GENAI_API_KEY (Gemini), HUGGINGFACE_API_KEY or GROQ_API_KEY to .env, "
+                "run Ollama locally (https://ollama.com/), or set OPENAI_FREE_API_URL and OPENAI_FREE_API_KEY"
+            )
 
     def _init_google_genai(self) -> bool:
         """Initialize Google Generative AI API (Gemini)"""
@@ -175,31 +279,32 @@ class AIService:
             # Try both the SDK and direct REST API approach
             api_key = os.getenv('GOOGLE_GENAI_API_KEY', '')
             if not api_key or api_key == 'your_google_gemini_api_key_here':
-                print("⚠️  Google Generative AI API key not found or not configured in .env file")
+                logger.warning("Google Generative AI API key not found or not configured in .env file")
                 return False
             
             # Set up for direct REST API calls
             self.google_genai_api_key = api_key
-            self.google_genai_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}"
+            self.google_genai_url = f"{settings.GOOGLE_GENAI_BASE_URL}/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}"
             
-            if GOOGLE_GENAI_AVAILABLE:
+            # The SDK always talks to Google, so a custom endpoint (e.g. the stub server) means REST only
+            if GOOGLE_GENAI_AVAILABLE and "generativelanguage.googleapis.com" in settings.GOOGLE_GENAI_BASE_URL:
                 # Also set up the SDK if available
                 genai_module.configure(api_key=api_key)
                 self.genai_model = genai_module.GenerativeModel('gemini-1.5-flash')
-                print("✅ Google Generative AI (Gemini) initialized successfully with SDK")
+                logger.info("Google Generative AI (Gemini) initialized with SDK")
             else:
-                print("✅ Google Generative AI (Gemini) initialized for direct REST API calls")
+                logger.info("Google Generative AI (Gemini) initialized for direct REST API calls")
             
             return True
         except Exception as e:
-            print(f"Warning: Could not initialize Google Generative AI: {e}")
+            logger.warning("Could not initialize Google Generative AI: %s", e)
             return False
     
     def _init_huggingface(self) -> bool:
         """Initialize Hugging Face API (free tier available)"""
         try:
             # Hugging Face provides free API access
-            self.hf_api_url = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-large"
+            self.hf_api_url = f"{settings.HUGGINGFACE_INFERENCE_URL}/models/microsoft/DialoGPT-large"
             # You can also use: facebook/blenderbot-400M-distill, microsoft/DialoGPT-medium
             self.hf_headers = {
                 "Authorization": f"Bearer {os.getenv('HUGGINGFACE_API_KEY', '')}",
@@ -207,27 +312,25 @@ class AIService:
             }
             return True
         except Exception as e:
-            print(f"Warning: Could not initialize Hugging Face API: {e}")
+            logger.warning("Could not initialize Hugging Face API: %s", e)
             return False
     
     def _init_ollama(self) -> bool:
         """Initialize Ollama (local AI models - completely free)"""
         try:
-            # Check if Ollama is running locally
-            response = requests.get("http://localhost:11434/api/tags", timeout=2)
-            if response.status_code == 200:
-                self.ollama_url = "http://localhost:11434/api/generate"
-                print("✅ Ollama detected locally")
-                return True
+            # Whether Ollama is actually running is discovered by the background health monitor,
+            # so building the service never blocks on a network probe
+            self.ollama_base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434').rstrip('/')
+            self.ollama_url = f"{self.ollama_base_url}/api/generate"
+            return os.getenv('OLLAMA_ENABLED', 'True').lower() == 'true'
         except:
-            pass
-        return False
+            return False
     
     def _init_groq(self) -> bool:
         """Initialize Groq API (fast and free)"""
         try:
             self.groq_api_key = os.getenv('GROQ_API_KEY', '')
-            self.groq_url = "https://api.groq.com/openai/v1/chat/completions"
+            self.groq_url = f"{settings.GROQ_BASE_URL}/v1/chat/completions"
             return bool(self.groq_api_key)
         except:
             return False
@@ -242,181 +345,891 @@ class AIService:
         except:
             return False
     
-    def _generate_with_fallback_ai(self, prompt: str) -> str:
-        """Try different AI services as fallbacks with enhanced Gemini integration"""
-        
-        # Try Google Generative AI first (Gemini) - Primary service
-        if self.fallback_apis['google_genai']:
-            try:
-                # Try SDK first if available
-                if hasattr(self, 'genai_model'):
-                    # Enhanced configuration for better responses
-                    generation_config = {
+    def _response_schema(self, name: str) -> Optional[str]:
+        """Structured-output schema name to request, or None when structured output is off"""
+        return name if settings.AI_STRUCTURED_OUTPUT_ENABLED else None
+    
+    def _supports_structured_output(self, provider: str) -> bool:
+        """Whether the provider is sent the structured-output parameter along with a schema"""
+        return provider in settings.AI_STRUCTURED_OUTPUT_PROVIDERS and provider not in self.structured_output_rejected
+    
+    def _rejected_structured_output(self, provider: str, schema: Optional[str], response) -> bool:
+        """
+        Whether a failed call was the provider refusing the structured-output parameter. If so,
+        stop sending it that parameter so the call can be retried as plain text.
+        """
+        if not schema or response.status_code != 400 or not self._supports_structured_output(provider):
+            return False
+        if not self.STRUCTURED_OUTPUT_REJECTION.search(response.text or ""):
+            return False
+        self.structured_output_rejected.add(provider)
+        logger.warning(
+            "%s rejected the structured-output parameter; asking it for plain text from now on",
+            self.PROVIDER_LABELS[provider], extra={"provider": provider}
+        )
+        return True
+    
+    def _generation_config(self, schema: Optional[str] = None) -> Dict[str, Any]:
+        """Gemini SDK generation config, constrained to a JSON schema when one is given"""
+        if not schema:
+            return self.GEMINI_GENERATION_CONFIG
+        return {
+            **self.GEMINI_GENERATION_CONFIG,
+            "response_mime_type": "application/json",
+            "response_schema": gemini_schema(schema)
+        }
+    
+    def _build_provider_request(self, provider: str, prompt: str, schema: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the REST request (url, headers, json payload, timeout) for a provider.
+        With a schema name, providers that support it are asked for JSON matching that schema.
+        """
+        request = self._build_plain_provider_request(provider, prompt)
+        if not schema or not self._supports_structured_output(provider):
+            return request
+        payload = request["json"]
+        if provider == 'google_genai':
+            payload["generationConfig"].update({
+                "responseMimeType": "application/json",
+                "responseSchema": gemini_schema(schema)
+            })
+        elif provider == 'openai_free':
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": schema, "schema": openai_schema(schema)}
+            }
+        elif provider == 'groq':
+            # Groq's JSON mode guarantees valid JSON but takes no schema
+            payload["response_format"] = {"type": "json_object"}
+        elif provider == 'ollama':
+            payload["format"] = "json"
+        return request
+    
+    def _build_plain_provider_request(self, provider: str, prompt: str) -> Dict[str, Any]:
+        """Free-text generation request for a provider"""
+        if provider == 'google_genai':
+            return {
+                "url": self.google_genai_url,
+                "headers": {"Content-Type": "application/json"},
+                "json": {
+                    "contents": [{
+                        "parts": [{
+                            "text": prompt
+                        }]
+                    }],
+                    "generationConfig": {
                         "temperature": 0.7,
-                        "top_p": 0.9,
-                        "top_k": 40,
-                        "max_output_tokens": 1000,
-                    }
-                    
-                    response = self.genai_model.generate_content(
-                        prompt,
-                        generation_config=generation_config
-                    )
-                    if response.text:
-                        print("✅ Generated personalized content using Google Generative AI (Gemini SDK)")
-                        return response.text
-                
-                # Fallback to direct REST API call with enhanced configuration
-                elif hasattr(self, 'google_genai_url'):
-                    payload = {
-                        "contents": [{
-                            "parts": [{
-                                "text": prompt
-                            }]
-                        }],
-                        "generationConfig": {
-                            "temperature": 0.7,
-                            "topP": 0.9,
-                            "topK": 40,
-                            "maxOutputTokens": 1000,
-                            "stopSequences": []
+                        "topP": 0.9,
+                        "topK": 40,
+                        "maxOutputTokens": 1000,
+                        "stopSequences": []
+                    },
+                    "safetySettings": [
+                        {
+                            "category": "HARM_CATEGORY_HARASSMENT",
+                            "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+                        },
+                        {
+                            "category": "HARM_CATEGORY_HATE_SPEECH", 
+                            "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+                        },
+                        {
+                            "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+                            "threshold": "BLOCK_MEDIUM_AND_ABOVE"
                         },
-                        "safetySettings": [
-                            {
-                                "category": "HARM_CATEGORY_HARASSMENT",
-                                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                            },
-                            {
-                                "category": "HARM_CATEGORY_HATE_SPEECH", 
-                                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                            },
-                            {
-                                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                            },
-                            {
-                                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                            }
-                        ]
+                        {
+                            "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+                            "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+                        }
+                    ]
+                },
+                "timeout": 45  # Increased timeout for better responses
+            }
+        
+        if provider == 'ollama':
+            return {
+                "url": self.ollama_url,
+                "headers": {},
+                "json": {
+                    "model": "llama2",  # or "mistral", "codellama", etc.
+                    "prompt": prompt,
+                    "stream": False
+                },
+                "timeout": 30
+            }
+        
+        if provider == 'huggingface':
+            # Use a better model for generation
+            return {
+                "url": self.hf_api_url,
+                "headers": self.hf_headers,
+                "json": {
+                    "inputs": prompt,
+                    "parameters": {
+                        "max_length": 1000,
+                        "temperature": 0.7,
+                        "do_sample": True
                     }
-                    response = requests.post(
-                        self.google_genai_url,
-                        json=payload,
-                        headers={"Content-Type": "application/json"},
-                        timeout=45  # Increased timeout for better responses
+                },
+                "timeout": 30
+            }
+        
+        if provider == 'groq':
+            return {
+                "url": self.groq_url,
+                "headers": {
+                    "Authorization": f"Bearer {self.groq_api_key}",
+                    "Content-Type": "application/json"
+                },
+                "json": {
+                    "model": "mixtral-8x7b-32768",
+                    "messages": [{"role": "user", "content": prompt}],
+                    "max_tokens": 1000,
+                    "temperature": 0.7
+                },
+                "timeout": 30
+            }
+        
+        if provider == 'openai_free':
+            return {
+                "url": f"{self.openai_free_url}/v1/chat/completions",
+                "headers": {
+                    "Authorization": f"Bearer {self.openai_free_key}",
+                    "Content-Type": "application/json"
+                },
+                "json": {
+                    "model": "gpt-3.5-turbo",  # or whatever model the service provides
+                    "messages": [{"role": "user", "content": prompt}],
+                    "max_tokens": 1000,
+                    "temperature": 0.7
+                },
+                "timeout": 30
+            }
+        
+        raise ValueError(f"Unknown AI provider: {provider}")
+    
+    def _build_health_check_request(self, provider: str) -> Dict[str, Any]:
+        """Build a cheap request (model listing / whoami) used to probe a provider's health"""
+        if provider == 'google_genai':
+            return {
+                "url": f"{settings.GOOGLE_GENAI_BASE_URL}/v1beta/models?pageSize=1&key={self.google_genai_api_key}",
+                "headers": {}
+            }
+        
+        if provider == 'ollama':
+            return {"url": f"{self.ollama_base_url}/api/tags", "headers": {}}
+        
+        if provider == 'huggingface':
+            return {"url": f"{settings.HUGGINGFACE_HUB_URL}/api/whoami-v2", "headers": self.hf_headers}
+        
+        if provider == 'groq':
+            return {
+                "url": f"{settings.GROQ_BASE_URL}/v1/models",
+                "headers": {"Authorization": f"Bearer {self.groq_api_key}"}
+            }
+        
+        if provider == 'openai_free':
+            return {
+                "url": f"{self.openai_free_url}/v1/models",
+                "headers": {"Authorization": f"Bearer {self.openai_free_key}"}
+            }
+        
+        raise ValueError(f"Unknown AI provider: {provider}")
+    
+    def _parse_provider_response(self, provider: str, result: Any) -> str:
+        """Pull the generated text out of a provider's JSON response"""
+        if provider == 'google_genai':
+            if 'candidates' in result and result['candidates']:
+                return result['candidates'][0]['content']['parts'][0]['text']
+        elif provider == 'ollama':
+            if 'response' in result:
+                return result['response']
+        elif provider == 'huggingface':
+            if isinstance(result, list) and len(result) > 0:
+                return result[0].get('generated_text', '')
+        elif provider in ('groq', 'openai_free'):
+            if 'choices' in result and len(result['choices']) > 0:
+                return result['choices'][0]['message']['content']
+        return ""
+    
+    def _build_stream_request(self, provider: str, prompt: str, schema: Optional[str] = None) -> Dict[str, Any]:
+        """Build the streaming variant of a provider's generation request"""
+        request = self._build_provider_request(provider, prompt, schema)
+        if provider == 'google_genai':
+            # Server-sent events from streamGenerateContent
+            request["url"] = request["url"].replace(":generateContent?", ":streamGenerateContent?alt=sse&")
+        else:
+            request["json"] = {**request["json"], "stream": True}
+        return request
+    
+    def _parse_stream_chunk(self, provider: str, line: str) -> str:
+        """Pull the text delta out of one line of a provider's streaming response"""
+        line = line.strip()
+        if provider != 'ollama':
+            # Gemini and OpenAI-compatible APIs stream SSE "data:" lines
+            if not line.startswith("data:"):
+                return ""
+            line = line[len("data:"):].strip()
+        if not line or line == "[DONE]":
+            return ""
+        try:
+            chunk = json.loads(line)
+        except json.JSONDecodeError:
+            return ""
+        
+        if provider == 'google_genai':
+            candidates = chunk.get('candidates') or [{}]
+            parts = candidates[0].get('content', {}).get('parts', [])
+            return "".join(part.get('text', '') for part in parts)
+        if provider == 'ollama':
+            return chunk.get('response', '')
+        choices = chunk.get('choices') or [{}]
+        return choices[0].get('delta', {}).get('content') or ""
+    
+    def _gemini_transport(self, provider: str) -> Optional[str]:
+        """For Gemini with the SDK available, whether this call goes through the SDK or REST"""
+        if provider != 'google_genai' or not hasattr(self, 'genai_model'):
+            return None
+        return self.provider_router.choose_transport()
+    
+    def _provider_order(self) -> List[str]:
+        """
+        Cascade order: pinned by config, otherwise ranked by recent latency and success,
+        then adjusted for daily quota (providers at their cap are left out).
+        """
+        return self.quota_ledger.rank(self.provider_router.order(self.PROVIDER_ORDER))
+    
+    def _circuit_allows(self, provider: str) -> bool:
+        """Check the provider's circuit breaker, skipping it while the circuit is open"""
+        if self.circuit_breakers[provider].allow_request():
+            return True
+        logger.info("Skipping %s (circuit open)", self.PROVIDER_LABELS[provider], extra={"provider": provider})
+        return False
+    
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Rough token count (about four characters per token)"""
+        return len(text) // 4 + 1
+    
+    def _tokens_to_reserve(self, prompt: str) -> int:
+        """Tokens a call may use: the prompt plus the maximum output"""
+        return self._estimate_tokens(prompt) + self.GEMINI_GENERATION_CONFIG["max_output_tokens"]
+    
+    def _skip_rate_limited(self, provider: str) -> None:
+        """Give back the circuit slot of a call the rate limiter turned away"""
+        self.circuit_breakers[provider].release()
+        rate_limited.inc(provider=provider)
+        logger.info("Skipping %s (rate limit reached)", self.PROVIDER_LABELS[provider], extra={"provider": provider})
+    
+    def _record_usage(self, provider: str, prompt: str, reserved: int, text: str = "") -> None:
+        """Settle the rate limiter's token estimate and add the call to the daily quota ledger"""
+        used = self._estimate_tokens(prompt) + (self._estimate_tokens(text) if text else 0)
+        self.rate_limiters[provider].settle(reserved, used)
+        self.quota_ledger.record(provider, requests=1, tokens=used)
+    
+    def _retry_callback(self, provider: str, prompt: str) -> OnRetry:
+        """Count and report a retry; each one is another request against the provider's daily quota"""
+        def on_retry(attempt: int, error: BaseException, delay: float) -> None:
+            reason = RetryPolicy.reason(error)
+            provider_retries.inc(provider=provider, reason=reason)
+            self.quota_ledger.record(provider, requests=1, tokens=self._estimate_tokens(prompt))
+            logger.info(
+                "Retrying %s in %.2fs (retry %d, %s)", self.PROVIDER_LABELS[provider], delay, attempt, reason,
+                extra={"provider": provider}
+            )
+        return on_retry
+    
+    def _is_provider_usable(self, provider: str) -> bool:
+        """Configured and passing its background health checks"""
+        return bool(self.fallback_apis.get(provider)) and self.health_monitor.is_healthy(provider)
+    
+    def _record_provider_failure(self, provider: str, error: Exception) -> None:
+        """Report a failed provider call and feed it to the provider's circuit breaker"""
+        logger.warning("%s request failed: %s", self.PROVIDER_LABELS[provider], error, extra={"provider": provider})
+        trip = isinstance(error, ProviderError) and error.status_code in self.CIRCUIT_TRIP_STATUSES
+        self.circuit_breakers[provider].record_failure(str(error), trip=trip)
+    
+    @staticmethod
+    def _classify_provider_error(error: BaseException) -> str:
+        """Metrics outcome label for a failed provider call"""
+        if isinstance(error, ProviderError):
+            return "http_error"
+        if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException, requests.exceptions.Timeout)):
+            return "timeout"
+        return "error"
+    
+    def _record_provider_call(self, provider: str, endpoint: str, started: float, outcome: str, text: str = "") -> None:
+        """Record one provider call in the metrics and the adaptive router's window"""
+        endpoint = endpoint or "none"
+        latency = time.perf_counter() - started
+        current_span().set_attribute("ai.outcome", outcome)
+        if outcome != "cancelled":
+            # Hedge losers being cancelled says nothing about the provider
+            self.provider_router.record(provider, latency, outcome == "success")
+        provider_latency.observe(latency, provider=provider, endpoint=endpoint)
+        provider_requests.inc(provider=provider, endpoint=endpoint, outcome=outcome)
+        if text:
+            response_size.observe(len(text), provider=provider)
+    
+    def get_rate_limit_status(self) -> Dict[str, Dict[str, Any]]:
+        """Client-side rate limiter state for every provider"""
+        return {name: limiter.snapshot() for name, limiter in self.rate_limiters.items()}
+    
+    def get_quota_status(self) -> Dict[str, Any]:
+        """Today's request and token usage against each provider's daily quota"""
+        return self.quota_ledger.snapshot()
+    
+    def get_routing_status(self) -> Dict[str, Any]:
+        """Current cascade order and the latency/success window behind it"""
+        return self.provider_router.snapshot()
+    
+    def get_circuit_status(self) -> Dict[str, Dict[str, Any]]:
+        """Circuit breaker state for every configured provider"""
+        return {
+            provider: {"configured": bool(self.fallback_apis.get(provider)), **breaker.snapshot()}
+            for provider, breaker in self.circuit_breakers.items()
+        }
+    
+    @traced("ai.provider_call", kind=SPAN_KIND_CLIENT)
+    def _call_provider(self, provider: str, prompt: str, schema: Optional[str] = None) -> str:
+        """Make a single blocking generation call to one provider"""
+        label = self.PROVIDER_LABELS[provider]
+        transport = self._gemini_transport(provider)
+        call = current_span()
+        call.set_attribute("ai.provider", provider)
+        call.set_attribute("ai.transport", transport)
+        started = time.perf_counter()
+        text = ""
+        try:
+            if transport == "sdk":
+                response = self.genai_model.generate_content(
+                    prompt,
+                    generation_config=self._generation_config(schema if self._supports_structured_output(provider) else None)
+                )
+                text = response.text or ""
+                if text:
+                    logger.info("Generated content using %s", "Google Generative AI (Gemini SDK)", extra={"provider": provider, **SAMPLED})
+                return text
+            
+            request = self._build_provider_request(provider, prompt, schema)
+            response = requests.post(
+                request["url"],
+                headers={**request["headers"], **propagation_headers(request["url"])},
+                json=request["json"],
+                timeout=request["timeout"]
+            )
+            call.set_attribute("http.status_code", response.status_code)
+            if self._rejected_structured_output(provider, schema, response):
+                return self._call_provider(provider, prompt)
+            if response.status_code != 200:
+                raise ProviderError(
+                    provider, response.status_code, response.text, parse_retry_after(response.headers.get("Retry-After"))
+                )
+            
+            text = self._parse_provider_response(provider, response.json())
+            if text:
+                logger.info("Generated content using %s", label, extra={"provider": provider, **SAMPLED})
+            return text
+        finally:
+            record_span("provider", time.perf_counter() - started, provider)
+            if transport:
+                self.provider_router.record_transport(transport, time.perf_counter() - started, bool(text))
+    
+    def _prompt_key(self, prompt: str, schema: Optional[str] = None) -> str:
+        """Provider-agnostic key for a prompt and the generation parameters it is sent with"""
+        params = {**self.GEMINI_GENERATION_CONFIG, "schema": schema} if schema else self.GEMINI_GENERATION_CONFIG
+        return CompletionCache.make_key(prompt, params, self.PROMPT_TEMPLATE_VERSION)
+    
+    def _flight_key(self, kind: str, prompt: str, deadline: Optional[Deadline] = None, schema: Optional[str] = None) -> str:
+        """
+        Single-flight key for a generation. The budget class is part of it so a caller never
+        inherits the result of a flight running against a shorter latency budget.
+        """
+        budget = deadline.endpoint if deadline else "none"
+        return f"{kind}:{budget}:{self._prompt_key(prompt, schema)}"
+    
+    def _completion_cache_key(self, prompt: str, schema: Optional[str] = None) -> Optional[str]:
+        """Cache key for a prompt, or None when caching is disabled"""
+        if self.completion_cache is None:
+            return None
+        return self._prompt_key(prompt, schema)
+    
+    def _get_cached_completion(self, cache_key: Optional[str]) -> Optional[str]:
+        """Look up a cached completion"""
+        if cache_key is None:
+            return None
+        cached = self.completion_cache.get(cache_key)
+        cache_lookups.inc(result="hit" if cached else "miss")
+        if cached:
+            logger.info("Served AI completion from cache", extra=SAMPLED)
+        return cached
+    
+    def _cache_completion(self, cache_key: Optional[str], text: str) -> None:
+        """Remember a successful completion"""
+        if cache_key is not None and text:
+            self.completion_cache.set(cache_key, text)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Completion cache hit/miss counters and request coalescing counts"""
+        if self.completion_cache is None:
+            return {"enabled": False, "coalescing": self.single_flight.stats()}
+        return {"enabled": True, **self.completion_cache.stats(), "coalescing": self.single_flight.stats()}
+    
+    def _generate_with_fallback_ai(self, prompt: str, use_cache: bool = True, schema: Optional[str] = None) -> str:
+        """
+        Try different AI services as fallbacks with enhanced Gemini integration.
+        `schema` names a structured-output schema (see services.structured_output) to request JSON output.
+        """
+        with span("ai.generate", {"ai.schema": schema}) as generation:
+            cache_key = self._completion_cache_key(prompt, schema) if use_cache else None
+            cached = self._get_cached_completion(cache_key)
+            generation.set_attribute("ai.cache_hit", bool(cached))
+            if cached:
+                return cached
+            
+            return self.single_flight.run_sync(
+                self._flight_key("completion", prompt, schema=schema),
+                lambda: self._run_provider_cascade(prompt, cache_key, schema)
+            )
+    
+    def _run_provider_cascade(self, prompt: str, cache_key: Optional[str] = None, schema: Optional[str] = None) -> str:
+        """Walk the providers in order until one answers"""
+        prompt_size.observe(len(prompt), endpoint="none")
+        for provider in self._provider_order():
+            if not self._is_provider_usable(provider) or not self._circuit_allows(provider):
+                continue
+            with span("ai.provider_attempt", {"ai.provider": provider}) as attempt:
+                reserved = self._tokens_to_reserve(prompt)
+                if not self.rate_limiters[provider].acquire_sync(reserved):
+                    attempt.set_attribute("ai.outcome", "rate_limited")
+                    self._skip_rate_limited(provider)
+                    continue
+                started = time.perf_counter()
+                text = ""
+                try:
+                    text = self.retry_policies[provider].call_sync(
+                        lambda: self._call_provider(provider, prompt, schema),
+                        on_retry=self._retry_callback(provider, prompt)
                     )
-                    if response.status_code == 200:
-                        result = response.json()
-                        if 'candidates' in result and result['candidates']:
-                            text = result['candidates'][0]['content']['parts'][0]['text']
-                            print("✅ Generated personalized content using Google Generative AI (REST API)")
-                            return text
-                    else:
-                        print(f"Gemini API error: {response.status_code} - {response.text}")
-                            
-            except Exception as e:
-                print(f"Google Generative AI request failed: {e}")
+                    self.circuit_breakers[provider].record_success()
+                    self._record_provider_call(provider, "", started, "success" if text else "empty", text)
+                    if text:
+                        self._cache_completion(cache_key, text)
+                        return text
+                except Exception as e:
+                    self._record_provider_call(provider, "", started, self._classify_provider_error(e))
+                    self._record_provider_failure(provider, e)
+                finally:
+                    self._record_usage(provider, prompt, reserved, text)
         
-        # Try Ollama second (local, completely free)
-        if self.fallback_apis['ollama']:
-            try:
-                response = requests.post(
-                    self.ollama_url,
-                    json={
-                        "model": "llama2",  # or "mistral", "codellama", etc.
-                        "prompt": prompt,
-                        "stream": False
-                    },
-                    timeout=30
+        # If all AI services fail, return empty string (caller handles fallback)
+        logger.warning("All AI services failed, using static fallback")
+        return ""
+    
+    def _get_http_client(self, provider: str) -> httpx.AsyncClient:
+        """Get the long-lived pooled HTTP client for a provider, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        if self._http_clients_loop is not loop:
+            # Pooled connections are bound to the loop that opened them
+            self._http_clients = {}
+            self._http_clients_loop = loop
+        
+        client = self._http_clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY
                 )
-                if response.status_code == 200:
-                    result = response.json()
-                    if 'response' in result:
-                        print("✅ Generated content using Ollama (local AI)")
-                        return result['response']
-            except Exception as e:
-                print(f"Ollama request failed: {e}")
+            )
+            self._http_clients[provider] = client
+        return client
+    
+    @traced("ai.provider_call", kind=SPAN_KIND_CLIENT)
+    async def _call_provider_async(self, provider: str, prompt: str, deadline: Optional[Deadline] = None, schema: Optional[str] = None) -> str:
+        """Make a single non-blocking generation call to one provider"""
+        label = self.PROVIDER_LABELS[provider]
+        transport = self._gemini_transport(provider)
+        call = current_span()
+        call.set_attribute("ai.provider", provider)
+        call.set_attribute("ai.transport", transport)
+        started = time.perf_counter()
+        text = ""
+        try:
+            if transport == "sdk":
+                response = await self.genai_model.generate_content_async(
+                    prompt,
+                    generation_config=self._generation_config(schema if self._supports_structured_output(provider) else None)
+                )
+                text = response.text or ""
+                if text:
+                    logger.info("Generated content using %s", "Google Generative AI (Gemini SDK)", extra={"provider": provider, **SAMPLED})
+                return text
+            
+            request = self._build_provider_request(provider, prompt, schema)
+            client = self._get_http_client(provider)
+            response = await client.post(
+                request["url"],
+                headers={**request["headers"], **propagation_headers(request["url"])},
+                json=request["json"],
+                timeout=deadline.timeout_for(request["timeout"]) if deadline else request["timeout"]
+            )
+            call.set_attribute("http.status_code", response.status_code)
+            if self._rejected_structured_output(provider, schema, response):
+                return await self._call_provider_async(provider, prompt, deadline)
+            if response.status_code != 200:
+                raise ProviderError(
+                    provider, response.status_code, response.text, parse_retry_after(response.headers.get("Retry-After"))
+                )
+            
+            text = self._parse_provider_response(provider, response.json())
+            if text:
+                logger.info("Generated content using %s", label, extra={"provider": provider, **SAMPLED})
+            return text
+        finally:
+            record_span("provider", time.perf_counter() - started, provider)
+            if transport:
+                self.provider_router.record_transport(transport, time.perf_counter() - started, bool(text))
+    
+    @traced("ai.provider_attempt")
+    async def _attempt_provider_async(self, provider: str, prompt: str, deadline: Optional[Deadline] = None, schema: Optional[str] = None) -> str:
+        """Call one provider, turning any failure into an empty response"""
+        attempt = current_span()
+        attempt.set_attribute("ai.provider", provider)
+        if deadline and deadline.expired:
+            attempt.set_attribute("ai.outcome", "timeout")
+            return ""
+        if not self._circuit_allows(provider):
+            attempt.set_attribute("ai.outcome", "circuit_open")
+            return ""
+        reserved = self._tokens_to_reserve(prompt)
+        try:
+            admitted = await self.rate_limiters[provider].acquire(reserved, deadline)
+        except asyncio.CancelledError:
+            self.circuit_breakers[provider].release()
+            raise
+        if not admitted:
+            attempt.set_attribute("ai.outcome", "rate_limited")
+            self._skip_rate_limited(provider)
+            return ""
         
-        # Try Hugging Face API
-        if self.fallback_apis['huggingface']:
-            try:
-                # Use a better model for generation
-                hf_generation_url = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-large"
-                response = requests.post(
-                    hf_generation_url,
-                    headers=self.hf_headers,
-                    json={
-                        "inputs": prompt,
-                        "parameters": {
-                            "max_length": 1000,
-                            "temperature": 0.7,
-                            "do_sample": True
-                        }
-                    },
-                    timeout=30
+        endpoint = deadline.endpoint if deadline else ""
+        started = time.perf_counter()
+        text = ""
+        try:
+            text = await within_deadline(
+                self.retry_policies[provider].call(
+                    lambda: self._call_provider_async(provider, prompt, deadline, schema),
+                    deadline,
+                    self._retry_callback(provider, prompt)
+                ),
+                deadline
+            )
+            self.circuit_breakers[provider].record_success()
+            self._record_provider_call(provider, endpoint, started, "success" if text else "empty", text)
+            return text
+        except asyncio.CancelledError:
+            self.circuit_breakers[provider].release()
+            self._record_provider_call(provider, endpoint, started, "cancelled")
+            raise
+        except Exception as e:
+            if deadline and deadline.expired:
+                # Our budget ran out - that says nothing about the provider's health
+                self.circuit_breakers[provider].release()
+                self._record_provider_call(provider, endpoint, started, "timeout")
+                logger.info("%s request cut off: latency budget exhausted", self.PROVIDER_LABELS[provider], extra={"provider": provider})
+                return ""
+            self._record_provider_call(provider, endpoint, started, self._classify_provider_error(e))
+            self._record_provider_failure(provider, e)
+            return ""
+        finally:
+            self._record_usage(provider, prompt, reserved, text)
+    
+    async def _race_providers_async(
+        self,
+        providers: List[str],
+        prompt: str,
+        hedge_delay: float,
+        deadline: Optional[Deadline] = None,
+        schema: Optional[str] = None
+    ) -> str:
+        """
+        Hedged cascade: start the next provider whenever the running ones have not
+        answered within hedge_delay seconds (or as soon as one fails). The first
+        non-empty response wins and every other in-flight request is cancelled.
+        """
+        remaining = list(providers)
+        pending = set()
+        try:
+            while remaining or pending:
+                if remaining:
+                    pending.add(asyncio.create_task(self._attempt_provider_async(remaining.pop(0), prompt, deadline, schema)))
+                
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED
                 )
-                if response.status_code == 200:
-                    result = response.json()
-                    if isinstance(result, list) and len(result) > 0:
-                        print("✅ Generated content using Hugging Face API")
-                        return result[0].get('generated_text', '')
-            except Exception as e:
-                print(f"Hugging Face request failed: {e}")
+                for task in done:
+                    text = task.result()
+                    if text:
+                        return text
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        return ""
+    
+    async def _generate_with_fallback_ai_async(
+        self,
+        prompt: str,
+        hedge_delay: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+        use_cache: bool = True,
+        schema: Optional[str] = None
+    ) -> str:
+        """
+        Async counterpart of _generate_with_fallback_ai that never blocks the event loop.
         
-        # Try Groq API (fast and free)
-        if self.fallback_apis['groq']:
+        Args:
+            prompt: The prompt to send
+            hedge_delay: Seconds to wait on a provider before also firing the next one.
+                Defaults to AI_HEDGE_DELAY_SECONDS when hedging is enabled, otherwise
+                providers are tried strictly one after another.
+            deadline: Request latency budget; each attempt gets at most what is left of it
+                and once it is spent the caller's static fallback is used straight away.
+            use_cache: Serve and store the completion through the completion cache
+            schema: Structured-output schema name to request JSON output for
+        
+        Concurrent calls with an identical prompt share a single cascade.
+        """
+        with span("ai.generate", {"ai.schema": schema}) as generation:
+            cache_key = self._completion_cache_key(prompt, schema) if use_cache else None
+            cached = self._get_cached_completion(cache_key)
+            generation.set_attribute("ai.cache_hit", bool(cached))
+            if cached:
+                return cached
+            
+            return await self.single_flight.run(
+                self._flight_key("completion", prompt, deadline, schema),
+                lambda: self._run_provider_cascade_async(prompt, hedge_delay, deadline, cache_key, schema)
+            )
+    
+    async def _run_provider_cascade_async(
+        self,
+        prompt: str,
+        hedge_delay: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+        cache_key: Optional[str] = None,
+        schema: Optional[str] = None
+    ) -> str:
+        """Run the (optionally hedged) provider cascade for a prompt"""
+        prompt_size.observe(len(prompt), endpoint=(deadline.endpoint if deadline else "") or "none")
+        providers = [provider for provider in self._provider_order() if self._is_provider_usable(provider)]
+        if hedge_delay is None and settings.AI_HEDGING_ENABLED:
+            hedge_delay = settings.AI_HEDGE_DELAY_SECONDS
+        
+        text = ""
+        if hedge_delay is not None and len(providers) > 1:
+            text = await self._race_providers_async(providers, prompt, hedge_delay, deadline, schema)
+        else:
+            for provider in providers:
+                if deadline and deadline.expired:
+                    break
+                text = await self._attempt_provider_async(provider, prompt, deadline, schema)
+                if text:
+                    break
+        
+        if text:
+            self._cache_completion(cache_key, text)
+            return text
+        
+        if deadline and deadline.expired:
+            logger.warning("Latency budget for %s exhausted, using static fallback", deadline.endpoint or "request")
+        else:
+            logger.warning("All AI services failed, using static fallback")
+        return ""
+    
+    async def _stream_provider_async(
+        self,
+        provider: str,
+        prompt: str,
+        deadline: Optional[Deadline] = None,
+        schema: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Stream text deltas from one provider as they arrive"""
+        request = self._build_stream_request(provider, prompt, schema)
+        client = self._get_http_client(provider)
+        started = time.perf_counter()
+        # Not made the active span: an async generator's body can resume in another context
+        stream_span = start_span("ai.provider_stream", {"ai.provider": provider}, SPAN_KIND_CLIENT)
+        retry_as_plain_text = False
+        try:
+            async with client.stream(
+                "POST",
+                request["url"],
+                headers={**request["headers"], **propagation_headers(request["url"])},
+                json=request["json"],
+                timeout=deadline.timeout_for(request["timeout"]) if deadline else request["timeout"]
+            ) as response:
+                stream_span.set_attribute("http.status_code", response.status_code)
+                if response.status_code != 200:
+                    body = await response.aread()
+                    retry_as_plain_text = self._rejected_structured_output(provider, schema, response)
+                    if not retry_as_plain_text:
+                        raise ProviderError(
+                            provider,
+                            response.status_code,
+                            body.decode("utf-8", errors="replace"),
+                            parse_retry_after(response.headers.get("Retry-After"))
+                        )
+                else:
+                    async for line in response.aiter_lines():
+                        text = self._parse_stream_chunk(provider, line)
+                        if text:
+                            yield text
+            if retry_as_plain_text:
+                async for text in self._stream_provider_async(provider, prompt, deadline):
+                    yield text
+        except Exception as e:
+            stream_span.record_exception(e)
+            raise
+        finally:
+            record_span("provider", time.perf_counter() - started, provider)
+            stream_span.end()
+    
+    async def _stream_with_retries_async(
+        self,
+        provider: str,
+        prompt: str,
+        deadline: Optional[Deadline] = None,
+        schema: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Stream from one provider, reopening the stream on a transient failure before its first token"""
+        policy = self.retry_policies[provider]
+        on_retry = self._retry_callback(provider, prompt)
+        attempt = 0
+        while True:
+            stream = self._stream_provider_async(provider, prompt, deadline, schema)
+            started = False
             try:
-                response = requests.post(
-                    self.groq_url,
-                    headers={
-                        "Authorization": f"Bearer {self.groq_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "mixtral-8x7b-32768",
-                        "messages": [{"role": "user", "content": prompt}],
-                        "max_tokens": 1000,
-                        "temperature": 0.7
-                    },
-                    timeout=30
-                )
-                if response.status_code == 200:
-                    result = response.json()
-                    if 'choices' in result and len(result['choices']) > 0:
-                        print("✅ Generated content using Groq API")
-                        return result['choices'][0]['message']['content']
+                async for text in stream:
+                    started = True
+                    yield text
+                return
             except Exception as e:
-                print(f"Groq request failed: {e}")
+                # Once text has reached the caller the stream can't be replayed
+                delay = None if started else policy.next_delay(attempt, e, deadline)
+                if delay is None:
+                    raise
+                on_retry(attempt + 1, e, delay)
+            finally:
+                await stream.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    async def stream_with_fallback_ai_async(
+        self,
+        prompt: str,
+        deadline: Optional[Deadline] = None,
+        schema: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion token by token, falling back provider by provider.
+        
+        The latency budget bounds the time to the first token; once a provider has
+        started streaming it is allowed to finish. A provider that fails before its
+        first token is skipped; one that fails mid-stream ends the reply early.
+        Providers without a streaming API are tried last and yield their whole answer.
+        Nothing is yielded when every provider fails, leaving the static fallback to the caller.
+        """
+        providers = [provider for provider in self._provider_order() if self._is_provider_usable(provider)]
+        endpoint = deadline.endpoint if deadline else ""
+        prompt_size.observe(len(prompt), endpoint=endpoint or "none")
         
-        # Try OpenAI-compatible free API
-        if self.fallback_apis['openai_free']:
+        for provider in providers:
+            if provider not in self.STREAMING_PROVIDERS:
+                continue
+            if (deadline and deadline.expired) or not self._circuit_allows(provider):
+                continue
+            reserved = self._tokens_to_reserve(prompt)
             try:
-                response = requests.post(
-                    f"{self.openai_free_url}/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.openai_free_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "gpt-3.5-turbo",  # or whatever model the service provides
-                        "messages": [{"role": "user", "content": prompt}],
-                        "max_tokens": 1000,
-                        "temperature": 0.7
-                    },
-                    timeout=30
-                )
-                if response.status_code == 200:
-                    result = response.json()
-                    if 'choices' in result and len(result['choices']) > 0:
-                        print("✅ Generated content using OpenAI-compatible API")
-                        return result['choices'][0]['message']['content']
+                admitted = await self.rate_limiters[provider].acquire(reserved, deadline)
+            except (asyncio.CancelledError, GeneratorExit):
+                # Client went away while queued; give back a half-open probe slot
+                self.circuit_breakers[provider].release()
+                raise
+            if not admitted:
+                self._skip_rate_limited(provider)
+                continue
+            
+            label = self.PROVIDER_LABELS[provider]
+            stream = self._stream_with_retries_async(provider, prompt, deadline, schema)
+            started = False
+            started_at = time.perf_counter()
+            streamed = []
+            try:
+                # The stream's HTTP timeouts are already capped by the remaining budget
+                first = await stream.__anext__()
+                started = True
+                provider_first_token.observe(time.perf_counter() - started_at, provider=provider, endpoint=endpoint or "none")
+                streamed.append(first)
+                yield first
+                async for text in stream:
+                    streamed.append(text)
+                    yield text
+                self.circuit_breakers[provider].record_success()
+                self._record_provider_call(provider, endpoint, started_at, "success", "".join(streamed))
+                logger.info("Streamed content using %s", label, extra={"provider": provider, **SAMPLED})
+                return
+            except StopAsyncIteration:
+                # Provider answered but produced no text
+                self.circuit_breakers[provider].record_success()
+                self._record_provider_call(provider, endpoint, started_at, "empty")
+            except (asyncio.CancelledError, GeneratorExit):
+                # Client went away mid-stream
+                self.circuit_breakers[provider].release()
+                self._record_provider_call(provider, endpoint, started_at, "cancelled")
+                raise
             except Exception as e:
-                print(f"OpenAI-compatible API request failed: {e}")
+                if not started and deadline and deadline.expired:
+                    self.circuit_breakers[provider].release()
+                    self._record_provider_call(provider, endpoint, started_at, "timeout")
+                    logger.info("%s stream cut off: latency budget exhausted", label, extra={"provider": provider})
+                    break
+                self._record_provider_call(provider, endpoint, started_at, self._classify_provider_error(e))
+                self._record_provider_failure(provider, e)
+                if started:
+                    return
+            finally:
+                self._record_usage(provider, prompt, reserved, "".join(streamed))
+                await stream.aclose()
         
-        # If all AI services fail, return empty string (caller handles fallback)
-        print("⚠️ All AI services failed, using static fallback")
-        return ""
+        for provider in providers:
+            if provider in self.STREAMING_PROVIDERS or (deadline and deadline.expired):
+                continue
+            text = await self._attempt_provider_async(provider, prompt, deadline, schema)
+            if text:
+                yield text
+                return
+        
+        logger.warning("All AI streams failed, using static fallback")
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP clients and the completion cache and quota databases"""
+        # Both write out what they still have pending, so keep that disk I/O off the event loop
+        if self.completion_cache is not None:
+            await asyncio.to_thread(self.completion_cache.close)
+        await asyncio.to_thread(self.quota_ledger.close)
+        clients = list(self._http_clients.values())
+        self._http_clients = {}
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning("Error closing AI provider HTTP client: %s", e)
     
     def generate_personalized_roadmap(self, user_skills: str, career_goal: str, experience_level: str) -> str:
         """
@@ -474,6 +1287,7 @@ Make the tone friendly and encouraging, like a helpful mentor guiding a friend t
             return ai_response
         
         # Fallback roadmap if AI is unavailable
+        static_fallbacks.inc(kind="roadmap")
         return f"""
 🗺️ **Your Personalized Career Roadmap**
 
@@ -519,10 +1333,16 @@ Hey there, future rockstar! 👋 I'm so excited to help guide you on your journe
 Remember, every expert was once a beginner. You've got this, and I'm cheering you on every step of the way! 🌈✨
         """
     
-    def generate_career_analysis(self, skills: str, expertise: str) -> Dict[str, Any]:
-        """Generate career analysis using available AI services with fallbacks"""
-        
-        prompt = f"""
+    def _canonical_profile(self, skills: str, expertise: str) -> Tuple[str, str]:
+        """Canonical skills text and expertise level so equivalent requests share prompts and cache entries"""
+        profile = normalize_skill_profile(skills, expertise)
+        if not profile:
+            return skills, expertise
+        return profile.skills_text, profile.expertise
+    
+    def _build_career_analysis_prompt(self, skills: str, expertise: str) -> str:
+        """Build the career analysis prompt shared by the sync and async generators"""
+        return f"""
         Based on the following skills and expertise, provide a comprehensive career analysis:
 
         Skills: {skills}
@@ -579,93 +1399,156 @@ Remember, every expert was once a beginner. You've got this, and I'm cheering yo
         Provide exactly 3 career paths, select the best one, create a 5-step roadmap, suggest 3-5 relevant courses, and recommend 3-5 relevant certifications.
         Focus on practical, actionable advice.
         """
-
+    
+    def _parse_career_analysis_response(self, ai_response: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract the career analysis JSON from an AI response, or None if it cannot be parsed.
+        Malformed or truncated JSON is repaired and invalid items are dropped individually,
+        so one bad roadmap step doesn't throw away the whole generation.
+        """
+        if not ai_response:
+            return None
+        with timed("json"), span("ai.parse_json", {"ai.kind": "career_analysis"}) as parsing:
+            result = parse_career_analysis(ai_response)
+            parsing.set_attribute("ai.parsed", result is not None)
+        if result is None:
+            logger.warning("No usable career analysis in AI response: %s...", ai_response[:200])
+            parse_failures.inc(kind="career_analysis")
+        return result
+    
+    def _complete_career_analysis(self, result: Dict[str, Any], skills: str, expertise: str) -> Dict[str, Any]:
+        """Fill sections that had no valid items from the static analysis"""
+        missing = [section for section in ("roadmap", "courses", "certifications") if not result.get(section)]
+        if missing:
+            fallback = self._create_enhanced_fallback_response(skills, expertise)
+            for section in missing:
+                result[section] = fallback[section]
+        return result
+    
+    def generate_career_analysis(self, skills: str, expertise: str) -> Dict[str, Any]:
+        """Generate career analysis using available AI services with fallbacks"""
+        skills, expertise = self._canonical_profile(skills, expertise)
+        prompt = self._build_career_analysis_prompt(skills, expertise)
+        return self.single_flight.run_sync(
+            self._flight_key("career_analysis", prompt),
+            lambda: self._run_career_analysis(prompt, skills, expertise)
+        )
+    
+    def _run_career_analysis(self, prompt: str, skills: str, expertise: str) -> Dict[str, Any]:
+        """Vertex AI, then the provider cascade, then the static analysis"""
         # Try Vertex AI first if available
         if self.vertex_ai_available and self.model:
             try:
                 response = self.model.generate_content(prompt)
-                response_text = response.text
-                
-                # Extract JSON from response
-                start_idx = response_text.find('{')
-                end_idx = response_text.rfind('}') + 1
-                
-                if start_idx != -1 and end_idx != -1:
-                    json_str = response_text[start_idx:end_idx]
-                    result = json.loads(json_str)
-                    print("✅ Generated career analysis using Vertex AI")
-                    return result
-                    
+                result = self._parse_career_analysis_response(response.text)
+                if result:
+                    logger.info("Generated career analysis using Vertex AI", extra=SAMPLED)
+                    return self._complete_career_analysis(result, skills, expertise)
             except Exception as e:
-                print(f"Vertex AI generation failed: {e}")
+                logger.warning("Vertex AI generation failed: %s", e)
         
         # Try fallback AI services
-        ai_response = self._generate_with_fallback_ai(prompt)
-        if ai_response:
+        result = self._parse_career_analysis_response(
+            self._generate_with_fallback_ai(prompt, schema=self._response_schema("career_analysis"))
+        )
+        if result:
+            return self._complete_career_analysis(result, skills, expertise)
+        
+        # Fallback to static response
+        logger.info("Using enhanced static career analysis")
+        static_fallbacks.inc(kind="career_analysis")
+        return self._create_enhanced_fallback_response(skills, expertise)
+    
+    async def generate_career_analysis_async(self, skills: str, expertise: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Async counterpart of generate_career_analysis for use inside route handlers"""
+        skills, expertise = self._canonical_profile(skills, expertise)
+        prompt = self._build_career_analysis_prompt(skills, expertise)
+        return await self.single_flight.run(
+            self._flight_key("career_analysis", prompt, deadline),
+            lambda: self._run_career_analysis_async(prompt, skills, expertise, deadline)
+        )
+    
+    async def _run_career_analysis_async(self, prompt: str, skills: str, expertise: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Async counterpart of _run_career_analysis"""
+        if self.vertex_ai_available and self.model:
             try:
-                # Try to extract JSON from AI response
-                start_idx = ai_response.find('{')
-                end_idx = ai_response.rfind('}') + 1
-                
-                if start_idx != -1 and end_idx != -1:
-                    json_str = ai_response[start_idx:end_idx]
-                    # Try to fix common JSON issues
-                    try:
-                        result = json.loads(json_str)
-                        return result
-                    except json.JSONDecodeError as e:
-                        # Try to fix common JSON issues
-                        fixed_json = self._fix_json_format(json_str)
-                        if fixed_json:
-                            result = json.loads(fixed_json)
-                            return result
-                        else:
-                            print(f"Error parsing AI response: {e}")
-                            print(f"JSON string: {json_str[:200]}...")  # Print first 200 chars for debugging
+                response = await within_deadline(self.model.generate_content_async(prompt), deadline)
+                result = self._parse_career_analysis_response(response.text)
+                if result:
+                    logger.info("Generated career analysis using Vertex AI", extra=SAMPLED)
+                    return self._complete_career_analysis(result, skills, expertise)
             except Exception as e:
-                print(f"Error parsing AI response: {e}")
-                if 'ai_response' in locals():
-                    print(f"Response preview: {ai_response[:200] if ai_response else 'No response'}...")
+                logger.warning("Vertex AI generation failed: %s", e)
         
-        # Fallback to static response
-        print("📊 Using enhanced static career analysis")
+        result = self._parse_career_analysis_response(await self._generate_with_fallback_ai_async(
+            prompt, deadline=deadline, schema=self._response_schema("career_analysis")
+        ))
+        if result:
+            return self._complete_career_analysis(result, skills, expertise)
+        
+        logger.info("Using enhanced static career analysis")
+        static_fallbacks.inc(kind="career_analysis")
         return self._create_enhanced_fallback_response(skills, expertise)
     
+    async def stream_career_analysis_async(
+        self,
+        skills: str,
+        expertise: str,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Tuple[str, Optional[int], Dict[str, Any]]]:
+        """
+        Career analysis yielded piece by piece as (section, index, item): each career path,
+        the selected path, roadmap step, course and certification as soon as its JSON object
+        closes in the provider stream. Sections the stream left empty are then filled from
+        the static analysis, so the items always add up to a complete analysis.
+        """
+        skills, expertise = self._canonical_profile(skills, expertise)
+        prompt = self._build_career_analysis_prompt(skills, expertise)
+        schema = self._response_schema("career_analysis")
+        cache_key = self._completion_cache_key(prompt, schema)
+        analysis = CareerAnalysisStream()
+        
+        cached = self._get_cached_completion(cache_key)
+        if cached:
+            for item in analysis.feed(cached):
+                yield item
+        else:
+            async for text in self.stream_with_fallback_ai_async(prompt, deadline, schema):
+                for item in analysis.feed(text):
+                    yield item
+        
+        sections = analysis.sections
+        selected = analysis.selected_path
+        missing = [section for section in ("roadmap", "courses", "certifications") if not sections[section]]
+        if sections["career_paths"] or selected:
+            if not cached:
+                self._cache_completion(cache_key, analysis.text)
+            if not sections["career_paths"]:
+                yield ("career_paths", 0, selected)
+            if not selected:
+                # The stream named no valid selected path; default to its first career path
+                yield ("selected_path", None, sections["career_paths"][0])
+        else:
+            if analysis.text:
+                parse_failures.inc(kind="career_analysis")
+            logger.info("Using enhanced static career analysis")
+            static_fallbacks.inc(kind="career_analysis")
+            missing.insert(0, "career_paths")
+        
+        if missing:
+            fallback = self._create_enhanced_fallback_response(skills, expertise)
+            for section in missing:
+                for index, item in enumerate(fallback[section]):
+                    yield (section, index, item)
+            if "career_paths" in missing:
+                yield ("selected_path", None, fallback["selected_path"])
+    
     def _fix_json_format(self, json_str: str) -> str:
-        """Attempt to fix common JSON formatting issues"""
-        try:
-            # Remove any text before the first {
-            first_brace = json_str.find('{')
-            if first_brace > 0:
-                json_str = json_str[first_brace:]
-            
-            # Remove any text after the last }
-            last_brace = json_str.rfind('}')
-            if last_brace > 0 and last_brace < len(json_str) - 1:
-                json_str = json_str[:last_brace + 1]
-            
-            # Fix common issues
-            import re
-            
-            # Fix trailing commas
-            json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
-            
-            # Try to fix unquoted keys (this is a simple approach)
-            json_str = re.sub(r'([{,]\s*)([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1"\2":', json_str)
-            
-            # Try to fix single quotes around strings
-            # This is a simplified approach - a full JSON parser would be better
-            parts = json_str.split('"')
-            for i in range(1, len(parts) - 1, 2):
-                # Skip even indices (they're outside quotes)
-                continue
-            # For odd indices, they're inside quotes, so we don't modify them
-            
-            return json_str
-        except Exception as e:
-            print(f"Error fixing JSON format: {e}")
-            return ""
+        """Attempt to fix common JSON formatting issues, returning valid JSON or an empty string"""
+        repaired = repair_json(json_str)
+        return json.dumps(repaired) if repaired is not None else ""
     
+    @traced("ai.static_fallback", {"ai.kind": "career_analysis"})
     def _create_enhanced_fallback_response(self, skills: str, expertise: str) -> Dict[str, Any]:
         """Create an enhanced fallback response that adapts to user's skills"""
         
@@ -2006,12 +2889,11 @@ Remember, every expert was once a beginner. You've got this, and I'm cheering yo
             'certifications': personalized_certifications
         }
 
-    def generate_mock_test(self, skills: str, expertise: str, topic: str = "", user_id: str = "") -> Dict[str, Any]:
-        """Generate a mock test using available AI services with fallbacks"""
-        
+    def _build_mock_test_prompt(self, skills: str, expertise: str, topic: str = "") -> str:
+        """Build the mock test prompt shared by the sync and async generators"""
         # Build the prompt
         topic_text = f" focusing on {topic}" if topic else ""
-        prompt = f"""
+        return f"""
         Generate a 5-question mock test for a user with skills {skills} and expertise {expertise}{topic_text}.
         Include questions and answers in JSON format:
         [
@@ -2025,71 +2907,114 @@ Remember, every expert was once a beginner. You've got this, and I'm cheering yo
         Make the questions challenging but appropriate for the specified skill level.
         Provide detailed answers that explain the concepts.
         """
-
+    
+    def _parse_mock_test_questions(self, ai_response: str) -> Optional[List[MockTestQuestion]]:
+        """Extract mock test questions from an AI response, keeping every valid question, or None if there are none"""
+        if not ai_response:
+            return None
+        with timed("json"), span("ai.parse_json", {"ai.kind": "mock_test"}) as parsing:
+            questions = parse_mock_test_questions(ai_response)
+            parsing.set_attribute("ai.parsed", bool(questions))
+        if questions:
+            return questions
+        logger.warning("No valid mock test questions in AI response: %s...", ai_response[:200])
+        parse_failures.inc(kind="mock_test")
+        return None
+    
+    @traced("ai.static_fallback", {"ai.kind": "mock_test"})
+    def _static_mock_test_questions(self) -> List[MockTestQuestion]:
+        """Static mock test used when every AI service fails"""
+        return [
+            MockTestQuestion(
+                question="What is the importance of continuous learning in your field?",
+                answer="Continuous learning is essential in today's rapidly evolving professional landscape. It helps professionals stay updated with the latest technologies, methodologies, and industry best practices. This ongoing education ensures competitiveness, adaptability, and career growth."
+            ),
+            MockTestQuestion(
+                question="How do you approach problem-solving in your domain?",
+                answer="Effective problem-solving involves several key steps: 1) Clearly defining the problem, 2) Gathering relevant information, 3) Generating multiple potential solutions, 4) Evaluating each option, 5) Selecting and implementing the best solution, and 6) Reviewing the results. This systematic approach ensures thorough analysis and better outcomes."
+            ),
+            MockTestQuestion(
+                question="What role does collaboration play in professional success?",
+                answer="Collaboration is crucial for professional success as it enables knowledge sharing, diverse perspectives, and collective problem-solving. Working effectively with others enhances creativity, improves decision-making, and leads to more innovative solutions. Strong collaboration skills also build professional networks and career opportunities."
+            ),
+            MockTestQuestion(
+                question="How do you stay current with industry trends and developments?",
+                answer="Staying current requires a multi-faceted approach: following industry publications and blogs, participating in professional associations, attending conferences and webinars, engaging in online communities, taking continuing education courses, and networking with peers. Regularly dedicating time to these activities ensures ongoing professional development."
+            ),
+            MockTestQuestion(
+                question="What strategies do you use for career planning and goal setting?",
+                answer="Effective career planning involves: 1) Self-assessment of skills, interests, and values, 2) Researching career paths and opportunities, 3) Setting SMART goals (Specific, Measurable, Achievable, Relevant, Time-bound), 4) Creating actionable development plans, 5) Building relevant networks, 6) Regularly reviewing and adjusting plans based on progress and changing circumstances. This structured approach provides direction and motivation."
+            )
+        ]
+    
+    def generate_mock_test(self, skills: str, expertise: str, topic: str = "", user_id: str = "") -> Dict[str, Any]:
+        """Generate a mock test using available AI services with fallbacks"""
+        skills, expertise = self._canonical_profile(skills, expertise)
+        prompt = self._build_mock_test_prompt(skills, expertise, topic)
+        return self.single_flight.run_sync(self._flight_key("mock_test", prompt), lambda: self._run_mock_test(prompt))
+    
+    def _run_mock_test(self, prompt: str) -> Dict[str, Any]:
+        """Vertex AI, then the provider cascade, then the static questions"""
         questions = None
         
         # Try Vertex AI first if available
         if self.vertex_ai_available and self.model and hasattr(self.model, 'generate_content'):
             try:
                 response = self.model.generate_content(prompt)
-                response_text = response.text
-                
-                # Try to find JSON in the response
-                start_idx = response_text.find('[')
-                end_idx = response_text.rfind(']') + 1
-                
-                if start_idx != -1 and end_idx != -1:
-                    json_str = response_text[start_idx:end_idx]
-                    questions_data = json.loads(json_str)
-                    
-                    # Convert to MockTestQuestion objects
-                    questions = [MockTestQuestion(**q) for q in questions_data]
-                    print("✅ Generated mock test using Vertex AI")
-                    
+                questions = self._parse_mock_test_questions(response.text)
+                if questions:
+                    logger.info("Generated mock test using Vertex AI", extra=SAMPLED)
             except Exception as e:
-                print(f"Vertex AI mock test generation failed: {e}")
+                logger.warning("Vertex AI mock test generation failed: %s", e)
         
         # Try fallback AI services if Vertex AI failed
         if not questions:
-            ai_response = self._generate_with_fallback_ai(prompt)
-            if ai_response:
-                try:
-                    # Try to extract JSON from AI response
-                    start_idx = ai_response.find('[')
-                    end_idx = ai_response.rfind(']') + 1
-                    
-                    if start_idx != -1 and end_idx != -1:
-                        json_str = ai_response[start_idx:end_idx]
-                        questions_data = json.loads(json_str)
-                        questions = [MockTestQuestion(**q) for q in questions_data]
-                except Exception as e:
-                    print(f"Error parsing AI response: {e}")
+            questions = self._parse_mock_test_questions(
+                self._generate_with_fallback_ai(prompt, schema=self._response_schema("mock_test"))
+            )
         
         # If all AI services fail, create a fallback response
         if not questions:
-            print("Using static mock test fallback")
-            questions = [
-                MockTestQuestion(
-                    question="What is the importance of continuous learning in your field?",
-                    answer="Continuous learning is essential in today's rapidly evolving professional landscape. It helps professionals stay updated with the latest technologies, methodologies, and industry best practices. This ongoing education ensures competitiveness, adaptability, and career growth."
-                ),
-                MockTestQuestion(
-                    question="How do you approach problem-solving in your domain?",
-                    answer="Effective problem-solving involves several key steps: 1) Clearly defining the problem, 2) Gathering relevant information, 3) Generating multiple potential solutions, 4) Evaluating each option, 5) Selecting and implementing the best solution, and 6) Reviewing the results. This systematic approach ensures thorough analysis and better outcomes."
-                ),
-                MockTestQuestion(
-                    question="What role does collaboration play in professional success?",
-                    answer="Collaboration is crucial for professional success as it enables knowledge sharing, diverse perspectives, and collective problem-solving. Working effectively with others enhances creativity, improves decision-making, and leads to more innovative solutions. Strong collaboration skills also build professional networks and career opportunities."
-                ),
-                MockTestQuestion(
-                    question="How do you stay current with industry trends and developments?",
-                    answer="Staying current requires a multi-faceted approach: following industry publications and blogs, participating in professional associations, attending conferences and webinars, engaging in online communities, taking continuing education courses, and networking with peers. Regularly dedicating time to these activities ensures ongoing professional development."
-                ),
-                MockTestQuestion(
-                    question="What strategies do you use for career planning and goal setting?",
-                    answer="Effective career planning involves: 1) Self-assessment of skills, interests, and values, 2) Researching career paths and opportunities, 3) Setting SMART goals (Specific, Measurable, Achievable, Relevant, Time-bound), 4) Creating actionable development plans, 5) Building relevant networks, 6) Regularly reviewing and adjusting plans based on progress and changing circumstances. This structured approach provides direction and motivation."
-                )
-            ]
+            logger.info("Using static mock test fallback")
+            static_fallbacks.inc(kind="mock_test")
+            questions = self._static_mock_test_questions()
+        
+        return {
+            "questions": questions,
+            "generated_at": datetime.now().isoformat()
+        }
+    
+    async def generate_mock_test_async(self, skills: str, expertise: str, topic: str = "", user_id: str = "", deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Async counterpart of generate_mock_test for use inside route handlers"""
+        skills, expertise = self._canonical_profile(skills, expertise)
+        prompt = self._build_mock_test_prompt(skills, expertise, topic)
+        return await self.single_flight.run(
+            self._flight_key("mock_test", prompt, deadline),
+            lambda: self._run_mock_test_async(prompt, deadline)
+        )
+    
+    async def _run_mock_test_async(self, prompt: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Async counterpart of _run_mock_test"""
+        questions = None
+        
+        if self.vertex_ai_available and self.model and hasattr(self.model, 'generate_content_async'):
+            try:
+                response = await within_deadline(self.model.generate_content_async(prompt), deadline)
+                questions = self._parse_mock_test_questions(response.text)
+                if questions:
+                    logger.info("Generated mock test using Vertex AI", extra=SAMPLED)
+            except Exception as e:
+                logger.warning("Vertex AI mock test generation failed: %s", e)
+        
+        if not questions:
+            questions = self._parse_mock_test_questions(await self._generate_with_fallback_ai_async(
+                prompt, deadline=deadline, schema=self._response_schema("mock_test")
+            ))
+        
+        if not questions:
+            logger.info("Using static mock test fallback")
+            static_fallbacks.inc(kind="mock_test")
+            questions = self._static_mock_test_questions()
         
         return {
             "questions": questions,
@@ -2107,6 +3032,32 @@ Remember, every expert was once a beginner. You've got this, and I'm cheering yo
         Returns:
             Dict containing extracted skills and updated skills list
         """
+        if not self._mentions_skills(message):
+            return {
+                "extracted_skills": [],
+                "updated_skills": current_skills
+            }
+        
+        # Try to extract skills using AI
+        ai_response = self._generate_with_fallback_ai(self._build_skill_extraction_prompt(message, current_skills))
+        return self._build_skill_extraction_result(ai_response, message, current_skills)
+    
+    async def extract_skills_from_message_async(self, message: str, current_skills: str = "", deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Async counterpart of extract_skills_from_message for use inside route handlers"""
+        if not self._mentions_skills(message):
+            return {
+                "extracted_skills": [],
+                "updated_skills": current_skills
+            }
+        
+        ai_response = await self._generate_with_fallback_ai_async(
+            self._build_skill_extraction_prompt(message, current_skills),
+            deadline=deadline
+        )
+        return self._build_skill_extraction_result(ai_response, message, current_skills)
+    
+    def _mentions_skills(self, message: str) -> bool:
+        """Check if the message contains skill indicators"""
         # Keywords that indicate skill mentions
         skill_indicators = [
             'learned', 'learning', 'studying', 'know', 'experience', 
@@ -2114,15 +3065,11 @@ Remember, every expert was once a beginner. You've got this, and I'm cheering yo
             'skilled in', 'expert in', 'mastered', 'practiced'
         ]
         
-        # Check if the message contains skill indicators
-        if not any(indicator in message.lower() for indicator in skill_indicators):
-            return {
-                "extracted_skills": [],
-                "updated_skills": current_skills
-            }
-        
-        # Use AI to extract skills if available
-        prompt = f"""
+        return any(indicator in message.lower() for indicator in skill_indicators)
+    
+    def _build_skill_extraction_prompt(self, message: str, current_skills: str = "") -> str:
+        """Build the skill extraction prompt shared by the sync and async extractors"""
+        return f"""
         Extract specific technical skills from this message: "{message}"
         
         Current skills: {current_skills or "None"}
@@ -2143,9 +3090,9 @@ Remember, every expert was once a beginner. You've got this, and I'm cheering yo
         - Intermediate: Some practical experience
         - Advanced: Strong proficiency or professional experience
         """
-        
-        # Try to extract skills using AI
-        ai_response = self._generate_with_fallback_ai(prompt)
+    
+    def _build_skill_extraction_result(self, ai_response: str, message: str, current_skills: str = "") -> Dict[str, Any]:
+        """Merge skills parsed from the AI response, falling back to keyword matching"""
         if ai_response:
             try:
                 # Try to extract JSON from AI response
@@ -2154,7 +3101,8 @@ Remember, every expert was once a beginner. You've got this, and I'm cheering yo
                 
                 if start_idx != -1 and end_idx != -1:
                     json_str = ai_response[start_idx:end_idx]
-                    result = json.loads(json_str)
+                    with timed("json"), span("ai.parse_json", {"ai.kind": "skill_extraction"}):
+                        result = json.loads(json_str)
                     
                     if "extracted_skills" in result:
                         # Update skills list
@@ -2173,9 +3121,11 @@ Remember, every expert was once a beginner. You've got this, and I'm cheering yo
                             "updated_skills": updated_skills
                         }
             except Exception as e:
-                print(f"Error parsing skill extraction response: {e}")
+                logger.warning("Error parsing skill extraction response: %s", e)
+            parse_failures.inc(kind="skill_extraction")
         
         # Fallback: Simple keyword-based extraction
+        static_fallbacks.inc(kind="skill_extraction")
         # This is a simplified approach - a more sophisticated NLP approach would be better
         common_skills = [
             'Python', 'JavaScript', 'Java', 'C++', 'C#', 'Ruby', 'Go', 'Rust', 'Swift', 'Kotlin',
@@ -2220,4 +3170,39 @@ Remember, every expert was once a beginner. You've got this, and I'm cheering yo
         return {
             "extracted_skills": extracted_skills,
             "updated_skills": updated_skills
-        }
\ No newline at end of file
+        }
+
+# Shared AI service instance, created once per process and warmed up by the app lifespan
+_ai_service_instance: Optional[AIService] = None
+_ai_service_lock = threading.Lock()
+_ai_service_ready = False
+
+def get_ai_service() -> AIService:
+    """Return the shared AIService, initializing it on first use"""
+    global _ai_service_instance
+    if _ai_service_instance is None:
+        with _ai_service_lock:
+            if _ai_service_instance is None:
+                _ai_service_instance = AIService()
+    return _ai_service_instance
+
+def warm_up_ai_service() -> AIService:
+    """Initialize the shared AIService and mark it ready to serve traffic"""
+    global _ai_service_ready
+    service = get_ai_service()
+    _ai_service_ready = True
+    return service
+
+def is_ai_service_ready() -> bool:
+    """Whether the shared AIService has finished warming up"""
+    return _ai_service_ready
+
+async def shutdown_ai_service() -> None:
+    """Close the shared AIService's connections and drop it so the next startup builds a fresh one"""
+    global _ai_service_instance, _ai_service_ready
+    with _ai_service_lock:
+        service = _ai_service_instance
+        _ai_service_instance = None
+        _ai_service_ready = False
+    if service is not None:
+        await service.aclose()
@@ -0,0 +1,110 @@
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any
+from config.settings import settings
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for a single AI provider.
+
+    Closed: requests flow normally and consecutive failures are counted.
+    Open: the provider failed too often, so requests are skipped until the cool-down ends.
+    Half-open: after the cool-down a single probe request is let through; success closes
+    the circuit again, failure re-opens it for another cool-down window.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, recovery_timeout: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.AI_CIRCUIT_FAILURE_THRESHOLD
+        self.recovery_timeout = recovery_timeout or settings.AI_CIRCUIT_RECOVERY_SECONDS
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._last_failure: Optional[str] = None
+        self._last_failure_at: Optional[datetime] = None
+        self._total_failures = 0
+        self._total_successes = 0
+        self._skipped_requests = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the cool-down has passed"""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent to the provider right now"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                # Let exactly one probe through to test whether the provider recovered
+                self._probe_in_flight = True
+                return True
+            self._skipped_requests += 1
+            return False
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            self._total_successes += 1
+
+    def record_failure(self, reason: str = "", trip: bool = False) -> None:
+        """
+        Record a failed call.
+
+        Args:
+            reason: Short description kept for the status endpoint
+            trip: Open the circuit immediately (e.g. rate limited) instead of waiting for the threshold
+        """
+        with self._lock:
+            self._consecutive_failures += 1
+            self._total_failures += 1
+            self._last_failure = reason[:200] if reason else None
+            self._last_failure_at = datetime.utcnow()
+            if trip or self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Give back a half-open probe slot when the call was cancelled before finishing"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Breaker state for the status endpoint"""
+        with self._lock:
+            state = self._current_state()
+            retry_in = 0.0
+            if state == self.OPEN:
+                retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout_seconds": self.recovery_timeout,
+                "retry_in_seconds": round(retry_in, 1),
+                "last_failure": self._last_failure,
+                "last_failure_at": self._last_failure_at.isoformat() if self._last_failure_at else None,
+                "total_successes": self._total_successes,
+                "total_failures": self._total_failures,
+                "skipped_requests": self._skipped_requests
+            }
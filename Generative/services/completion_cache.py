@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class CompletionCache:
+    """
+    Cache of AI provider completions keyed by prompt, generation parameters and prompt
+    template version.
+
+    Entries live in a memory-bounded LRU (by entry count and by total size) and expire
+    after a TTL. When a SQLite path is configured, entries are also persisted so they
+    survive restarts: unexpired entries are loaded into memory when the cache is built,
+    lookups are only ever served from memory, and new entries are written in batches by
+    a background thread every AI_CACHE_FLUSH_SECONDS (and on close), so neither reads
+    nor writes block the event loop on disk I/O.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 20 * 1024 * 1024,
+        ttl_seconds: float = 86400,
+        sqlite_path: Optional[str] = None,
+        flush_interval: Optional[float] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = sqlite_path or None
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self.flush_interval = flush_interval if flush_interval is not None else settings.AI_CACHE_FLUSH_SECONDS
+        self._db_lock = threading.Lock()
+        # Entries not yet written to SQLite, by key
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if self.sqlite_path:
+            try:
+                self._db = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._db.execute("DELETE FROM completions WHERE expires_at <= ?", (time.time(),))
+                self._db.commit()
+                self._load()
+            except sqlite3.Error as e:
+                logger.warning("Could not open completion cache database: %s", e)
+                self._db = None
+
+    def _load(self) -> None:
+        """Fill the in-memory LRU with the persisted entries that fit, longest-lived last"""
+        rows = self._db.execute(
+            "SELECT key, value, expires_at FROM completions ORDER BY expires_at DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        for key, value, expires_at in reversed(rows):
+            self._store(key, value, expires_at)
+
+    @classmethod
+    def from_settings(cls) -> "CompletionCache":
+        """Build a cache using the AI_CACHE_* settings"""
+        return cls(
+            max_entries=settings.AI_CACHE_MAX_ENTRIES,
+            max_bytes=settings.AI_CACHE_MAX_BYTES,
+            ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+            sqlite_path=settings.AI_CACHE_SQLITE_PATH
+        )
+
+    @staticmethod
+    def make_key(prompt: str, params: Dict[str, Any], template_version: str) -> str:
+        """Stable, provider-agnostic cache key for a prompt"""
+        payload = json.dumps([template_version, params, prompt], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                self._remove(key)
+
+            self._misses += 1
+            return None
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        """Store a completion, evicting least recently used entries if over budget"""
+        if not value:
+            return
+        expires_at = time.time() + (ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            self._store(key, value, expires_at)
+            if self._db is None:
+                return
+            self._pending[key] = (value, expires_at)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_periodically, name="completion-cache-flush", daemon=True)
+                self._flusher.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write completions stored since the last flush to SQLite in one transaction"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        with self._db_lock:
+            if self._db is None:
+                return
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO completions (key, value, expires_at) VALUES (?, ?, ?)",
+                    [(key, value, expires_at) for key, (value, expires_at) in pending.items()]
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning("Could not persist completions: %s", e)
+
+    def clear(self) -> None:
+        """Drop every cached completion, in memory and on disk"""
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+            self._bytes = 0
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM completions")
+                self._db.commit()
+
+    def close(self) -> None:
+        """Write any pending completions and close the SQLite connection"""
+        self._stop.set()
+        flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            flusher.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "persistent": self._db is not None
+            }
+
+    def _store(self, key: str, value: str, expires_at: float) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, expires_at)
+        self._bytes += self._size(key, value)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions += 1
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._bytes -= self._size(key, value)
+
+    @staticmethod
+    def _size(key: str, value: str) -> int:
+        return len(key) + len(value.encode("utf-8"))
@@ -0,0 +1,43 @@
+import asyncio
+import time
+from typing import Optional, Awaitable, TypeVar
+from config.settings import settings
+
+T = TypeVar("T")
+
+class Deadline:
+    """End-to-end latency budget for a single request, shared by every provider attempt"""
+
+    def __init__(self, seconds: float, endpoint: str = ""):
+        self.endpoint = endpoint
+        self.budget = seconds
+        self._expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def for_endpoint(cls, endpoint: str) -> "Deadline":
+        """Start a deadline using the endpoint's configured latency budget"""
+        seconds = settings.AI_LATENCY_BUDGETS.get(endpoint, settings.AI_DEFAULT_LATENCY_BUDGET_SECONDS)
+        return cls(seconds, endpoint)
+
+    def remaining(self) -> float:
+        """Seconds left in the budget (never negative)"""
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout_for(self, timeout: float) -> float:
+        """Cap a provider's own timeout by what is left of the budget"""
+        return min(timeout, self.remaining())
+
+async def within_deadline(awaitable: Awaitable[T], deadline: Optional[Deadline]) -> T:
+    """Await with the remaining budget as a timeout, raising asyncio.TimeoutError once it runs out"""
+    if deadline is None:
+        return await awaitable
+    if deadline.expired:
+        # Close the un-awaited coroutine so it doesn't warn about never being awaited
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise asyncio.TimeoutError(f"Latency budget for {deadline.endpoint or 'request'} exhausted")
+    return await asyncio.wait_for(awaitable, timeout=deadline.remaining())
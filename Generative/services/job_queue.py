@@ -0,0 +1,251 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+class JobQueue:
+    """
+    SQLite-backed queue for long-running AI generations, drained by a pool of asyncio workers.
+
+    Submitting a job only writes a row and returns its id, so the HTTP request finishes
+    straight away and generation throughput is set by the worker count instead of by how
+    many connections proxies will hold open. Jobs that were queued or still running when
+    the process stopped are picked up again on the next start, up to max_attempts runs;
+    a job that keeps crashing or hanging the worker is then marked failed. A graceful stop
+    puts the job it interrupted back without using up one of its attempts.
+
+    The queue methods are blocking SQLite calls: the workers run them in a worker thread,
+    and coroutines should do the same (asyncio.to_thread) rather than call them directly.
+    The database is opened on first use, normally by start().
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        workers: Optional[int] = None,
+        retention_hours: Optional[float] = None,
+        poll_interval: float = 1.0,
+        max_attempts: Optional[int] = None
+    ):
+        self.path = path if path is not None else settings.JOB_QUEUE_DB_PATH
+        self.worker_count = max(1, workers if workers is not None else settings.JOB_WORKERS)
+        self.retention_hours = retention_hours if retention_hours is not None else settings.JOB_RETENTION_HOURS
+        self.poll_interval = poll_interval
+        self.max_attempts = max(1, max_attempts if max_attempts is not None else settings.JOB_MAX_ATTEMPTS)
+        self._handlers: Dict[str, JobHandler] = {}
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """The queue database, opened on first use (call with the lock held)"""
+        if self._db is None:
+            try:
+                self._db = self._open(self.path or ":memory:")
+            except sqlite3.Error as e:
+                logger.warning("Could not open job queue database, jobs will not survive a restart: %s", e)
+                self._db = self._open(":memory:")
+        return self._db
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, "
+            "result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        db.commit()
+        return db
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Set the coroutine that runs jobs of this kind"""
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a job and return it without waiting for it to run"""
+        now = datetime.now().isoformat()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            db = self._connection()
+            db.execute(
+                "INSERT INTO jobs (id, kind, payload, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(payload), now, now)
+            )
+            db.commit()
+        wakeup, loop = self._wakeup, self._loop
+        if wakeup is not None:
+            # submit() normally runs in a worker thread, and asyncio.Event isn't thread-safe
+            loop.call_soon_threadsafe(wakeup.set)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job's status, plus its result or error once it has finished"""
+        with self._lock:
+            db = self._connection()
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "payload": json.loads(row["payload"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"]
+        }
+
+    def _exhausted_error(self, attempts: int) -> str:
+        return f"Gave up after {attempts} attempt(s): the job never finished (the worker crashed or was stopped while running it)"
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job as running and return it, failing any that are out of attempts"""
+        with self._lock:
+            db = self._connection()
+            while True:
+                row = db.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    return None
+                now = datetime.now().isoformat()
+                if row["attempts"] >= self.max_attempts:
+                    db.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                        (self._exhausted_error(row["attempts"]), now, row["id"])
+                    )
+                    db.commit()
+                    logger.warning("Job %s (%s) failed: out of attempts", row["id"], row["kind"])
+                    continue
+                db.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (now, row["id"])
+                )
+                db.commit()
+                return self._to_job(row)
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            db = self._connection()
+            db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, datetime.now().isoformat(), job_id)
+            )
+            db.commit()
+
+    def _requeue(self, job_id: str) -> None:
+        """Put a job interrupted by a graceful stop back in the queue, giving back the attempt it used"""
+        with self._lock:
+            db = self._connection()
+            db.execute(
+                "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), updated_at = ? WHERE id = ?",
+                (datetime.now().isoformat(), job_id)
+            )
+            db.commit()
+
+    def _recover(self) -> None:
+        """Requeue jobs interrupted by the last shutdown and drop finished ones past retention"""
+        cutoff = (datetime.now() - timedelta(hours=self.retention_hours)).isoformat()
+        with self._lock:
+            db = self._connection()
+            exhausted = db.execute(
+                "SELECT id, attempts FROM jobs WHERE status = 'running' AND attempts >= ?", (self.max_attempts,)
+            ).fetchall()
+            for row in exhausted:
+                db.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                    (self._exhausted_error(row["attempts"]), datetime.now().isoformat(), row["id"])
+                )
+            recovered = db.execute(
+                "UPDATE jobs SET status = 'queued' WHERE status = 'running'"
+            ).rowcount
+            db.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?", (cutoff,)
+            )
+            db.commit()
+        if exhausted:
+            logger.warning("Failed %d job(s) that were interrupted on every one of their %d attempts", len(exhausted), self.max_attempts)
+        if recovered:
+            logger.info("Requeued %d job(s) interrupted by the last shutdown", recovered)
+
+    async def start(self) -> None:
+        """Open the database, recover unfinished jobs and start the worker pool on the running event loop"""
+        if self._workers:
+            return
+        await asyncio.to_thread(self._recover)
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+        logger.info("Job queue started with %d worker(s)", self.worker_count)
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running go back to the queue"""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._wakeup = None
+        self._loop = None
+
+    async def _worker(self) -> None:
+        while True:
+            job = await asyncio.to_thread(self._claim)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            await asyncio.to_thread(self._finish, job["job_id"], "failed", error=f"Unknown job kind: {job['kind']}")
+            return
+        try:
+            result = await handler(job["payload"])
+        except asyncio.CancelledError:
+            # Shutting down mid-job: leave it for the next start rather than losing it
+            await asyncio.to_thread(self._requeue, job["job_id"])
+            raise
+        except Exception as e:
+            logger.warning("Job %s (%s) failed: %s", job["job_id"], job["kind"], e)
+            await asyncio.to_thread(self._finish, job["job_id"], "failed", error=str(e))
+        else:
+            await asyncio.to_thread(self._finish, job["job_id"], "succeeded", result=result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Queue depth by status for the status endpoint"""
+        with self._lock:
+            db = self._connection()
+            rows = db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {
+            "workers": len(self._workers),
+            "persistent": bool(self.path),
+            "jobs": {status: count for status, count in rows}
+        }
+
+
+# Global job queue instance
+job_queue = JobQueue()
@@ -0,0 +1,189 @@
+import bisect
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        return self._values.get(key, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        entry = self._values.get(key)
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', le))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """In-process metrics store rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        # Re-registering returns the existing metric so module reloads don't duplicate series
+        return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+# AI provider calls
+provider_latency = metrics.histogram(
+    "ai_provider_request_duration_seconds",
+    "Latency of individual AI provider calls",
+    ["provider", "endpoint"]
+)
+provider_requests = metrics.counter(
+    "ai_provider_requests_total",
+    "AI provider calls by outcome (success, empty, http_error, timeout, error, cancelled)",
+    ["provider", "endpoint", "outcome"]
+)
+provider_first_token = metrics.histogram(
+    "ai_provider_first_token_seconds",
+    "Time to first streamed token",
+    ["provider", "endpoint"]
+)
+prompt_size = metrics.histogram(
+    "ai_prompt_size_chars",
+    "Size of prompts sent to the provider cascade",
+    ["endpoint"],
+    SIZE_BUCKETS
+)
+response_size = metrics.histogram(
+    "ai_response_size_chars",
+    "Size of successful provider responses",
+    ["provider"],
+    SIZE_BUCKETS
+)
+provider_retries = metrics.counter(
+    "ai_provider_retries_total",
+    "Provider calls retried after a transient failure, by reason (HTTP status or connect_error)",
+    ["provider", "reason"]
+)
+rate_limited = metrics.counter(
+    "ai_rate_limited_total",
+    "Provider calls skipped because the client-side rate limit would have been exceeded",
+    ["provider"]
+)
+
+# Response handling
+parse_failures = metrics.counter(
+    "ai_response_parse_failures_total",
+    "AI responses that could not be parsed into the expected JSON",
+    ["kind"]
+)
+dropped_items = metrics.counter(
+    "ai_response_items_dropped_total",
+    "Items left out of a parsed AI response because they failed validation",
+    ["kind", "section"]
+)
+static_fallbacks = metrics.counter(
+    "ai_static_fallback_total",
+    "Requests answered from the static fallback because no provider produced a usable response",
+    ["kind"]
+)
+cache_lookups = metrics.counter(
+    "ai_completion_cache_lookups_total",
+    "Completion cache lookups by result (hit, miss)",
+    ["result"]
+)
+
+# Logging
+log_records_dropped = metrics.counter(
+    "log_records_dropped_total",
+    "Log records dropped because the background log queue was full"
+)
+
+# Tracing
+trace_spans_dropped = metrics.counter(
+    "trace_spans_dropped_total",
+    "Trace spans dropped because the span export queue was full"
+)
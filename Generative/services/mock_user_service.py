@@ -1,8 +1,12 @@
+import logging
 import uuid
 from datetime import datetime
 from typing import Optional, Dict, Any
 from models.schemas import User, UserCreate, UserUpdate
 from services.auth_service import auth_service
+from services.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 # In-memory user storage for demo purposes
 MOCK_USERS = {}
@@ -13,6 +17,7 @@ class MockUserService:
     def __init__(self):
         pass
     
+    @traced()
     async def create_user(self, user_data: UserCreate) -> Optional[User]:
         """Create a new user"""
         # Check if user already exists
@@ -49,6 +54,7 @@ class MockUserService:
             updated_at=now
         )
     
+    @traced()
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email"""
         for user_data in MOCK_USERS.values():
@@ -56,6 +62,7 @@ class MockUserService:
                 return user_data
         return None
     
+    @traced()
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID"""
         user_data = MOCK_USERS.get(user_id)
@@ -71,6 +78,7 @@ class MockUserService:
             )
         return None
     
+    @traced()
     async def update_user(self, user_id: str, user_update: UserUpdate) -> Optional[User]:
         """Update user information"""
         if user_id not in MOCK_USERS:
@@ -91,6 +99,7 @@ class MockUserService:
         # Return updated user
         return await self.get_user_by_id(user_id)
     
+    @traced()
     async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password"""
         user_data = await self.get_user_by_email(email)
@@ -119,7 +128,7 @@ try:
         user_service = real_service
     else:
         user_service = MockUserService()
-        print("Using mock user service (Firestore not available)")
+        logger.info("Using mock user service (Firestore not available)")
 except Exception:
     user_service = MockUserService()
-    print("Using mock user service (Firestore not available)")
\ No newline at end of file
+    logger.info("Using mock user service (Firestore not available)")
\ No newline at end of file
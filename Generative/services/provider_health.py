@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import time
+import httpx
+from datetime import datetime
+from typing import Optional, Dict, Any
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Local providers that are enabled by default but may simply not be running; they are
+# left out of the cascade until a probe has reached them
+PROBE_BEFORE_USE = ("ollama",)
+
+class ProviderHealthMonitor:
+    """
+    Background prober that checks every configured AI provider with a cheap request
+    (model listing / whoami) and keeps an in-memory health and latency table.
+
+    The provider cascade reads this table so that no user request pays for discovering
+    that a provider is down or that its API key has been revoked.
+    """
+
+    def __init__(self, ai_service, interval: Optional[float] = None, timeout: Optional[float] = None):
+        self.ai_service = ai_service
+        self.interval = interval or settings.AI_HEALTH_CHECK_INTERVAL_SECONDS
+        self.timeout = timeout or settings.AI_HEALTH_CHECK_TIMEOUT_SECONDS
+        self._table: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def is_healthy(self, provider: str) -> bool:
+        """
+        Whether the provider passed its last probe. Providers not probed yet count as
+        healthy, except the PROBE_BEFORE_USE ones, which have to pass a probe first.
+        """
+        entry = self._table.get(provider)
+        if entry is None:
+            return provider not in PROBE_BEFORE_USE
+        return entry["healthy"]
+
+    def get_latency_ms(self, provider: str) -> Optional[float]:
+        """Latency of the provider's last successful probe"""
+        entry = self._table.get(provider)
+        return entry["latency_ms"] if entry and entry["healthy"] else None
+
+    async def check_provider(self, provider: str) -> Dict[str, Any]:
+        """Probe a single provider and update its entry in the health table"""
+        request = self.ai_service._build_health_check_request(provider)
+        previous = self._table.get(provider, {})
+        entry = {
+            "healthy": False,
+            "status_code": None,
+            "latency_ms": None,
+            "error": None,
+            "checked_at": datetime.utcnow().isoformat(),
+            "consecutive_failures": previous.get("consecutive_failures", 0)
+        }
+
+        started = time.perf_counter()
+        try:
+            response = await self._get_client().get(request["url"], headers=request["headers"])
+            entry["status_code"] = response.status_code
+            entry["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            entry["healthy"] = response.status_code == 200
+            if not entry["healthy"]:
+                entry["error"] = f"HTTP {response.status_code}"
+        except Exception as e:
+            entry["error"] = str(e)[:200] or type(e).__name__
+
+        entry["consecutive_failures"] = 0 if entry["healthy"] else entry["consecutive_failures"] + 1
+        self._table[provider] = entry
+        return entry
+
+    async def check_all(self) -> Dict[str, Dict[str, Any]]:
+        """Probe every configured provider concurrently"""
+        providers = [name for name, configured in self.ai_service.fallback_apis.items() if configured]
+        await asyncio.gather(*(self.check_provider(provider) for provider in providers))
+        return self.snapshot()
+
+    async def _run(self) -> None:
+        """Probe loop - runs until stop() is called"""
+        while True:
+            try:
+                await self.check_all()
+            except Exception as e:
+                logger.warning("Provider health check failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the background probe loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the probe loop and close its HTTP client"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Health table for every provider, including ones that are not configured"""
+        table = {}
+        for provider, configured in self.ai_service.fallback_apis.items():
+            entry = self._table.get(provider)
+            table[provider] = {
+                **(entry or {}),
+                "configured": bool(configured),
+                "healthy": bool(configured) and self.is_healthy(provider),
+                "probed": entry is not None
+            }
+        return table
@@ -0,0 +1,116 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional, Sequence, Tuple
+from config.settings import settings
+
+class ProviderRouter:
+    """
+    Orders the provider cascade by what each provider has actually delivered lately.
+
+    Every call's latency and success is kept in a moving window per provider. Providers
+    are ranked by p90 latency divided by success ratio (lower is better), so a fast but
+    flaky backend loses to a slightly slower reliable one. Providers without enough
+    samples yet rank first so they get measured, keeping the static order on cold start.
+
+    The same window picks between the Gemini SDK and REST transports. Setting
+    AI_PROVIDER_ORDER pins a fixed order and AI_GEMINI_TRANSPORT pins the transport.
+    """
+
+    TRANSPORTS = ("sdk", "rest")
+
+    # Score for a provider whose every recent call failed
+    FAILED_SCORE = 1e6
+
+    def __init__(
+        self,
+        default_order: Sequence[str],
+        window: Optional[int] = None,
+        min_samples: Optional[int] = None,
+        pinned_order: Optional[Sequence[str]] = None,
+        pinned_transport: Optional[str] = None
+    ):
+        self.default_order = list(default_order)
+        self.window = window or settings.AI_ROUTING_WINDOW
+        self.min_samples = min_samples or settings.AI_ROUTING_MIN_SAMPLES
+        self.pinned_order = list(pinned_order if pinned_order is not None else settings.AI_PROVIDER_ORDER)
+        transport = pinned_transport if pinned_transport is not None else settings.AI_GEMINI_TRANSPORT
+        self.pinned_transport = transport if transport in self.TRANSPORTS else None
+        self.adaptive = settings.AI_ADAPTIVE_ROUTING_ENABLED and not self.pinned_order
+        self._samples: Dict[str, Deque[Tuple[float, bool]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, latency: float, success: bool) -> None:
+        """Add one call's latency (seconds) and outcome to a provider's or transport's window"""
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append((latency, success))
+
+    def stats(self, name: str) -> Dict[str, Any]:
+        """Latency percentiles and success ratio over the window"""
+        with self._lock:
+            samples = list(self._samples.get(name, ()))
+        latencies = sorted(latency for latency, success in samples if success)
+        successes = len(latencies)
+        return {
+            "samples": len(samples),
+            "success_rate": round(successes / len(samples), 3) if samples else None,
+            "p50_seconds": self._percentile(latencies, 0.5),
+            "p90_seconds": self._percentile(latencies, 0.9)
+        }
+
+    def score(self, name: str) -> Optional[float]:
+        """Ranking score (lower is better), or None until there are enough samples"""
+        stats = self.stats(name)
+        if stats["samples"] < self.min_samples:
+            return None
+        if not stats["success_rate"]:
+            return self.FAILED_SCORE
+        return stats["p90_seconds"] / stats["success_rate"]
+
+    def order(self, providers: Optional[Sequence[str]] = None) -> List[str]:
+        """Providers in the order the cascade should try them"""
+        providers = list(providers if providers is not None else self.default_order)
+        if self.pinned_order:
+            pinned = [provider for provider in self.pinned_order if provider in providers]
+            return pinned + [provider for provider in providers if provider not in pinned]
+        if not self.adaptive:
+            return providers
+        # Unmeasured providers sort first (stable, so the static order breaks ties)
+        scores = {provider: self.score(provider) for provider in providers}
+        return sorted(providers, key=lambda provider: -1.0 if scores[provider] is None else scores[provider])
+
+    def choose_transport(self) -> str:
+        """Whether the next Gemini call should go through the SDK or REST"""
+        if self.pinned_transport:
+            return self.pinned_transport
+        if not self.adaptive:
+            return "sdk"
+        counts = {transport: self.stats(f"google_genai:{transport}")["samples"] for transport in self.TRANSPORTS}
+        undersampled = [transport for transport in self.TRANSPORTS if counts[transport] < self.min_samples]
+        if undersampled:
+            # Measure both paths before committing to one
+            return min(undersampled, key=lambda transport: counts[transport])
+        return min(self.TRANSPORTS, key=lambda transport: self.score(f"google_genai:{transport}"))
+
+    def record_transport(self, transport: str, latency: float, success: bool) -> None:
+        """Record a Gemini call against the transport that served it"""
+        self.record(f"google_genai:{transport}", latency, success)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Routing table for the status endpoint"""
+        names = self.default_order + [f"google_genai:{transport}" for transport in self.TRANSPORTS]
+        return {
+            "mode": "pinned" if self.pinned_order else "adaptive" if self.adaptive else "static",
+            "order": self.order(),
+            "gemini_transport": self.pinned_transport or ("adaptive" if self.adaptive else "sdk"),
+            "providers": {name: {**self.stats(name), "score": self.score(name)} for name in names}
+        }
+
+    @staticmethod
+    def _percentile(values: List[float], fraction: float) -> Optional[float]:
+        if not values:
+            return None
+        index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+        return round(values[index], 4)
@@ -0,0 +1,180 @@
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class QuotaLedger:
+    """
+    Persistent per-provider, per-day tally of requests and tokens, checked against the
+    free-tier daily quotas in AI_DAILY_QUOTAS.
+
+    The provider cascade consults it to push providers that are running low behind the
+    others and to stop calling one that is about to hit its cap, rather than finding out
+    from a run of 429s. Counts live in SQLite so a restart doesn't reset the day's usage.
+
+    The in-memory tally is updated on every call; SQLite writes are batched and made by a
+    background thread every AI_QUOTA_FLUSH_SECONDS (and on close), so recording usage
+    never blocks the event loop on disk I/O. A crash loses at most one flush interval.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        quotas: Optional[Dict[str, Dict[str, int]]] = None,
+        stop_ratio: Optional[float] = None,
+        low_ratio: Optional[float] = None,
+        utc_offset_hours: Optional[float] = None,
+        flush_interval: Optional[float] = None
+    ):
+        self.path = path if path is not None else settings.AI_QUOTA_DB_PATH
+        self.quotas = quotas if quotas is not None else settings.AI_DAILY_QUOTAS
+        self.stop_ratio = stop_ratio if stop_ratio is not None else settings.AI_QUOTA_STOP_RATIO
+        self.low_ratio = low_ratio if low_ratio is not None else settings.AI_QUOTA_LOW_RATIO
+        offset = utc_offset_hours if utc_offset_hours is not None else settings.AI_QUOTA_RESET_UTC_OFFSET_HOURS
+        self._timezone = timezone(timedelta(hours=offset))
+        self.flush_interval = flush_interval if flush_interval is not None else settings.AI_QUOTA_FLUSH_SECONDS
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._day = self._today()
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self._warned = set()
+        # Usage not yet written to SQLite, by (day, provider)
+        self._pending: Dict[Tuple[str, str], List[int]] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._db: Optional[sqlite3.Connection] = None
+
+        try:
+            self._db = sqlite3.connect(self.path or ":memory:", check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS provider_usage ("
+                "day TEXT NOT NULL, provider TEXT NOT NULL, requests INTEGER NOT NULL, tokens INTEGER NOT NULL, "
+                "PRIMARY KEY (day, provider))"
+            )
+            self._db.commit()
+            self._load_day()
+        except sqlite3.Error as e:
+            logger.warning("Could not open quota ledger database: %s", e)
+            self._db = None
+
+    def _today(self) -> str:
+        return datetime.now(self._timezone).date().isoformat()
+
+    def _load_day(self) -> None:
+        self._usage = {}
+        if self._db is None:
+            return
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT provider, requests, tokens FROM provider_usage WHERE day = ?", (self._day,)
+            ).fetchall()
+        for provider, requests, tokens in rows:
+            self._usage[provider] = {"requests": requests, "tokens": tokens}
+
+    def _roll_over(self) -> None:
+        """Start a fresh tally when the quota day changes"""
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._warned.clear()
+            self._load_day()
+
+    def record(self, provider: str, requests: int = 1, tokens: int = 0) -> None:
+        """Add a call's usage to today's tally"""
+        with self._lock:
+            self._roll_over()
+            usage = self._usage.setdefault(provider, {"requests": 0, "tokens": 0})
+            usage["requests"] += requests
+            usage["tokens"] += tokens
+            if self._db is None:
+                return
+            pending = self._pending.setdefault((self._day, provider), [0, 0])
+            pending[0] += requests
+            pending[1] += tokens
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_periodically, name="quota-ledger-flush", daemon=True)
+                self._flusher.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write usage recorded since the last flush to SQLite in one transaction"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        with self._db_lock:
+            if self._db is None:
+                return
+            try:
+                self._db.executemany(
+                    "INSERT INTO provider_usage (day, provider, requests, tokens) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(day, provider) DO UPDATE SET "
+                    "requests = requests + excluded.requests, tokens = tokens + excluded.tokens",
+                    [(day, provider, requests, tokens) for (day, provider), (requests, tokens) in pending.items()]
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning("Could not record provider usage: %s", e)
+
+    def usage(self, provider: str) -> Dict[str, int]:
+        """Requests and tokens used today"""
+        with self._lock:
+            self._roll_over()
+            return dict(self._usage.get(provider, {"requests": 0, "tokens": 0}))
+
+    def headroom(self, provider: str) -> float:
+        """Fraction of today's tightest quota still unused (1.0 when the provider has no quota)"""
+        quota = self.quotas.get(provider, {})
+        usage = self.usage(provider)
+        remaining = [
+            max(0.0, 1 - usage[kind] / limit)
+            for kind, limit in (("requests", quota.get("requests", 0)), ("tokens", quota.get("tokens", 0)))
+            if limit
+        ]
+        return min(remaining) if remaining else 1.0
+
+    def is_exhausted(self, provider: str) -> bool:
+        """Whether the provider is close enough to its daily cap that it should not be called"""
+        exhausted = self.headroom(provider) <= 1 - self.stop_ratio
+        if exhausted and provider not in self._warned:
+            self._warned.add(provider)
+            logger.warning("%s has used %.0f%% of its daily quota; skipping it until the quota resets", provider, self.stop_ratio * 100, extra={"provider": provider})
+        return exhausted
+
+    def rank(self, providers: Sequence[str]) -> List[str]:
+        """Drop providers at their cap and move ones running low behind the rest, keeping relative order"""
+        available = [provider for provider in providers if not self.is_exhausted(provider)]
+        plenty = [provider for provider in available if self.headroom(provider) > self.low_ratio]
+        return plenty + [provider for provider in available if provider not in plenty]
+
+    def close(self) -> None:
+        """Write any pending usage and close the SQLite connection"""
+        self._stop.set()
+        flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            flusher.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Today's usage against quota for the status endpoint"""
+        providers = {}
+        for provider in sorted(set(self.quotas) | set(self._usage)):
+            quota = self.quotas.get(provider, {})
+            providers[provider] = {
+                "used": self.usage(provider),
+                "quota": {"requests": quota.get("requests", 0), "tokens": quota.get("tokens", 0)},
+                "headroom": round(self.headroom(provider), 3),
+                "exhausted": self.headroom(provider) <= 1 - self.stop_ratio
+            }
+        return {"day": self._day, "persistent": bool(self.path) and self._db is not None, "providers": providers}
@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+from typing import Optional, Dict, Any
+from config.settings import settings
+from services.deadline import Deadline
+
+class TokenBucket:
+    """Classic token bucket: holds up to `capacity` tokens, refilled continuously at `rate` per second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are now)"""
+        self._refill()
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+    def give_back(self, amount: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ProviderRateLimiter:
+    """
+    Client-side requests-per-minute and tokens-per-minute limits for one AI provider.
+
+    A call that fits the buckets goes straight through. One that doesn't may wait in a
+    short bounded queue (at most `max_wait` seconds, at most `max_queue` waiters); if
+    it still wouldn't fit in time, acquire() returns False and the cascade moves on to
+    the next provider instead of spending a round trip on a certain 429.
+    A limit of 0 disables that bucket.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rpm: int = 0,
+        tpm: int = 0,
+        max_wait: Optional[float] = None,
+        max_queue: Optional[int] = None
+    ):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_wait = settings.AI_RATE_LIMIT_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        self.max_queue = settings.AI_RATE_LIMIT_MAX_QUEUE if max_queue is None else max_queue
+        self._requests = TokenBucket(rpm, rpm / 60) if rpm else None
+        self._tokens = TokenBucket(tpm, tpm / 60) if tpm else None
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._admitted = 0
+        self._waited = 0
+        self._rejected = 0
+
+    @classmethod
+    def from_settings(cls, name: str) -> "ProviderRateLimiter":
+        """Build a limiter from the provider's AI_RATE_LIMITS entry"""
+        limits = settings.AI_RATE_LIMITS.get(name, {})
+        return cls(name, rpm=limits.get("rpm", 0), tpm=limits.get("tpm", 0))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._requests or self._tokens)
+
+    def _try_reserve(self, tokens: int) -> float:
+        """Take one request and `tokens` tokens if both fit, otherwise return how long to wait"""
+        with self._lock:
+            if self._tokens:
+                tokens = min(tokens, self._tokens.capacity)
+            wait = max(
+                self._requests.wait_time(1) if self._requests else 0.0,
+                self._tokens.wait_time(tokens) if self._tokens else 0.0
+            )
+            if wait == 0:
+                if self._requests:
+                    self._requests.take(1)
+                if self._tokens:
+                    self._tokens.take(tokens)
+                self._admitted += 1
+            return wait
+
+    def _join_queue(self, wait: float, budget: float) -> bool:
+        with self._lock:
+            if wait > budget or self._waiting >= self.max_queue:
+                self._rejected += 1
+                return False
+            self._waiting += 1
+            self._waited += 1
+            return True
+
+    def _leave_queue(self) -> None:
+        with self._lock:
+            self._waiting -= 1
+
+    def _reject(self) -> bool:
+        with self._lock:
+            self._rejected += 1
+        return False
+
+    def _wait_budget(self, deadline: Optional[Deadline]) -> float:
+        return min(self.max_wait, deadline.remaining()) if deadline else self.max_wait
+
+    async def acquire(self, tokens: int, deadline: Optional[Deadline] = None) -> bool:
+        """Reserve capacity for one call, waiting briefly if needed; False means skip this provider"""
+        if not self.enabled:
+            return True
+        wait = self._try_reserve(tokens)
+        if wait == 0:
+            return True
+        budget = self._wait_budget(deadline)
+        if not self._join_queue(wait, budget):
+            return False
+        give_up_at = time.monotonic() + budget
+        try:
+            while True:
+                await asyncio.sleep(wait)
+                wait = self._try_reserve(tokens)
+                if wait == 0:
+                    return True
+                if time.monotonic() + wait > give_up_at:
+                    return self._reject()
+        finally:
+            self._leave_queue()
+
+    def acquire_sync(self, tokens: int, deadline: Optional[Deadline] = None) -> bool:
+        """Blocking counterpart of acquire() for the sync cascade"""
+        if not self.enabled:
+            return True
+        wait = self._try_reserve(tokens)
+        if wait == 0:
+            return True
+        budget = self._wait_budget(deadline)
+        if not self._join_queue(wait, budget):
+            return False
+        give_up_at = time.monotonic() + budget
+        try:
+            while True:
+                time.sleep(wait)
+                wait = self._try_reserve(tokens)
+                if wait == 0:
+                    return True
+                if time.monotonic() + wait > give_up_at:
+                    return self._reject()
+        finally:
+            self._leave_queue()
+
+    def settle(self, reserved_tokens: int, used_tokens: int) -> None:
+        """Correct the token bucket once the real usage of a call is known"""
+        if not self._tokens:
+            return
+        with self._lock:
+            # _try_reserve never takes more than the bucket holds, so neither is refunded
+            difference = min(reserved_tokens, self._tokens.capacity) - used_tokens
+            if difference > 0:
+                self._tokens.give_back(difference)
+            else:
+                self._tokens.take(-difference)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Limiter state for the status endpoint"""
+        with self._lock:
+            for bucket in (self._requests, self._tokens):
+                if bucket:
+                    bucket.wait_time(0)
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "available_requests": round(self._requests.tokens, 2) if self._requests else None,
+                "available_tokens": round(self._tokens.tokens) if self._tokens else None,
+                "waiting": self._waiting,
+                "admitted": self._admitted,
+                "waited": self._waited,
+                "rejected": self._rejected
+            }
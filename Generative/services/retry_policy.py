@@ -0,0 +1,163 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+import httpx
+import requests
+from config.settings import settings
+from services.deadline import Deadline
+
+T = TypeVar("T")
+
+OnRetry = Callable[[int, BaseException, float], None]
+
+# Transport failures where the request most likely never reached the model
+CONNECTION_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.RemoteProtocolError,
+    httpx.ReadError,
+    httpx.WriteError,
+    requests.exceptions.ConnectionError,
+)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed call to one AI provider.
+
+    Only transient failures are retried: 408/425/429, 5xx and dropped or refused
+    connections. Auth and other 4xx errors fail straight away. Waits use capped
+    exponential backoff with full jitter, a server's Retry-After is honoured, and no
+    retry is started that could not finish inside the request's latency budget.
+    """
+
+    RETRYABLE_STATUSES = {408, 425, 429}
+
+    def __init__(
+        self,
+        name: str,
+        max_retries: int = 0,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        max_retry_after: Optional[float] = None
+    ):
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = settings.AI_RETRY_MAX_RETRY_AFTER_SECONDS if max_retry_after is None else max_retry_after
+
+    @classmethod
+    def from_settings(cls, name: str) -> "RetryPolicy":
+        """Build a policy from the provider's AI_RETRY_POLICIES entry"""
+        policy = settings.AI_RETRY_POLICIES.get(name, {})
+        return cls(
+            name,
+            max_retries=int(policy.get("max_retries", 0)),
+            base_delay=policy.get("base_delay", 0.25),
+            max_delay=policy.get("max_delay", 4.0)
+        )
+
+    @staticmethod
+    def status_of(error: BaseException) -> Optional[int]:
+        """HTTP status carried by a provider or SDK error, if any"""
+        for attribute in ("status_code", "code"):
+            status = getattr(error, attribute, None)
+            if isinstance(status, int):
+                return status
+        return None
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Whether the failure is transient and worth another attempt"""
+        if isinstance(error, CONNECTION_ERRORS):
+            return True
+        status = self.status_of(error)
+        return status is not None and (status in self.RETRYABLE_STATUSES or status >= 500)
+
+    @classmethod
+    def reason(cls, error: BaseException) -> str:
+        """Short label for why a call is being retried (metrics and logs)"""
+        status = cls.status_of(error)
+        if status is not None:
+            return str(status)
+        return "connect_error" if isinstance(error, CONNECTION_ERRORS) else "error"
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def next_delay(self, attempt: int, error: BaseException, deadline: Optional[Deadline] = None) -> Optional[float]:
+        """Seconds to wait before retrying after `attempt` failed attempts, or None to give up"""
+        if attempt >= self.max_retries or not self.is_retryable(error):
+            return None
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            delay = retry_after
+        else:
+            delay = self.backoff(attempt)
+        if deadline is not None and delay >= deadline.remaining():
+            # Waiting would use up the budget before the retry could even start
+            return None
+        return delay
+
+    async def call(
+        self,
+        work: Callable[[], Awaitable[T]],
+        deadline: Optional[Deadline] = None,
+        on_retry: Optional[OnRetry] = None
+    ) -> T:
+        """Await work(), retrying transient failures"""
+        attempt = 0
+        while True:
+            try:
+                return await work()
+            except Exception as e:
+                delay = self.next_delay(attempt, e, deadline)
+                if delay is None:
+                    raise
+                if on_retry:
+                    on_retry(attempt + 1, e, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def call_sync(
+        self,
+        work: Callable[[], T],
+        deadline: Optional[Deadline] = None,
+        on_retry: Optional[OnRetry] = None
+    ) -> T:
+        """Blocking counterpart of call() for the sync cascade"""
+        attempt = 0
+        while True:
+            try:
+                return work()
+            except Exception as e:
+                delay = self.next_delay(attempt, e, deadline)
+                if delay is None:
+                    raise
+                if on_retry:
+                    on_retry(attempt + 1, e, delay)
+            time.sleep(delay)
+            attempt += 1
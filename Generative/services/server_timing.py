@@ -0,0 +1,204 @@
+import asyncio
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from config.settings import settings
+from services.tracing import set_route
+
+logger = logging.getLogger(__name__)
+
+# Human-readable names shown in browser devtools for each phase
+SPAN_DESCRIPTIONS = {
+    "auth": "Auth lookup",
+    "ai_service": "AIService",
+    "provider": "Provider network",
+    "json": "JSON extraction",
+    "validate": "Validation",
+    "serialize": "Serialization",
+    "total": "Total",
+}
+
+
+class RequestTiming:
+    """
+    Named spans recorded while serving one request.
+
+    Spans with the same name add up, so concurrent or retried provider calls show as
+    their combined time with a count; that total can exceed the request's wall time.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, Dict[str, Any]] = {}
+        self.endpoint_finished: Optional[float] = None
+
+    def record(self, name: str, seconds: float, detail: Optional[str] = None) -> None:
+        span = self.spans.setdefault(name, {"seconds": 0.0, "count": 0, "details": []})
+        span["seconds"] += seconds
+        span["count"] += 1
+        if detail and detail not in span["details"]:
+            span["details"].append(detail)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def _description(self, name: str, span: Dict[str, Any]) -> str:
+        description = SPAN_DESCRIPTIONS.get(name, name)
+        if span["details"]:
+            description += f" ({', '.join(span['details'])})"
+        if span["count"] > 1:
+            description += f" x{span['count']}"
+        return description
+
+    def header(self, total: Optional[float] = None) -> str:
+        """Server-Timing header value, ending with the total so far"""
+        entries = [
+            f'{name};desc="{self._description(name, span)}";dur={span["seconds"] * 1000:.1f}'
+            for name, span in self.spans.items()
+        ]
+        entries.append(f'total;desc="Total";dur={(self.elapsed() if total is None else total) * 1000:.1f}')
+        return ", ".join(entries)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {"dur_ms": round(span["seconds"] * 1000, 2), "count": span["count"], **({"details": span["details"]} if span["details"] else {})}
+            for name, span in self.spans.items()
+        }
+
+
+_current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+def current_timing() -> Optional[RequestTiming]:
+    return _current_timing.get()
+
+@contextmanager
+def activate(timing: Optional[RequestTiming] = None) -> Iterator[RequestTiming]:
+    """Collect spans into `timing` (or a new one) for the code run inside the block"""
+    timing = timing or RequestTiming()
+    token = _current_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _current_timing.reset(token)
+
+def record(name: str, seconds: float, detail: Optional[str] = None) -> None:
+    """Add a span to the current request, if one is being timed"""
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.record(name, seconds, detail)
+
+@contextmanager
+def timed(name: str, detail: Optional[str] = None) -> Iterator[None]:
+    """Time the block as a span of the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started, detail)
+
+
+class ServerTimingMiddleware:
+    """
+    Times every HTTP request and returns its spans in a Server-Timing header.
+
+    Plain ASGI rather than BaseHTTPMiddleware so the context variable reaches route
+    handlers and streaming responses aren't buffered. The same spans are logged as one
+    structured record when the response completes; for streamed responses that record
+    also covers work done after the headers went out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (settings.SERVER_TIMING_ENABLED or settings.SERVER_TIMING_LOG_ENABLED):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        with activate() as timing:
+            async def send_with_timing(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if settings.SERVER_TIMING_ENABLED:
+                        headers = MutableHeaders(scope=message)
+                        headers.append("Server-Timing", timing.header())
+                        # Cross-origin pages (the React frontend) only see the timings with this
+                        origin = Headers(scope=scope).get("origin")
+                        if origin and origin in settings.ALLOWED_ORIGINS:
+                            headers.append("Timing-Allow-Origin", origin)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                if settings.SERVER_TIMING_LOG_ENABLED:
+                    logger.info(
+                        "%s %s %d",
+                        scope.get("method"), scope.get("path"), status_code,
+                        extra={
+                            "event": "server_timing",
+                            "method": scope.get("method"),
+                            "path": scope.get("path"),
+                            "status": status_code,
+                            "total_ms": round(timing.elapsed() * 1000, 2),
+                            "spans": timing.summary(),
+                        }
+                    )
+
+
+def _mark_endpoint_finished() -> None:
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.endpoint_finished = time.perf_counter()
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    """Wrap a route endpoint so the time FastAPI spends after it returns can be measured"""
+    if getattr(endpoint, "__server_timed__", False):
+        return endpoint
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_finished()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_finished()
+    wrapper.__server_timed__ = True
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that records a "serialize" span: response-model validation, encoding and
+    rendering done by FastAPI between the endpoint returning and the response being built.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            set_route(self.path)
+            response = await handler(request)
+            timing = _current_timing.get()
+            if timing is not None and timing.endpoint_finished is not None:
+                timing.record("serialize", time.perf_counter() - timing.endpoint_finished)
+                timing.endpoint_finished = None
+            return response
+
+        return timed_handler
@@ -0,0 +1,96 @@
+import asyncio
+import copy
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key so only one of them does the work.
+
+    The first caller for a key (the leader) runs the work; callers arriving while it is
+    still in flight wait for the same result instead of starting their own provider
+    cascade. Followers receive a deep copy so no caller can mutate another's result.
+    A caller that is cancelled stops waiting without cancelling the work for the others;
+    the work itself is cancelled once every caller waiting on it has gone away.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._calls: Dict[str, Tuple[threading.Event, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def run(self, key: str, work: Callable[[], Awaitable[T]]) -> T:
+        """Run work() for key, or wait for the identical call already in flight"""
+        task = self._tasks.get(key)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            self._coalesced += 1
+            return copy.deepcopy(await self._wait(task))
+
+        self._leaders += 1
+        task = asyncio.ensure_future(work())
+        self._tasks[key] = task
+        task.add_done_callback(lambda done: self._forget_task(key, done))
+        return await self._wait(task)
+
+    async def _wait(self, task: asyncio.Task) -> Any:
+        """Await the shared task; cancel it when the last caller waiting on it leaves"""
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # Shield so one impatient caller can't cancel the work for everyone else
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    task.cancel()
+
+    def run_sync(self, key: str, work: Callable[[], T]) -> T:
+        """Blocking counterpart of run() for callers on worker threads"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = (threading.Event(), {})
+                self._calls[key] = call
+                self._leaders += 1
+            else:
+                self._coalesced += 1
+
+        event, outcome = call
+        if not leader:
+            event.wait()
+            if "error" in outcome:
+                raise outcome["error"]
+            return copy.deepcopy(outcome["result"])
+
+        try:
+            outcome["result"] = work()
+            return outcome["result"]
+        except BaseException as e:
+            outcome["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            event.set()
+
+    def _forget_task(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even when every waiter has gone away
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """How many calls did the work and how many piggybacked on one in flight"""
+        return {
+            "in_flight": len(self._tasks) + len(self._calls),
+            "leaders": self._leaders,
+            "coalesced": self._coalesced
+        }
@@ -0,0 +1,135 @@
+import re
+from typing import List, Optional
+
+# Display names for skills we know how to spell; lookups are case-insensitive
+CANONICAL_SKILLS = [
+    "Python", "JavaScript", "TypeScript", "Java", "C", "C++", "C#", "Go", "Rust", "Ruby", "PHP",
+    "Swift", "Kotlin", "Scala", "R", "SQL", "HTML", "CSS", "React", "React Native", "Angular",
+    "Vue", "Node.js", "Next.js", "Express", "Django", "Flask", "FastAPI", "Spring", "Laravel",
+    "Flutter", "Android", "iOS", "Docker", "Kubernetes", "Terraform", "AWS", "Azure", "GCP",
+    "Linux", "Git", "CI/CD", "DevOps", "PostgreSQL", "MySQL", "MongoDB", "Redis", "GraphQL",
+    "Machine Learning", "Deep Learning", "Artificial Intelligence", "Data Science", "NLP",
+    "Computer Vision", "TensorFlow", "PyTorch", "scikit-learn", "Pandas", "NumPy", "Tableau",
+    "Power BI", "Excel", "UI/UX Design", "Figma", "Unity", "Unreal Engine", "Blockchain",
+    "Solidity", "Cybersecurity", "SEO",
+]
+
+# Common abbreviations and spellings mapped to the display name above
+SKILL_ALIASES = {
+    "js": "JavaScript", "ecmascript": "JavaScript", "es6": "JavaScript",
+    "ts": "TypeScript",
+    "py": "Python", "python3": "Python",
+    "golang": "Go",
+    "cpp": "C++", "c plus plus": "C++",
+    "csharp": "C#", "c sharp": "C#",
+    "reactjs": "React", "react.js": "React",
+    "react-native": "React Native",
+    "angularjs": "Angular", "angular.js": "Angular",
+    "vuejs": "Vue", "vue.js": "Vue",
+    "node": "Node.js", "nodejs": "Node.js",
+    "nextjs": "Next.js",
+    "expressjs": "Express", "express.js": "Express",
+    "spring boot": "Spring",
+    "k8s": "Kubernetes", "kube": "Kubernetes",
+    "amazon web services": "AWS",
+    "google cloud": "GCP", "google cloud platform": "GCP",
+    "microsoft azure": "Azure",
+    "postgres": "PostgreSQL",
+    "mongo": "MongoDB",
+    "ml": "Machine Learning",
+    "dl": "Deep Learning",
+    "ai": "Artificial Intelligence",
+    "tf": "TensorFlow",
+    "sklearn": "scikit-learn", "scikit learn": "scikit-learn",
+    "powerbi": "Power BI",
+    "ui/ux": "UI/UX Design", "ux": "UI/UX Design", "ui": "UI/UX Design", "ux design": "UI/UX Design",
+    "cyber security": "Cybersecurity", "infosec": "Cybersecurity",
+    "ci cd": "CI/CD", "cicd": "CI/CD",
+}
+
+_SKILL_LOOKUP = {name.lower(): name for name in CANONICAL_SKILLS}
+_SKILL_LOOKUP.update(SKILL_ALIASES)
+
+# Expertise buckets, checked in order against the free-form expertise text
+EXPERTISE_LEVELS = [
+    ("Advanced", ("advanced", "expert", "senior", "lead", "principal", "professional")),
+    ("Intermediate", ("intermediate", "mid", "medium", "moderate", "experienced")),
+    ("Beginner", ("beginner", "novice", "junior", "entry", "fresher", "basic", "student")),
+]
+
+_SEPARATORS = re.compile(r"[,;|\n]+|\s+&\s+|\s+and\s+", re.IGNORECASE)
+_YEARS = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?)")
+
+
+class SkillProfile:
+    """
+    Canonical form of a skills/expertise pair.
+
+    Equivalent inputs such as "Python, React", "react,python" and "python , React.js"
+    produce the same profile, so they share prompts, cache entries and batch results.
+    """
+
+    def __init__(self, skills: List[str], expertise: str):
+        self.skills = skills
+        self.expertise = expertise
+
+    @property
+    def skills_text(self) -> str:
+        """Skills as the comma-separated string the prompts expect"""
+        return ", ".join(self.skills)
+
+    @property
+    def key(self) -> str:
+        """Stable key identifying the profile"""
+        return f"{'|'.join(skill.lower() for skill in self.skills)}::{self.expertise.lower()}"
+
+    def __bool__(self) -> bool:
+        return bool(self.skills) and bool(self.expertise)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SkillProfile) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"SkillProfile(skills={self.skills!r}, expertise={self.expertise!r})"
+
+
+def canonical_skill(token: str) -> str:
+    """Canonical spelling of a single skill, or the cleaned lowercase token if unknown"""
+    cleaned = " ".join(token.strip().strip(".'\"()[]").split()).lower()
+    return _SKILL_LOOKUP.get(cleaned, cleaned)
+
+
+def normalize_skills(skills: Optional[str]) -> List[str]:
+    """Tokenise, canonicalise, dedupe and sort a free-form skills string"""
+    if not skills:
+        return []
+    canonical = {}
+    for token in _SEPARATORS.split(skills):
+        skill = canonical_skill(token)
+        if skill:
+            canonical.setdefault(skill.lower(), skill)
+    return [canonical[key] for key in sorted(canonical)]
+
+
+def normalize_expertise(expertise: Optional[str]) -> str:
+    """Bucket free-form expertise into Beginner / Intermediate / Advanced where possible"""
+    text = " ".join((expertise or "").split()).lower()
+    if not text:
+        return ""
+    for level, keywords in EXPERTISE_LEVELS:
+        if any(re.search(rf"\b{keyword}\b", text) for keyword in keywords):
+            return level
+    years = _YEARS.search(text)
+    if years:
+        value = float(years.group(1))
+        return "Beginner" if value < 2 else "Intermediate" if value < 5 else "Advanced"
+    # Unrecognised wording is kept, just with normalised case and spacing
+    return text.capitalize()
+
+
+def normalize_skill_profile(skills: Optional[str], expertise: Optional[str]) -> SkillProfile:
+    """Build the canonical profile for a skills/expertise pair"""
+    return SkillProfile(normalize_skills(skills), normalize_expertise(expertise))
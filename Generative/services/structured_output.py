@@ -0,0 +1,402 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from models.schemas import AnalyzeResponse, CareerPath, RoadmapStep, Course, Certification, MockTestQuestion
+from services.metrics import dropped_items
+
+class MockTestQuestions(BaseModel):
+    """Wire format for structured mock test output (OpenAI JSON schemas need an object at the root)"""
+    questions: List[MockTestQuestion]
+
+# Pydantic model each structured-output schema name is generated from
+RESPONSE_MODELS: Dict[str, Type[BaseModel]] = {
+    "career_analysis": AnalyzeResponse,
+    "mock_test": MockTestQuestions,
+}
+
+# List sections of a career analysis and the model every item must satisfy
+ANALYSIS_SECTIONS: Dict[str, Type[BaseModel]] = {
+    "career_paths": CareerPath,
+    "roadmap": RoadmapStep,
+    "courses": Course,
+    "certifications": Certification,
+}
+
+_DROPPED_KEYS = {"title", "default", "description", "additionalProperties"}
+
+def _inline_refs(node: Any, defs: Dict[str, Any]) -> Any:
+    """Resolve $ref pointers and drop keys providers reject"""
+    if isinstance(node, list):
+        return [_inline_refs(item, defs) for item in node]
+    if not isinstance(node, dict):
+        return node
+    if "$ref" in node:
+        return _inline_refs(defs[node["$ref"].rsplit("/", 1)[-1]], defs)
+    return {
+        key: _inline_refs(value, defs) if key != "properties" else {name: _inline_refs(prop, defs) for name, prop in value.items()}
+        for key, value in node.items()
+        if key != "$defs" and key not in _DROPPED_KEYS
+    }
+
+def openai_schema(name: str) -> Dict[str, Any]:
+    """Self-contained JSON Schema for an OpenAI-style response_format"""
+    schema = RESPONSE_MODELS[name].model_json_schema()
+    return _inline_refs(schema, schema.get("$defs", {}))
+
+def _to_gemini(node: Any) -> Any:
+    if isinstance(node, list):
+        return [_to_gemini(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    options = node.get("anyOf")
+    if options:
+        # Gemini has no anyOf; Optional[X] becomes a nullable X
+        non_null = [option for option in options if option.get("type") != "null"]
+        merged = {**{key: value for key, value in node.items() if key != "anyOf"}, **non_null[0]}
+        if len(non_null) < len(options):
+            merged["nullable"] = True
+        return _to_gemini(merged)
+    converted = {}
+    for key, value in node.items():
+        if key == "type":
+            converted[key] = value.upper()
+        elif key == "properties":
+            converted[key] = {name: _to_gemini(prop) for name, prop in value.items()}
+        else:
+            converted[key] = _to_gemini(value)
+    return converted
+
+def gemini_schema(name: str) -> Dict[str, Any]:
+    """The same schema in the OpenAPI subset Gemini's responseSchema accepts"""
+    return _to_gemini(openai_schema(name))
+
+
+class _LenientJSONParser:
+    """
+    Recursive-descent JSON parser that accepts what LLMs actually emit: trailing commas,
+    comments, single quotes, unquoted keys, Python literals, raw newlines in strings and
+    output truncated mid-document (open strings, arrays and objects are closed).
+    """
+
+    _NUMBER = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+    _LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+    _ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "/": "/", "\\": "\\", '"': '"', "'": "'"}
+    _INCOMPLETE = object()
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def parse(self, start: int) -> Any:
+        self.pos = start
+        value = self._value()
+        return None if value is self._INCOMPLETE else value
+
+    def _skip(self) -> None:
+        """Skip whitespace and // or /* */ comments"""
+        text = self.text
+        while self.pos < len(text):
+            char = text[self.pos]
+            if char.isspace():
+                self.pos += 1
+            elif text.startswith("//", self.pos):
+                end = text.find("\n", self.pos)
+                self.pos = len(text) if end == -1 else end + 1
+            elif text.startswith("/*", self.pos):
+                end = text.find("*/", self.pos + 2)
+                self.pos = len(text) if end == -1 else end + 2
+            else:
+                return
+
+    def _value(self) -> Any:
+        self._skip()
+        if self.pos >= len(self.text):
+            return self._INCOMPLETE
+        char = self.text[self.pos]
+        if char == "{":
+            return self._object()
+        if char == "[":
+            return self._array()
+        if char in "\"'":
+            return self._string()
+        number = self._NUMBER.match(self.text, self.pos)
+        if number:
+            self.pos = number.end()
+            literal = number.group()
+            try:
+                return int(literal) if re.fullmatch(r"-?\d+", literal) else float(literal)
+            except ValueError:
+                return literal
+        word = self._bare_word()
+        return self._LITERALS.get(word, word) if word else self._INCOMPLETE
+
+    def _bare_word(self) -> str:
+        """An unquoted key or value, up to the next structural character"""
+        start = self.pos
+        while self.pos < len(self.text) and self.text[self.pos] not in ",:{}[]\n":
+            self.pos += 1
+        return self.text[start:self.pos].strip()
+
+    def _string(self) -> str:
+        quote = self.text[self.pos]
+        self.pos += 1
+        chars = []
+        text = self.text
+        while self.pos < len(text):
+            char = text[self.pos]
+            if char == quote:
+                self.pos += 1
+                return "".join(chars)
+            if char == "\\" and self.pos + 1 < len(text):
+                escape = text[self.pos + 1]
+                if escape == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", text[self.pos + 2:self.pos + 6]):
+                    chars.append(chr(int(text[self.pos + 2:self.pos + 6], 16)))
+                    self.pos += 6
+                    continue
+                chars.append(self._ESCAPES.get(escape, escape))
+                self.pos += 2
+                continue
+            chars.append(char)
+            self.pos += 1
+        # Truncated output: keep what arrived of the string
+        return "".join(chars)
+
+    def _object(self) -> Dict[str, Any]:
+        self.pos += 1
+        result: Dict[str, Any] = {}
+        while True:
+            self._skip()
+            if self.pos >= len(self.text):
+                return result
+            char = self.text[self.pos]
+            if char == "}":
+                self.pos += 1
+                return result
+            if char in ",]":
+                # Stray comma (or a mismatched bracket) - skip it
+                self.pos += 1
+                continue
+            key = self._string() if char in "\"'" else self._bare_word()
+            self._skip()
+            if self.pos >= len(self.text) or self.text[self.pos] != ":":
+                if not key:
+                    self.pos += 1
+                continue
+            self.pos += 1
+            value = self._value()
+            if value is self._INCOMPLETE:
+                return result
+            result[key] = value
+
+    def _array(self) -> List[Any]:
+        self.pos += 1
+        result: List[Any] = []
+        while True:
+            self._skip()
+            if self.pos >= len(self.text):
+                return result
+            char = self.text[self.pos]
+            if char == "]":
+                self.pos += 1
+                return result
+            if char in ",}:":
+                self.pos += 1
+                continue
+            value = self._value()
+            if value is self._INCOMPLETE:
+                return result
+            result.append(value)
+
+
+def repair_json(text: str, expect: Optional[str] = None) -> Any:
+    """
+    Parse the first JSON document in an LLM response, repairing it if needed.
+
+    `expect` ("{" or "[") picks which kind of document to look for; by default the
+    first one found. Returns None when there is nothing to parse.
+    """
+    if not text:
+        return None
+    openers = [expect] if expect else ["{", "["]
+    positions = [position for position in (text.find(opener) for opener in openers) if position != -1]
+    if not positions:
+        return None
+    start = min(positions)
+    try:
+        # Fast path: well-formed JSON, possibly followed by prose
+        return json.JSONDecoder().raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        return _LenientJSONParser(text).parse(start)
+
+def _validate_one(item: Any, model: Type[BaseModel]) -> Optional[BaseModel]:
+    if isinstance(item, model):
+        return item
+    try:
+        return model.model_validate(item)
+    except ValidationError:
+        return None
+
+def validate_items(items: Any, model: Type[BaseModel], kind: str = "", section: str = "") -> List[BaseModel]:
+    """Keep the items that satisfy the model, counting the ones dropped"""
+    if not isinstance(items, list):
+        items = [] if items is None else [items]
+    valid = [parsed for parsed in (_validate_one(item, model) for item in items) if parsed is not None]
+    if len(valid) < len(items):
+        dropped_items.inc(len(items) - len(valid), kind=kind, section=section)
+    return valid
+
+def parse_career_analysis(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Career analysis from an LLM response, keeping every valid career path, roadmap step,
+    course and certification even when others are malformed or the output was cut off.
+    Sections with nothing valid come back empty; None if there isn't a single usable career path.
+    """
+    data = repair_json(text, "{")
+    if not isinstance(data, dict):
+        return None
+    result = {
+        section: [item.model_dump() for item in validate_items(data.get(section), model, "career_analysis", section)]
+        for section, model in ANALYSIS_SECTIONS.items()
+    }
+    selected = _validate_one(data.get("selected_path"), CareerPath)
+    if selected is not None:
+        result["selected_path"] = selected.model_dump()
+    elif result["career_paths"]:
+        result["selected_path"] = result["career_paths"][0]
+    else:
+        return None
+    if not result["career_paths"]:
+        result["career_paths"] = [result["selected_path"]]
+    return result
+
+def parse_mock_test_questions(text: str) -> List[MockTestQuestion]:
+    """Valid mock test questions from a bare array or a {"questions": [...]} object"""
+    data = repair_json(text)
+    if isinstance(data, dict):
+        data = data.get("questions")
+    return validate_items(data, MockTestQuestion, "mock_test", "questions")
+
+
+class IncrementalJSONParser:
+    """
+    Consumes a JSON document as it streams in and reports every object nested up to
+    `max_depth` levels deep the moment its closing brace arrives, with its path
+    (e.g. ("selected_path",) or ("career_paths", 0)). Text before the first "{" is ignored.
+    """
+
+    def __init__(self, max_depth: int = 2):
+        self.max_depth = max_depth
+        self._buffer: List[str] = []
+        self._pos = 0
+        self._started = False
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        # One frame per open container: [kind, path, start, key or item index, last string seen]
+        self._stack: List[list] = []
+        self._done = False
+
+    def feed(self, text: str) -> List[Tuple[Tuple[Any, ...], Any]]:
+        """Add the next chunk and return the (path, object) pairs it completed"""
+        completed = []
+        for char in text:
+            self._buffer.append(char)
+            position = self._pos
+            self._pos += 1
+            if self._done:
+                continue
+            if not self._started:
+                if char != "{":
+                    continue
+                self._started = True
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._stack and self._stack[-1][0] == "{":
+                        self._stack[-1][4] = "".join(self._buffer[self._string_start + 1:position])
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char in "{[":
+                path = self._child_path()
+                self._stack.append([char, path, position, None if char == "{" else 0, None])
+            elif char in "}]":
+                if not self._stack:
+                    continue
+                kind, path, start, _, _ = self._stack.pop()
+                if kind == "{" and 0 < len(path) <= self.max_depth:
+                    value = self._decode("".join(self._buffer[start:position + 1]))
+                    if value is not None:
+                        completed.append((path, value))
+                if not self._stack:
+                    self._done = True
+            elif char == ":" and self._stack and self._stack[-1][0] == "{":
+                self._stack[-1][3] = self._stack[-1][4]
+            elif char == "," and self._stack:
+                frame = self._stack[-1]
+                if frame[0] == "[":
+                    frame[3] += 1
+                else:
+                    frame[3] = None
+        return completed
+
+    def _child_path(self) -> Tuple[Any, ...]:
+        if not self._stack:
+            return ()
+        _, path, _, slot, _ = self._stack[-1]
+        return path + (slot,)
+
+    @staticmethod
+    def _decode(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return repair_json(text, "{")
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return "".join(self._buffer)
+
+
+class CareerAnalysisStream:
+    """
+    Turns a streamed career analysis into validated items as soon as each one closes:
+    every career path, the selected path, roadmap step, course and certification.
+    """
+
+    def __init__(self):
+        self._parser = IncrementalJSONParser(max_depth=2)
+        self.sections: Dict[str, List[Dict[str, Any]]] = {section: [] for section in ANALYSIS_SECTIONS}
+        self.selected_path: Optional[Dict[str, Any]] = None
+
+    def feed(self, text: str) -> List[Tuple[str, Optional[int], Dict[str, Any]]]:
+        """Add the next chunk and return (section, index, item) for every item it completed"""
+        items = []
+        for path, value in self._parser.feed(text):
+            if path == ("selected_path",):
+                selected = _validate_one(value, CareerPath)
+                if selected is not None and self.selected_path is None:
+                    self.selected_path = selected.model_dump()
+                    items.append(("selected_path", None, self.selected_path))
+                continue
+            if len(path) != 2 or path[0] not in ANALYSIS_SECTIONS:
+                continue
+            section = path[0]
+            valid = validate_items([value], ANALYSIS_SECTIONS[section], "career_analysis", section)
+            if valid:
+                item = valid[0].model_dump()
+                items.append((section, len(self.sections[section]), item))
+                self.sections[section].append(item)
+        return items
+
+    @property
+    def text(self) -> str:
+        """The raw streamed response"""
+        return self._parser.text
@@ -0,0 +1,433 @@
+import asyncio
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+import requests
+from starlette.datastructures import Headers, MutableHeaders
+from config.settings import settings
+from services.metrics import trace_spans_dropped
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_REQUEST_ID = re.compile(r"^[\w.:-]{1,128}$")
+
+
+class Trace:
+    """Spans of one request; exported together when the root span ends"""
+
+    def __init__(self, trace_id: Optional[str] = None, request_id: Optional[str] = None, sampled: bool = True):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.request_id = request_id or uuid.uuid4().hex
+        # Whether the trace is recorded and exported; propagated as the traceparent sampled flag
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+        self.root: Optional["Span"] = None
+        self.exported = False
+
+    def finished(self, span: "Span") -> None:
+        # Spans ending after the export (e.g. a coalesced generation outliving its request) are dropped
+        if not self.exported:
+            self.spans.append(span)
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    def __init__(
+        self,
+        trace: Trace,
+        name: str,
+        parent_id: Optional[str] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status_code = 0
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = message
+
+    def record_exception(self, error: BaseException) -> None:
+        if isinstance(error, asyncio.CancelledError):
+            # Hedge losers and client disconnects are cancelled, which isn't a failure
+            self.attributes["cancelled"] = True
+            return
+        self.set_error(f"{type(error).__name__}: {error}")
+        self.events.append({
+            "timeUnixNano": str(time.time_ns()),
+            "name": "exception",
+            "attributes": _otlp_attributes({"exception.type": type(error).__name__, "exception.message": str(error)})
+        })
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.finished(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code, **({"message": self.status_message} if self.status_message else {})}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.events:
+            span["events"] = self.events
+        return span
+
+
+class _NoopSpan:
+    """Stands in for a span when the code isn't running inside a traced request"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+def otlp_payload(spans: List[Span]) -> Dict[str, Any]:
+    """An OTLP/JSON ExportTraceServiceRequest for the spans"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({
+                "service.name": settings.TRACING_SERVICE_NAME,
+                "service.version": settings.API_VERSION
+            })},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [span.to_otlp() for span in spans]
+            }]
+        }]
+    }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_current_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+def current_span():
+    """The active span, or a no-op span outside a traced request"""
+    return _current_span.get() or NOOP_SPAN
+
+def current_request_id() -> Optional[str]:
+    return _current_request_id.get()
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = SPAN_KIND_INTERNAL):
+    """
+    Start a child of the active span without making it the active one; call end() on it.
+    For work that can't be wrapped in a with block, such as an async generator.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = SPAN_KIND_INTERNAL) -> Iterator[Any]:
+    """Trace the block as a child of the active span, if there is one"""
+    child = start_span(name, attributes, kind)
+    if child is NOOP_SPAN:
+        yield child
+        return
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+def traced(name: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None, kind: int = SPAN_KIND_INTERNAL) -> Callable:
+    """Decorator tracing every call of a function or coroutine function (named after it by default)"""
+    def decorate(function: Callable) -> Callable:
+        span_name = name or function.__qualname__
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                with span(span_name, attributes, kind):
+                    return await function(*args, **kwargs)
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with span(span_name, attributes, kind):
+                    return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def set_route(route: str) -> None:
+    """Name the request's root span after its route template rather than the raw path"""
+    active = _current_span.get()
+    if active is None or active.trace.root is None:
+        return
+    root = active.trace.root
+    root.attributes["http.route"] = route
+    root.name = f"{root.attributes.get('http.method', '')} {route}".strip()
+
+def propagation_headers(url: str) -> Dict[str, str]:
+    """
+    traceparent and request ID headers for an outbound call made for the current traced
+    request. Only hosts in TRACING_PROPAGATE_HOSTS (our own services, such as a local
+    Ollama or the stub server) get them; third-party APIs never see our trace or request IDs.
+    """
+    active = _current_span.get()
+    if active is None or urlsplit(url).hostname not in settings.TRACING_PROPAGATE_HOSTS:
+        return {}
+    flags = "01" if active.trace.sampled else "00"
+    return {
+        "traceparent": f"00-{active.trace.trace_id}-{active.span_id}-{flags}",
+        REQUEST_ID_HEADER: active.trace.request_id
+    }
+
+
+class SpanExporter:
+    """
+    Writes finished traces as OTLP/JSON from a background thread: one
+    ExportTraceServiceRequest per line to a file (TRACING_EXPORT_PATH) and/or POSTed
+    to an OTLP/HTTP collector (TRACING_EXPORT_ENDPOINT). Requests never wait on it;
+    traces that don't fit in the queue are dropped and counted.
+    """
+
+    def __init__(self, path: Optional[str] = None, endpoint: Optional[str] = None, queue_size: Optional[int] = None):
+        self.path = path if path is not None else settings.TRACING_EXPORT_PATH
+        self.endpoint = endpoint if endpoint is not None else settings.TRACING_EXPORT_ENDPOINT
+        self.queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(queue_size or settings.TRACING_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path or self.endpoint)
+
+    def export(self, spans: List[Span]) -> None:
+        if not self.enabled or not spans:
+            return
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(spans)
+        except queue.Full:
+            trace_spans_dropped.inc(len(spans))
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+
+    def _run(self) -> None:
+        while True:
+            batch = self.queue.get()
+            stopping = batch is None
+            spans = batch or []
+            # Drain whatever else is waiting so a burst becomes one write
+            drained = 1
+            while not stopping and drained < 100:
+                try:
+                    more = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                drained += 1
+                if more is None:
+                    stopping = True
+                else:
+                    spans.extend(more)
+            try:
+                if spans:
+                    self._write(otlp_payload(spans))
+            except Exception as e:
+                logger.warning("Could not export %d span(s): %s", len(spans), e)
+            finally:
+                for _ in range(drained):
+                    self.queue.task_done()
+            if stopping:
+                return
+
+    def _write(self, payload: Dict[str, Any]) -> None:
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(payload, separators=(",", ":")) + "\n")
+        if self.endpoint:
+            requests.post(self.endpoint, json=payload, timeout=5).raise_for_status()
+
+    def flush(self) -> None:
+        """Wait until every queued trace has been written"""
+        if self._thread is not None:
+            self.queue.join()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self.queue.put(None)
+            thread.join(timeout=5)
+
+
+# Global exporter instance
+span_exporter = SpanExporter()
+
+
+@contextmanager
+def start_trace(
+    name: str,
+    request_id: Optional[str] = None,
+    traceparent: Optional[str] = None,
+    attributes: Optional[Dict[str, Any]] = None,
+    exporter: Optional[SpanExporter] = None
+) -> Iterator[Span]:
+    """
+    Start a trace with a server root span for the block; when the block exits the root
+    span ends and the whole trace is handed to the exporter. A valid W3C traceparent
+    continues the caller's trace, and its sampled flag decides whether this part of the
+    trace is exported.
+    """
+    parent_id = None
+    match = _TRACEPARENT.match(traceparent or "")
+    sampled = bool(int(match.group(3), 16) & 1) if match else True
+    trace = Trace(match.group(1) if match else None, request_id, sampled)
+    if match:
+        parent_id = match.group(2)
+    root = Span(trace, name, parent_id, SPAN_KIND_SERVER, {**(attributes or {}), "request.id": trace.request_id})
+    trace.root = root
+    span_token = _current_span.set(root)
+    request_token = _current_request_id.set(trace.request_id)
+    try:
+        yield root
+    except BaseException as e:
+        root.record_exception(e)
+        raise
+    finally:
+        _current_request_id.reset(request_token)
+        _current_span.reset(span_token)
+        root.end()
+        trace.exported = True
+        if trace.sampled:
+            (exporter or span_exporter).export(trace.spans)
+
+
+class TracingMiddleware:
+    """
+    Gives every HTTP request a request ID - the caller's X-Request-ID if it sent a usable
+    one - and echoes it on the response. With TRACING_ENABLED the request also gets a
+    trace whose spans are exported when the response has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request_id = headers.get(REQUEST_ID_HEADER)
+        if not request_id or not _REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        if not settings.TRACING_ENABLED:
+            token = _current_request_id.set(request_id)
+            try:
+                await self.app(scope, receive, send_with_request_id)
+            finally:
+                _current_request_id.reset(token)
+            return
+
+        method = scope.get("method", "")
+        with start_trace(
+            f"{method} {scope.get('path', '')}",
+            request_id=request_id,
+            traceparent=headers.get("traceparent"),
+            attributes={"http.method": method, "http.target": scope.get("path", "")}
+        ) as root:
+            try:
+                await self.app(scope, receive, send_with_request_id)
+            finally:
+                root.set_attribute("http.status_code", status_code)
+                if status_code >= 500:
+                    root.set_error(f"HTTP {status_code}")
+
+
+class RequestContextFilter(logging.Filter):
+    """Adds request_id and trace_id to log records written while serving a request"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = _current_request_id.get()
+        if request_id:
+            record.request_id = request_id
+            active = _current_span.get()
+            if active is not None:
+                record.trace_id = active.trace.trace_id
+        return True
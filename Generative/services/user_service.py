@@ -1,11 +1,15 @@
+import logging
 import uuid
 from datetime import datetime
 from typing import Optional, Dict, Any
 from google.cloud import firestore
 from models.schemas import User, UserCreate, UserUpdate
 from services.auth_service import auth_service
+from services.tracing import traced
 import os
 
+logger = logging.getLogger(__name__)
+
 class UserService:
     """Service for handling user operations with Firestore"""
     
@@ -14,9 +18,10 @@ class UserService:
         try:
             self.firestore_client = firestore.Client(project=self.project_id)
         except Exception as e:
-            print(f"Warning: Could not initialize Firestore client: {e}")
+            logger.warning("Could not initialize Firestore client: %s", e)
             self.firestore_client = None
     
+    @traced()
     async def create_user(self, user_data: UserCreate) -> Optional[User]:
         """Create a new user"""
         if not self.firestore_client:
@@ -58,9 +63,10 @@ class UserService:
                 updated_at=now
             )
         except Exception as e:
-            print(f"Error creating user: {e}")
+            logger.error("Error creating user: %s", e)
             raise Exception("Failed to create user")
     
+    @traced()
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email"""
         if not self.firestore_client:
@@ -76,9 +82,10 @@ class UserService:
             
             return None
         except Exception as e:
-            print(f"Error getting user by email: {e}")
+            logger.error("Error getting user by email: %s", e)
             return None
     
+    @traced()
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID"""
         if not self.firestore_client:
@@ -102,9 +109,10 @@ class UserService:
             
             return None
         except Exception as e:
-            print(f"Error getting user by ID: {e}")
+            logger.error("Error getting user by ID: %s", e)
             return None
     
+    @traced()
     async def update_user(self, user_id: str, user_update: UserUpdate) -> Optional[User]:
         """Update user information"""
         if not self.firestore_client:
@@ -133,9 +141,10 @@ class UserService:
             # Return updated user
             return await self.get_user_by_id(user_id)
         except Exception as e:
-            print(f"Error updating user: {e}")
+            logger.error("Error updating user: %s", e)
             raise Exception("Failed to update user")
     
+    @traced()
     async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password"""
         user_data = await self.get_user_by_email(email)
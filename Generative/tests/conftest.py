@@ -13,6 +13,10 @@ import sys
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Keep the daily quota ledger in memory so test runs don't leave usage behind
+os.environ.setdefault("AI_QUOTA_DB_PATH", "")
+os.environ.setdefault("JOB_QUEUE_DB_PATH", "")
+
 from main import app
 from config.settings import settings
 from services.mock_user_service import MockUserService
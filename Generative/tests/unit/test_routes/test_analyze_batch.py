@@ -0,0 +1,75 @@
+"""
+Unit tests for the batch analyze route
+"""
+import json
+import pytest
+from unittest.mock import patch
+from services.ai_service import AIService
+
+
+def _parse_lines(body: str):
+    """Decode an NDJSON response body, ordered by item index"""
+    lines = [json.loads(line) for line in body.strip().splitlines()]
+    return sorted(lines, key=lambda line: line["index"])
+
+
+class TestAnalyzeBatchRoutes:
+    """Test cases for the /analyze/batch route"""
+    
+    @pytest.mark.unit
+    def test_batch_dedupes_equivalent_profiles(self, client):
+        """Test equivalent profiles share one analysis and every item gets a line"""
+        calls = []
+        
+        async def fake_analysis(self, skills, expertise, deadline=None):
+            calls.append((skills, expertise))
+            return AIService._create_enhanced_fallback_response(self, skills, expertise)
+        
+        items = [
+            {"skills": "Python, SQL", "expertise": "Beginner"},
+            {"skills": "sql,  python", "expertise": "beginner"},
+            {"skills": "JavaScript", "expertise": "Advanced"}
+        ]
+        with patch('services.ai_service.AIService.generate_career_analysis_async', fake_analysis):
+            response = client.post("/analyze/batch", json={"items": items})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = _parse_lines(response.text)
+        assert [line["index"] for line in lines] == [0, 1, 2]
+        assert all(line["status"] == "ok" for line in lines)
+        assert lines[0]["profile_key"] == lines[1]["profile_key"]
+        assert lines[0]["result"] == lines[1]["result"]
+        assert "career_paths" in lines[2]["result"]
+        assert len(calls) == 2
+    
+    @pytest.mark.unit
+    def test_batch_reports_errors_per_item(self, client):
+        """Test an empty profile or a failed analysis only fails its own items"""
+        async def fake_analysis(self, skills, expertise, deadline=None):
+            if "Rust" in skills:
+                raise RuntimeError("boom")
+            return AIService._create_enhanced_fallback_response(self, skills, expertise)
+        
+        items = [
+            {"skills": "", "expertise": ""},
+            {"skills": "Rust", "expertise": "Intermediate"},
+            {"skills": "Python", "expertise": "Intermediate"}
+        ]
+        with patch('services.ai_service.AIService.generate_career_analysis_async', fake_analysis):
+            response = client.post("/analyze/batch", json={"items": items})
+        
+        lines = _parse_lines(response.text)
+        assert [line["status"] for line in lines] == ["error", "error", "ok"]
+        assert "boom" in lines[1]["detail"]
+    
+    @pytest.mark.unit
+    def test_batch_rejects_oversized_batches(self, client):
+        """Test batches above ANALYZE_BATCH_MAX_ITEMS are refused"""
+        with patch('routes.analyze.settings.ANALYZE_BATCH_MAX_ITEMS', 1):
+            response = client.post("/analyze/batch", json={"items": [
+                {"skills": "Python", "expertise": "Beginner"},
+                {"skills": "SQL", "expertise": "Beginner"}
+            ]})
+        
+        assert response.status_code == 413
@@ -0,0 +1,42 @@
+"""
+Unit tests for the streaming analyze route
+"""
+import json
+import pytest
+from unittest.mock import patch
+
+
+def _parse_events(body: str):
+    """Split a server-sent event stream into (event, data) pairs"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestAnalyzeStreamRoutes:
+    """Test cases for the /analyze/stream route"""
+    
+    @pytest.mark.unit
+    def test_stream_sends_items_then_done(self, client):
+        """Test every analysis item arrives as an SSE event and certifications get a URL"""
+        async def fake_items(self, skills, expertise, deadline=None):
+            yield ("career_paths", 0, {"title": "Data Analyst"})
+            yield ("certifications", 0, {"name": "SQL Cert", "provider": "Acme", "url": ""})
+        
+        with patch('services.ai_service.AIService.stream_career_analysis_async', fake_items):
+            response = client.post("/analyze/stream", json={"skills": "SQL", "expertise": "Beginner"})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _parse_events(response.text)
+        assert events[0] == ("item", {"section": "career_paths", "index": 0, "item": {"title": "Data Analyst"}})
+        assert events[1][1]["item"]["url"].startswith("https://www.google.com/search?q=SQL+Cert")
+        assert events[-1] == ("done", {})
+    
+    @pytest.mark.unit
+    def test_stream_requires_profile(self, client):
+        """Test an empty profile is rejected before streaming starts"""
+        response = client.post("/analyze/stream", json={"skills": "", "expertise": ""})
+        assert response.status_code == 400
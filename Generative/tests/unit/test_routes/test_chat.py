@@ -0,0 +1,90 @@
+"""
+Unit tests for chat routes
+"""
+import json
+import pytest
+from unittest.mock import patch
+
+
+def _parse_events(body: str):
+    """Split a server-sent event stream into (event, data) pairs"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestChatRoutes:
+    """Test cases for chat routes"""
+    
+    @pytest.mark.unit
+    def test_stream_chat_sends_tokens_then_skills(self, client):
+        """Test tokens stream as SSE events followed by the skills and done events"""
+        async def fake_stream(prompt, deadline=None):
+            for text in ["Hi ", "there"]:
+                yield text
+        
+        with patch('services.ai_service.AIService.stream_with_fallback_ai_async', side_effect=fake_stream):
+            response = client.post("/chat/stream", json={"message": "What should I do next?"})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _parse_events(response.text)
+        assert events[:2] == [("token", {"text": "Hi "}), ("token", {"text": "there"})]
+        assert events[-2][0] == "skills"
+        assert events[-1] == ("done", {})
+    
+    @pytest.mark.unit
+    def test_stream_chat_static_fallback(self, client):
+        """Test the personalized fallback is streamed when no provider answers"""
+        async def empty_stream(prompt, deadline=None):
+            return
+            yield
+        
+        with patch('services.ai_service.AIService.stream_with_fallback_ai_async', side_effect=empty_stream):
+            response = client.post("/chat/stream", json={"message": "Hello"})
+        
+        events = _parse_events(response.text)
+        assert events[0][0] == "token"
+        assert "Career Mentor" in events[0][1]["text"]
+        assert [event for event, _ in events[-2:]] == ["skills", "done"]
+    
+    @pytest.mark.unit
+    def test_stream_chat_skills_event_lists_skill_names(self, client):
+        """Test the skills event carries the same list of names as /chat/"""
+        async def fake_stream(prompt, deadline=None):
+            yield "Nice progress!"
+        
+        async def fake_extraction(self, message, current_skills="", deadline=None):
+            return {
+                "extracted_skills": [{"skill": "Docker", "expertise_level": "Intermediate"}],
+                "updated_skills": "Docker"
+            }
+        
+        with patch('services.ai_service.AIService.stream_with_fallback_ai_async', side_effect=fake_stream), \
+                patch('services.ai_service.AIService.extract_skills_from_message_async', fake_extraction):
+            response = client.post("/chat/stream", json={"message": "I have experience with Docker"})
+        
+        events = _parse_events(response.text)
+        assert events[-2] == ("skills", {"extracted_skills": ["Docker"], "updated_skills": "Docker"})
+    
+    @pytest.mark.unit
+    def test_chat_returns_extracted_skill_names(self, client):
+        """Test skills extracted as {skill, expertise_level} objects come back as names"""
+        async def fake_reply(self, prompt, **kwargs):
+            return "Nice progress!"
+        
+        async def fake_extraction(self, message, current_skills="", deadline=None):
+            return {
+                "extracted_skills": [{"skill": "Docker", "expertise_level": "Intermediate"}],
+                "updated_skills": "Docker"
+            }
+        
+        with patch('services.ai_service.AIService._generate_with_fallback_ai_async', fake_reply), \
+                patch('services.ai_service.AIService.extract_skills_from_message_async', fake_extraction):
+            response = client.post("/chat/", json={"message": "I have experience with Docker"})
+        
+        assert response.status_code == 200
+        assert response.json()["extracted_skills"] == ["Docker"]
+        assert response.json()["updated_skills"] == "Docker"
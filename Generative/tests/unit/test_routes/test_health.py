@@ -0,0 +1,61 @@
+"""
+Unit tests for health routes
+"""
+import pytest
+from unittest.mock import patch
+
+
+class TestHealthRoutes:
+    """Test cases for health and readiness routes"""
+
+    @pytest.mark.unit
+    def test_health_check(self, client):
+        """Test basic health check"""
+        response = client.get("/health")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "healthy"
+
+    @pytest.mark.unit
+    def test_ready_after_startup(self, client):
+        """Test readiness once the app lifespan has warmed up the AI service"""
+        response = client.get("/health/ready")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+    @pytest.mark.unit
+    def test_not_ready_before_warm_up(self, client):
+        """Test readiness probe rejects traffic while warming up"""
+        with patch('routes.health.is_ai_service_ready', return_value=False):
+            response = client.get("/health/ready")
+
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up"
+
+    @pytest.mark.unit
+    def test_shared_ai_service_is_singleton(self):
+        """Test that the shared AI service is only built once"""
+        from services.ai_service import get_ai_service
+
+        assert get_ai_service() is get_ai_service()
+
+    @pytest.mark.unit
+    def test_circuit_status(self, client):
+        """Test circuit breaker status lists every provider"""
+        response = client.get("/health/circuits")
+
+        assert response.status_code == 200
+        providers = response.json()["providers"]
+        assert "google_genai" in providers
+        assert providers["groq"]["state"] in ["closed", "open", "half_open"]
+
+    @pytest.mark.unit
+    def test_provider_health(self, client):
+        """Test provider health table lists every provider"""
+        response = client.get("/health/providers")
+
+        assert response.status_code == 200
+        providers = response.json()["providers"]
+        assert set(providers) >= {"google_genai", "ollama", "groq"}
+        assert "healthy" in providers["ollama"]
@@ -0,0 +1,56 @@
+"""
+Unit tests for the background job routes
+"""
+import time
+import pytest
+from unittest.mock import patch
+from services.ai_service import AIService
+
+
+def _poll(client, job_id, timeout=2.0):
+    """Poll GET /jobs/{id} until the job has finished"""
+    for _ in range(int(timeout / 0.02)):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job stuck in {job['status']}")
+
+
+class TestJobRoutes:
+    """Test cases for /jobs routes"""
+    
+    @pytest.mark.unit
+    def test_analyze_job_returns_id_then_result(self, client):
+        """Test the analyze job is accepted immediately and its result can be polled"""
+        async def fake_analysis(self, skills, expertise, deadline=None):
+            return AIService._create_enhanced_fallback_response(self, skills, expertise)
+        
+        with patch('services.ai_service.AIService.generate_career_analysis_async', fake_analysis):
+            response = client.post("/jobs/analyze", json={"skills": "Python", "expertise": "Beginner"})
+            assert response.status_code == 202
+            assert response.json()["status"] in ("queued", "running", "succeeded")
+            job = _poll(client, response.json()["job_id"])
+        
+        assert job["status"] == "succeeded"
+        assert job["kind"] == "analyze"
+        assert "career_paths" in job["result"]
+    
+    @pytest.mark.unit
+    def test_mock_test_job(self, client):
+        """Test the mock test job stores validated questions"""
+        async def fake_mock_test(self, skills, expertise, topic="", user_id="", deadline=None):
+            return {"questions": [{"question": "Q?", "answer": "A"}], "generated_at": "2024-01-01T00:00:00"}
+        
+        with patch('services.ai_service.AIService.generate_mock_test_async', fake_mock_test):
+            response = client.post("/jobs/mock-test", json={"skills": "SQL", "expertise": "Intermediate"})
+            job = _poll(client, response.json()["job_id"])
+        
+        assert job["status"] == "succeeded"
+        assert job["result"]["questions"] == [{"question": "Q?", "answer": "A"}]
+    
+    @pytest.mark.unit
+    def test_job_validation_and_missing_job(self, client):
+        """Test empty profiles are rejected and unknown ids return 404"""
+        assert client.post("/jobs/analyze", json={"skills": "", "expertise": ""}).status_code == 400
+        assert client.get("/jobs/does-not-exist").status_code == 404
@@ -0,0 +1,18 @@
+"""
+Unit tests for the metrics route
+"""
+import pytest
+
+
+class TestMetricsRoutes:
+    """Test cases for the Prometheus metrics endpoint"""
+    
+    @pytest.mark.unit
+    def test_metrics_endpoint(self, client):
+        """Test metrics are exported in Prometheus text format"""
+        response = client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE ai_provider_request_duration_seconds histogram" in response.text
+        assert "# TYPE ai_static_fallback_total counter" in response.text
@@ -0,0 +1,28 @@
+"""
+Unit tests for the mock test route
+"""
+import pytest
+from unittest.mock import patch
+
+
+class TestMockTestRoutes:
+    """Test cases for /mock-test"""
+    
+    @pytest.mark.unit
+    def test_generate_mock_test(self, client):
+        """Test a generated test gets an id and timestamp"""
+        async def fake_mock_test(self, skills, expertise, topic="", user_id="", deadline=None):
+            return {
+                "questions": [{"question": f"Q{i}?", "answer": f"A{i}."} for i in range(5)],
+                "generated_at": "2024-01-01T00:00:00"
+            }
+        
+        with patch('services.ai_service.AIService.generate_mock_test_async', fake_mock_test):
+            response = client.post("/mock-test", json={"skills": "SQL", "expertise": "Intermediate"})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["questions"]) == 5
+        assert data["test_id"]
+        assert data["user_id"] is None
+        assert data["created_at"] == "2024-01-01T00:00:00"
@@ -2,11 +2,19 @@
 Unit tests for AIService
 """
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+import asyncio
 import json
+import httpx
 import os
 
-from services.ai_service import AIService, convert_usd_to_inr
+from services.ai_service import AIService, ProviderError, convert_usd_to_inr
+from services.deadline import Deadline
+
+
+def _probed_healthy(ai_service, provider):
+    """Record a passed health probe, as the background monitor would for a running Ollama"""
+    ai_service.health_monitor._table[provider] = {"healthy": True, "latency_ms": 5.0}
 
 
 class TestAIService:
@@ -81,6 +89,7 @@ class TestAIService:
         # Setup
         self.ai_service.fallback_apis['ollama'] = True
         self.ai_service.ollama_url = "http://localhost:11434/api/generate"
+        _probed_healthy(self.ai_service, 'ollama')
         
         mock_response = Mock()
         mock_response.status_code = 200
@@ -120,6 +129,417 @@ class TestAIService:
         # Verify
         assert result == "Generated content from HuggingFace"
     
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_generate_with_fallback_ai_async_uses_pooled_client(self):
+        """Test async generation goes through the provider's pooled HTTP client"""
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['groq'] = True
+        self.ai_service.groq_api_key = "test-groq-key"
+        
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "choices": [{"message": {"content": "Generated content from Groq"}}]
+        }
+        
+        with patch('httpx.AsyncClient.post', new_callable=AsyncMock, return_value=mock_response) as mock_post:
+            result = await self.ai_service._generate_with_fallback_ai_async("Test prompt")
+            client = self.ai_service._get_http_client('groq')
+        
+        assert result == "Generated content from Groq"
+        mock_post.assert_called_once()
+        assert self.ai_service._get_http_client('groq') is client
+        await self.ai_service.aclose()
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_generate_career_analysis_async_static_fallback(self):
+        """Test async career analysis falls back to the static response"""
+        with patch.object(self.ai_service, '_generate_with_fallback_ai_async', new_callable=AsyncMock, return_value=""):
+            result = await self.ai_service.generate_career_analysis_async("Python", "Beginner")
+        
+        assert "career_paths" in result
+        assert "selected_path" in result
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_hedged_cascade_returns_fastest_provider(self):
+        """Test hedging fires the next provider when the first is slow and cancels the loser"""
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['google_genai'] = True
+        self.ai_service.fallback_apis['groq'] = True
+        cancelled = []
+        
+        async def fake_call(provider, prompt, deadline=None, schema=None):
+            if provider == 'google_genai':
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(provider)
+                    raise
+                return "slow gemini"
+            return "fast groq"
+        
+        with patch.object(self.ai_service, '_call_provider_async', side_effect=fake_call):
+            result = await self.ai_service._generate_with_fallback_ai_async("Test prompt", hedge_delay=0.01)
+        
+        assert result == "fast groq"
+        assert cancelled == ['google_genai']
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_deadline_cuts_slow_provider_without_tripping_circuit(self):
+        """Test an exhausted latency budget abandons the cascade but doesn't blame the provider"""
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['groq'] = True
+        self.ai_service.fallback_apis['openai_free'] = True
+        calls = []
+        
+        async def slow_call(provider, prompt, deadline=None, schema=None):
+            calls.append(provider)
+            await asyncio.sleep(5)
+            return "too late"
+        
+        with patch.object(self.ai_service, '_call_provider_async', side_effect=slow_call):
+            result = await self.ai_service._generate_with_fallback_ai_async("Test prompt", deadline=Deadline(0.05, "chat"))
+        
+        assert result == ""
+        assert calls == ['groq']
+        assert self.ai_service.circuit_breakers['groq'].snapshot()["total_failures"] == 0
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_repeated_prompt_served_from_completion_cache(self):
+        """Test an identical prompt is answered from the cache without calling a provider"""
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['groq'] = True
+        
+        with patch.object(self.ai_service, '_call_provider_async', new_callable=AsyncMock, return_value="cached answer") as mock_call:
+            first = await self.ai_service._generate_with_fallback_ai_async("Test prompt")
+            second = await self.ai_service._generate_with_fallback_ai_async("Test prompt")
+            uncached = await self.ai_service._generate_with_fallback_ai_async("Test prompt", use_cache=False)
+        
+        assert first == second == uncached == "cached answer"
+        assert mock_call.call_count == 2
+        assert self.ai_service.get_cache_stats()["hits"] == 1
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_analyses_share_one_cascade(self):
+        """Test equivalent in-flight career analyses are coalesced into one provider cascade"""
+        async def slow_cascade(prompt, hedge_delay=None, deadline=None, cache_key=None, schema=None):
+            await asyncio.sleep(0.01)
+            return ""
+        
+        with patch.object(self.ai_service, '_run_provider_cascade_async', side_effect=slow_cascade) as mock_cascade:
+            results = await asyncio.gather(
+                self.ai_service.generate_career_analysis_async("Python, React", "Beginner"),
+                self.ai_service.generate_career_analysis_async("react.js, python", "beginner")
+            )
+        
+        assert mock_cascade.call_count == 1
+        assert results[0] == results[1]
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_callers_with_different_budgets_do_not_share_a_flight(self):
+        """Test a long-budget job never inherits the outcome of a short-budget request's flight"""
+        budgets = []
+        async def slow_cascade(prompt, hedge_delay=None, deadline=None, cache_key=None, schema=None):
+            budgets.append(deadline.endpoint)
+            await asyncio.sleep(0.01)
+            return ""
+        
+        with patch.object(self.ai_service, '_run_provider_cascade_async', side_effect=slow_cascade):
+            await asyncio.gather(
+                self.ai_service.generate_mock_test_async("Python", "Beginner", deadline=Deadline(0.5, "mock_test")),
+                self.ai_service.generate_mock_test_async("Python", "Beginner", deadline=Deadline(120, "job")),
+                self.ai_service.generate_mock_test_async("Python", "Beginner", deadline=Deadline(120, "job"))
+            )
+        
+        assert sorted(budgets) == ["job", "mock_test"]
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_stream_falls_back_to_next_streaming_provider(self):
+        """Test streaming skips a failing provider and yields the next one's deltas as they arrive"""
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['ollama'] = True
+        self.ai_service.fallback_apis['groq'] = True
+        _probed_healthy(self.ai_service, 'ollama')
+        
+        def handler(request):
+            if "groq" in str(request.url):
+                assert json.loads(request.content)["stream"] is True
+                body = (
+                    'data: {"choices": [{"delta": {"content": "Hello"}}]}\n\n'
+                    'data: {"choices": [{"delta": {"content": " there"}}]}\n\n'
+                    'data: [DONE]\n\n'
+                )
+                return httpx.Response(200, text=body)
+            return httpx.Response(503, text="unavailable")
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(self.ai_service, '_get_http_client', return_value=client):
+            chunks = [text async for text in self.ai_service.stream_with_fallback_ai_async("Test prompt")]
+        await client.aclose()
+        
+        assert chunks == ["Hello", " there"]
+        assert self.ai_service.circuit_breakers['ollama'].snapshot()["total_failures"] == 1
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    def test_parse_gemini_and_ollama_stream_chunks(self):
+        """Test stream deltas are pulled out of Gemini SSE and Ollama NDJSON lines"""
+        gemini_line = 'data: {"candidates": [{"content": {"parts": [{"text": "Hi"}]}}]}'
+        ollama_line = '{"response": "Hey", "done": false}'
+        
+        assert self.ai_service._parse_stream_chunk('google_genai', gemini_line) == "Hi"
+        assert self.ai_service._parse_stream_chunk('ollama', ollama_line) == "Hey"
+        assert self.ai_service._parse_stream_chunk('groq', ': keep-alive') == ""
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_provider_outcomes_are_recorded_in_metrics(self):
+        """Test HTTP errors and successes are counted per provider and endpoint"""
+        from services.metrics import provider_requests, provider_latency
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['groq'] = True
+        self.ai_service.fallback_apis['openai_free'] = True
+        
+        async def fake_call(provider, prompt, deadline=None, schema=None):
+            if provider == 'groq':
+                raise ProviderError(provider, 500, "boom")
+            return "answer"
+        
+        errors_before = provider_requests.value(provider="groq", endpoint="analyze", outcome="http_error")
+        successes_before = provider_requests.value(provider="openai_free", endpoint="analyze", outcome="success")
+        latency_before = provider_latency.count(provider="openai_free", endpoint="analyze")
+        
+        with patch.object(self.ai_service, '_call_provider_async', side_effect=fake_call):
+            result = await self.ai_service._generate_with_fallback_ai_async(
+                "Test prompt", deadline=Deadline(5, "analyze"), use_cache=False
+            )
+        
+        assert result == "answer"
+        assert provider_requests.value(provider="groq", endpoint="analyze", outcome="http_error") == errors_before + 1
+        assert provider_requests.value(provider="openai_free", endpoint="analyze", outcome="success") == successes_before + 1
+        assert provider_latency.count(provider="openai_free", endpoint="analyze") == latency_before + 1
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_cascade_prefers_provider_that_has_been_fastest(self):
+        """Test the cascade tries the provider with the best recent latency first"""
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['groq'] = True
+        self.ai_service.fallback_apis['openai_free'] = True
+        self.ai_service.provider_router.adaptive = True
+        self.ai_service.provider_router.pinned_order = []
+        for _ in range(self.ai_service.provider_router.min_samples):
+            for provider in self.ai_service.PROVIDER_ORDER:
+                self.ai_service.provider_router.record(provider, 0.2 if provider == 'openai_free' else 5.0, True)
+        calls = []
+        
+        async def fake_call(provider, prompt, deadline=None, schema=None):
+            calls.append(provider)
+            return f"answer from {provider}"
+        
+        with patch.object(self.ai_service, '_call_provider_async', side_effect=fake_call):
+            result = await self.ai_service._generate_with_fallback_ai_async("Test prompt", use_cache=False)
+        
+        assert result == "answer from openai_free"
+        assert calls == ['openai_free']
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_rate_limited_provider_is_skipped_without_a_call(self):
+        """Test a provider over its client-side limit is skipped instead of collecting a 429"""
+        from services.rate_limiter import ProviderRateLimiter
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['groq'] = True
+        self.ai_service.fallback_apis['openai_free'] = True
+        self.ai_service.provider_router.pinned_order = ['groq', 'openai_free']
+        self.ai_service.rate_limiters['groq'] = ProviderRateLimiter('groq', rpm=1, max_wait=0)
+        calls = []
+        
+        async def fake_call(provider, prompt, deadline=None, schema=None):
+            calls.append(provider)
+            return f"answer from {provider}"
+        
+        with patch.object(self.ai_service, '_call_provider_async', side_effect=fake_call):
+            first = await self.ai_service._generate_with_fallback_ai_async("First prompt", use_cache=False)
+            second = await self.ai_service._generate_with_fallback_ai_async("Second prompt", use_cache=False)
+        
+        assert first == "answer from groq"
+        assert second == "answer from openai_free"
+        assert calls == ['groq', 'openai_free']
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_stream_cancelled_in_rate_limit_queue_releases_probe(self):
+        """Test a stream cancelled while queued gives back the half-open probe slot"""
+        from services.circuit_breaker import CircuitBreaker
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['groq'] = True
+        breaker = CircuitBreaker('groq', failure_threshold=1, recovery_timeout=0.01)
+        breaker.record_failure("boom", trip=True)
+        await asyncio.sleep(0.02)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        self.ai_service.circuit_breakers['groq'] = breaker
+        queued = asyncio.Event()
+        
+        async def wait_forever(tokens, deadline=None):
+            queued.set()
+            await asyncio.Event().wait()
+        
+        stream = self.ai_service.stream_with_fallback_ai_async("Test prompt")
+        with patch.object(self.ai_service.rate_limiters['groq'], 'acquire', side_effect=wait_forever):
+            task = asyncio.create_task(stream.__anext__())
+            await queued.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        await stream.aclose()
+        
+        assert breaker.allow_request()
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    def test_structured_output_request_payloads(self):
+        """Test the response schema is sent to providers that support structured output"""
+        self.ai_service.google_genai_url = "https://gemini.test/v1beta/models/gemini-pro:generateContent?key=test"
+        gemini = self.ai_service._build_provider_request('google_genai', "prompt", "career_analysis")["json"]
+        groq = self.ai_service._build_provider_request('groq', "prompt", "mock_test")["json"]
+        # Any OpenAI-compatible server can sit behind openai_free, so it only gets a schema when opted in
+        default = self.ai_service._build_provider_request('openai_free', "prompt", "mock_test")["json"]
+        with patch('services.ai_service.settings.AI_STRUCTURED_OUTPUT_PROVIDERS', ['openai_free']):
+            openai = self.ai_service._build_provider_request('openai_free', "prompt", "mock_test")["json"]
+            plain = self.ai_service._build_provider_request('openai_free', "prompt")["json"]
+        
+        assert gemini["generationConfig"]["responseMimeType"] == "application/json"
+        assert gemini["generationConfig"]["responseSchema"]["type"] == "OBJECT"
+        assert groq["response_format"] == {"type": "json_object"}
+        assert "response_format" not in default
+        assert openai["response_format"]["json_schema"]["schema"]["required"] == ["questions"]
+        assert "response_format" not in plain
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_rejected_structured_output_is_retried_as_plain_text(self):
+        """Test a 400 refusing response_format is retried without it and not counted against the provider"""
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['groq'] = True
+        
+        payloads = []
+        def handler(request):
+            payloads.append(json.loads(request.content))
+            if "response_format" in payloads[-1]:
+                return httpx.Response(400, json={"error": {"message": "'response_format' is not supported"}})
+            return httpx.Response(200, json={"choices": [{"message": {"content": '{"questions": []}'}}]})
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(self.ai_service, '_get_http_client', return_value=client):
+            first = await self.ai_service._attempt_provider_async('groq', "prompt", schema="mock_test")
+            second = await self.ai_service._attempt_provider_async('groq', "prompt", schema="mock_test")
+        await client.aclose()
+        
+        assert first == second == '{"questions": []}'
+        # Refused once, then asked for plain text straight away
+        assert ["response_format" in payload for payload in payloads] == [True, False, False]
+        assert self.ai_service.circuit_breakers['groq'].snapshot()["total_failures"] == 0
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_partially_valid_analysis_is_kept(self):
+        """Test valid items of a malformed analysis are kept and empty sections filled from the static analysis"""
+        response = (
+            '{"career_paths": [{"title": "ML Engineer", "description": "d", "required_skills": ["Python"], '
+            '"salary_range": "₹10-20 lakhs", "growth_prospect": "High"}, {"title": "broken"}], '
+            '"roadmap": [{"step": 1, "title": "Math", "description": "d", "duration": "2 months", "resources": []},'
+        )
+        schemas = []
+        
+        async def fake_generate(prompt, deadline=None, schema=None):
+            schemas.append(schema)
+            return response
+        
+        with patch.object(self.ai_service, '_generate_with_fallback_ai_async', side_effect=fake_generate):
+            result = await self.ai_service.generate_career_analysis_async("Python", "Intermediate")
+        
+        assert schemas == ["career_analysis"]
+        assert [path["title"] for path in result["career_paths"]] == ["ML Engineer"]
+        assert [step["title"] for step in result["roadmap"]] == ["Math"]
+        assert result["courses"] and result["certifications"]
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_career_analysis_streams_items_as_they_complete(self):
+        """Test career paths are yielded before the rest of the document arrives and gaps are filled"""
+        path = {"title": "ML Engineer", "description": "d", "required_skills": ["Python"],
+                "salary_range": "₹10-20 lakhs", "growth_prospect": "High"}
+        chunks = ['{"career_paths": [' + json.dumps(path), ', {"title": "cut off', '']
+        received_before = []
+        
+        async def fake_stream(prompt, deadline=None, schema=None):
+            for chunk in chunks:
+                received_before.append(len(items))
+                yield chunk
+        
+        items = []
+        with patch.object(self.ai_service, 'stream_with_fallback_ai_async', side_effect=fake_stream):
+            async for item in self.ai_service.stream_career_analysis_async("Python", "Intermediate"):
+                items.append(item)
+        
+        assert items[0] == ("career_paths", 0, path)
+        # The first career path was yielded before the second chunk was even requested
+        assert received_before == [0, 1, 1]
+        sections = [section for section, _, _ in items]
+        assert sections.count("career_paths") == 1
+        assert sections.count("selected_path") == 1
+        assert {"roadmap", "courses", "certifications"} <= set(sections)
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_transient_provider_error_is_retried(self):
+        """Test a 503 is retried on the same provider and the retry is counted"""
+        from services.metrics import provider_retries
+        from services.retry_policy import RetryPolicy
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['groq'] = True
+        self.ai_service.retry_policies['groq'] = RetryPolicy('groq', max_retries=2, base_delay=0.001, max_delay=0.001)
+        responses = [
+            httpx.Response(503, text="overloaded", headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"choices": [{"message": {"content": "second time lucky"}}]})
+        ]
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+        retries_before = provider_retries.value(provider="groq", reason="503")
+        
+        with patch.object(self.ai_service, '_get_http_client', return_value=client):
+            result = await self.ai_service._generate_with_fallback_ai_async("Test prompt", use_cache=False)
+        await client.aclose()
+        
+        assert result == "second time lucky"
+        assert provider_retries.value(provider="groq", reason="503") == retries_before + 1
+        assert self.ai_service.circuit_breakers['groq'].snapshot()["total_failures"] == 0
+        assert self.ai_service.circuit_breakers['groq'].snapshot()["total_failures"] == 0
+    
     @pytest.mark.unit
     @pytest.mark.ai_service
     def test_ai_service_without_vertex_ai(self):
@@ -175,29 +595,59 @@ class TestAIService:
     @pytest.mark.unit
     @pytest.mark.ai_service
     @patch('requests.get')
-    def test_init_ollama_success(self, mock_get):
-        """Test successful Ollama initialization"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
-        
+    def test_init_ollama_does_not_probe(self, mock_get):
+        """Test Ollama initialization leaves discovery to the background health monitor"""
         ai_service = AIService()
         result = ai_service._init_ollama()
         
-        # Should return True when Ollama is available
-        mock_get.assert_called_with("http://localhost:11434/api/tags", timeout=2)
+        assert result is True
+        assert ai_service.ollama_url == "http://localhost:11434/api/generate"
+        mock_get.assert_not_called()
+        # Not used until a probe has found it running
+        assert ai_service._is_provider_usable('ollama') is False
     
     @pytest.mark.unit
     @pytest.mark.ai_service
-    @patch('requests.get')
-    def test_init_ollama_failure(self, mock_get):
-        """Test failed Ollama initialization"""
-        mock_get.side_effect = Exception("Connection failed")
+    def test_init_ollama_disabled(self):
+        """Test Ollama can be switched off through the environment"""
+        with patch.dict(os.environ, {'OLLAMA_ENABLED': 'false'}):
+            ai_service = AIService()
         
-        ai_service = AIService()
-        result = ai_service._init_ollama()
+        assert ai_service.fallback_apis['ollama'] is False
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_health_monitor_marks_failed_provider_unhealthy(self):
+        """Test a failed Ollama probe removes it from the cascade"""
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['ollama'] = True
+        self.ai_service.ollama_base_url = "http://localhost:11434"
+        
+        with patch('httpx.AsyncClient.get', new_callable=AsyncMock, side_effect=Exception("Connection failed")):
+            table = await self.ai_service.health_monitor.check_all()
+        await self.ai_service.health_monitor.stop()
+        
+        assert table['ollama']['healthy'] is False
+        assert table['ollama']['error'] == "Connection failed"
+        assert self.ai_service._is_provider_usable('ollama') is False
+    
+    @pytest.mark.unit
+    @pytest.mark.ai_service
+    @pytest.mark.asyncio
+    async def test_health_monitor_picks_up_local_ollama(self):
+        """Test a running Ollama joins the cascade after its first successful probe"""
+        self.ai_service.fallback_apis = {name: False for name in self.ai_service.fallback_apis}
+        self.ai_service.fallback_apis['ollama'] = True
+        self.ai_service.ollama_base_url = "http://localhost:11434"
+        assert self.ai_service._is_provider_usable('ollama') is False
+        
+        with patch('httpx.AsyncClient.get', new_callable=AsyncMock, return_value=Mock(status_code=200)):
+            table = await self.ai_service.health_monitor.check_all()
+        await self.ai_service.health_monitor.stop()
         
-        assert result is False
+        assert table['ollama']['healthy'] is True
+        assert self.ai_service._is_provider_usable('ollama') is True
     
     @pytest.mark.unit
     @pytest.mark.ai_service
@@ -0,0 +1,72 @@
+"""
+Unit tests for the provider circuit breaker
+"""
+import pytest
+from unittest.mock import patch
+
+from services.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker"""
+    
+    def setup_method(self):
+        """Setup test instance"""
+        self.breaker = CircuitBreaker("groq", failure_threshold=2, recovery_timeout=30)
+    
+    @pytest.mark.unit
+    def test_starts_closed(self):
+        """Test a new breaker lets requests through"""
+        assert self.breaker.state == CircuitBreaker.CLOSED
+        assert self.breaker.allow_request() is True
+    
+    @pytest.mark.unit
+    def test_opens_after_threshold(self):
+        """Test the circuit opens after consecutive failures and skips requests"""
+        self.breaker.record_failure("HTTP 503")
+        assert self.breaker.state == CircuitBreaker.CLOSED
+        
+        self.breaker.record_failure("HTTP 503")
+        assert self.breaker.state == CircuitBreaker.OPEN
+        assert self.breaker.allow_request() is False
+        assert self.breaker.snapshot()["skipped_requests"] == 1
+    
+    @pytest.mark.unit
+    def test_trip_opens_immediately(self):
+        """Test rate-limit style failures open the circuit straight away"""
+        self.breaker.record_failure("HTTP 429", trip=True)
+        
+        assert self.breaker.state == CircuitBreaker.OPEN
+    
+    @pytest.mark.unit
+    def test_half_open_probe_recovers(self):
+        """Test a single probe is allowed after the cool-down and success closes the circuit"""
+        with patch('services.circuit_breaker.time.monotonic', return_value=100.0):
+            self.breaker.record_failure("timeout", trip=True)
+        
+        with patch('services.circuit_breaker.time.monotonic', return_value=131.0):
+            assert self.breaker.state == CircuitBreaker.HALF_OPEN
+            assert self.breaker.allow_request() is True
+            assert self.breaker.allow_request() is False
+            self.breaker.record_success()
+        
+        assert self.breaker.state == CircuitBreaker.CLOSED
+    
+    @pytest.mark.unit
+    def test_half_open_failure_reopens(self):
+        """Test a failed probe re-opens the circuit"""
+        with patch('services.circuit_breaker.time.monotonic', return_value=100.0):
+            self.breaker.record_failure("timeout", trip=True)
+        
+        with patch('services.circuit_breaker.time.monotonic', return_value=131.0):
+            assert self.breaker.allow_request() is True
+            self.breaker.record_failure("timeout")
+            assert self.breaker.state == CircuitBreaker.OPEN
+    
+    @pytest.mark.unit
+    def test_snapshot_structure(self):
+        """Test snapshot exposes the fields used by /health/circuits"""
+        snapshot = self.breaker.snapshot()
+        
+        for key in ["state", "consecutive_failures", "retry_in_seconds", "last_failure", "skipped_requests"]:
+            assert key in snapshot
@@ -0,0 +1,106 @@
+"""
+Unit tests for the completion cache
+"""
+import pytest
+from unittest.mock import patch
+
+from services.completion_cache import CompletionCache
+
+
+class TestCompletionCache:
+    """Test cases for CompletionCache"""
+    
+    @pytest.mark.unit
+    def test_key_is_stable_and_versioned(self):
+        """Test keys depend on prompt, params and template version only"""
+        params = {"temperature": 0.7}
+        key = CompletionCache.make_key("prompt", params, "1")
+        
+        assert key == CompletionCache.make_key("prompt", {"temperature": 0.7}, "1")
+        assert key != CompletionCache.make_key("prompt", params, "2")
+        assert key != CompletionCache.make_key("other prompt", params, "1")
+    
+    @pytest.mark.unit
+    def test_hit_and_miss_counters(self):
+        """Test hits and misses are counted"""
+        cache = CompletionCache()
+        
+        assert cache.get("key") is None
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+        
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+    
+    @pytest.mark.unit
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first"""
+        cache = CompletionCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.stats()["evictions"] == 1
+    
+    @pytest.mark.unit
+    def test_byte_budget_eviction(self):
+        """Test the cache stays within its memory budget"""
+        cache = CompletionCache(max_bytes=100)
+        cache.set("a", "x" * 60)
+        cache.set("b", "y" * 60)
+        
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] <= 100
+    
+    @pytest.mark.unit
+    def test_ttl_expiry(self):
+        """Test entries expire after their TTL"""
+        cache = CompletionCache(ttl_seconds=10)
+        with patch('services.completion_cache.time.time', return_value=1000.0):
+            cache.set("key", "value")
+        
+        with patch('services.completion_cache.time.time', return_value=1011.0):
+            assert cache.get("key") is None
+    
+    @pytest.mark.unit
+    def test_sqlite_persistence(self, tmp_path):
+        """Test entries survive a restart when SQLite persistence is enabled"""
+        path = str(tmp_path / "completions.db")
+        cache = CompletionCache(sqlite_path=path)
+        cache.set("key", "value")
+        cache.close()
+        
+        restarted = CompletionCache(sqlite_path=path)
+        assert restarted.get("key") == "value"
+        assert restarted.stats()["persistent"] is True
+        restarted.close()
+    
+    @pytest.mark.unit
+    def test_sqlite_writes_are_batched_and_reads_stay_in_memory(self, tmp_path):
+        """Test new entries reach disk on flush and lookups never query SQLite"""
+        path = str(tmp_path / "completions.db")
+        cache = CompletionCache(sqlite_path=path, flush_interval=3600)
+        cache.set("first", "one")
+        cache.set("second", "two")
+        
+        unflushed = CompletionCache(sqlite_path=path)
+        assert unflushed.get("first") is None
+        unflushed.close()
+        
+        cache.flush()
+        restarted = CompletionCache(sqlite_path=path)
+        # Reads are served from the entries loaded at startup, not from the database
+        restarted._db.close()
+        assert restarted.get("first") == "one"
+        assert restarted.get("second") == "two"
+        restarted._db = None
+        
+        cache.set("third", "three")
+        cache.close()
+        restarted = CompletionCache(sqlite_path=path)
+        assert restarted.get("third") == "three"
+        restarted.close()
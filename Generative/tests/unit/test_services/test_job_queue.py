@@ -0,0 +1,146 @@
+"""
+Unit tests for the SQLite-backed job queue
+"""
+import asyncio
+import pytest
+
+from services.job_queue import JobQueue
+
+
+async def _wait_for(queue, job_id, statuses=("succeeded", "failed"), timeout=2.0):
+    """Poll until the job reaches one of the given statuses"""
+    for _ in range(int(timeout / 0.01)):
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job stuck in {job['status']}")
+
+
+class TestJobQueue:
+    """Test cases for JobQueue"""
+    
+    def _queue(self, path="", workers=2):
+        return JobQueue(path=path, workers=workers, retention_hours=24, poll_interval=0.05)
+    
+    @pytest.mark.unit
+    def test_submit_returns_queued_job(self):
+        """Test submitting only records the job"""
+        queue = self._queue()
+        job = queue.submit("analyze", {"skills": "Python"})
+        
+        assert job["status"] == "queued"
+        assert job["payload"] == {"skills": "Python"}
+        assert queue.get(job["job_id"]) == job
+        assert queue.get("missing") is None
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_workers_run_jobs(self):
+        """Test workers pick jobs up and store results and errors"""
+        queue = self._queue()
+        
+        async def handler(payload):
+            if payload.get("fail"):
+                raise ValueError("bad input")
+            return {"echo": payload["value"]}
+        
+        queue.register("echo", handler)
+        await queue.start()
+        try:
+            ok = queue.submit("echo", {"value": 1})
+            bad = queue.submit("echo", {"fail": True})
+            unknown = queue.submit("nope", {})
+            
+            assert (await _wait_for(queue, ok["job_id"]))["result"] == {"echo": 1}
+            failed = await _wait_for(queue, bad["job_id"])
+            assert failed["status"] == "failed" and failed["error"] == "bad input"
+            assert "Unknown job kind" in (await _wait_for(queue, unknown["job_id"]))["error"]
+        finally:
+            await queue.stop()
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_jobs_survive_restart(self, tmp_path):
+        """Test a job interrupted by shutdown runs again after the next start"""
+        path = str(tmp_path / "jobs.db")
+        started = asyncio.Event()
+        
+        async def slow(payload):
+            started.set()
+            await asyncio.sleep(10)
+        
+        first = self._queue(path, workers=1)
+        first.register("work", slow)
+        await first.start()
+        job = first.submit("work", {})
+        await asyncio.wait_for(started.wait(), 1)
+        await first.stop()
+        assert first.get(job["job_id"])["status"] == "queued"
+        
+        async def fast(payload):
+            return {"done": True}
+        
+        second = self._queue(path, workers=1)
+        second.register("work", fast)
+        await second.start()
+        try:
+            finished = await _wait_for(second, job["job_id"])
+            assert finished["status"] == "succeeded"
+            # Being interrupted by a graceful stop doesn't use up an attempt
+            assert finished["attempts"] == 1
+        finally:
+            await second.stop()
+    
+    @pytest.mark.unit
+    def test_job_that_never_finishes_is_failed_after_max_attempts(self, tmp_path):
+        """Test a job that crashes the worker on every run isn't requeued forever"""
+        path = str(tmp_path / "jobs.db")
+        job = JobQueue(path=path, workers=1, max_attempts=2).submit("work", {})
+        
+        # Each process claims the job and dies before finishing it
+        for _ in range(2):
+            crashed = JobQueue(path=path, workers=1, max_attempts=2)
+            crashed._recover()
+            assert crashed._claim()["job_id"] == job["job_id"]
+        
+        restarted = JobQueue(path=path, workers=1, max_attempts=2)
+        restarted._recover()
+        failed = restarted.get(job["job_id"])
+        assert failed["status"] == "failed"
+        assert failed["attempts"] == 2
+        assert "Gave up after 2 attempt(s)" in failed["error"]
+        assert restarted._claim() is None
+    
+    @pytest.mark.unit
+    def test_graceful_stops_do_not_use_up_attempts(self):
+        """Test a job requeued by a graceful stop can still run however many restarts it sees"""
+        queue = JobQueue(path="", workers=1, max_attempts=1)
+        job = queue.submit("work", {})
+        for _ in range(3):
+            assert queue._claim()["job_id"] == job["job_id"]
+            queue._requeue(job["job_id"])
+        
+        requeued = queue.get(job["job_id"])
+        assert requeued["status"] == "queued" and requeued["attempts"] == 0
+    
+    @pytest.mark.unit
+    def test_queued_job_out_of_attempts_is_not_claimed(self):
+        """Test a queued job that has no attempts left is failed instead of run"""
+        queue = JobQueue(path="", workers=1, max_attempts=1)
+        job = queue.submit("work", {})
+        assert queue._claim()["job_id"] == job["job_id"]
+        queue._finish(job["job_id"], "queued")
+        
+        assert queue._claim() is None
+        assert queue.get(job["job_id"])["status"] == "failed"
+    
+    @pytest.mark.unit
+    def test_database_is_opened_on_first_use(self, tmp_path):
+        """Test building the queue doesn't touch the database file"""
+        path = tmp_path / "jobs.db"
+        queue = JobQueue(path=str(path), workers=1)
+        assert not path.exists()
+        
+        queue.submit("work", {})
+        assert path.exists()
@@ -0,0 +1,101 @@
+"""
+Unit tests for structured, sampled, non-blocking logging
+"""
+import json
+import logging
+import queue
+import sys
+import pytest
+
+from config.logging_config import SAMPLED, JsonFormatter, NonBlockingQueueHandler, SamplingFilter
+from services.metrics import log_records_dropped
+
+
+def _record(msg="Provider %s answered", args=("groq",), level=logging.INFO, **extra):
+    record = logging.LogRecord("services.ai_service", level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestJsonFormatter:
+    """Test cases for JsonFormatter"""
+
+    @pytest.mark.unit
+    def test_includes_extra_fields(self):
+        """Test a record becomes one JSON object with its extra= fields"""
+        entry = json.loads(JsonFormatter().format(_record(provider="groq", status=200, **SAMPLED)))
+
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "services.ai_service"
+        assert entry["message"] == "Provider groq answered"
+        assert entry["provider"] == "groq"
+        assert entry["status"] == 200
+        assert "sample" not in entry
+        assert "exc" not in entry
+
+    @pytest.mark.unit
+    def test_includes_traceback(self):
+        """Test exceptions are rendered into the exc field"""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("routes.chat", logging.ERROR, __file__, 1, "Chat error", (), True)
+            record.exc_info = sys.exc_info()
+
+        entry = json.loads(JsonFormatter().format(record))
+        assert "ValueError: boom" in entry["exc"]
+
+
+class TestSamplingFilter:
+    """Test cases for SamplingFilter"""
+
+    @pytest.mark.unit
+    def test_keeps_one_in_every_n_sampled_records(self):
+        """Test sampled messages are thinned and tagged with the rate"""
+        sampler = SamplingFilter(0.1)
+        kept = [record for record in (_record(**SAMPLED) for _ in range(30)) if sampler.filter(record)]
+
+        assert len(kept) == 3
+        assert all(record.sample_rate == 0.1 for record in kept)
+
+    @pytest.mark.unit
+    def test_unmarked_records_and_warnings_always_pass(self):
+        """Test only records marked SAMPLED below WARNING are sampled"""
+        sampler = SamplingFilter(0.1)
+
+        assert all(sampler.filter(_record()) for _ in range(10))
+        assert all(sampler.filter(_record(level=logging.WARNING, **SAMPLED)) for _ in range(10))
+
+    @pytest.mark.unit
+    def test_zero_rate_drops_sampled_records(self):
+        """Test a rate of 0 turns sampled messages off"""
+        sampler = SamplingFilter(0)
+        assert not any(sampler.filter(_record(**SAMPLED)) for _ in range(5))
+
+
+class TestNonBlockingQueueHandler:
+    """Test cases for NonBlockingQueueHandler"""
+
+    @pytest.mark.unit
+    def test_drops_and_counts_when_queue_is_full(self):
+        """Test a full queue drops records instead of blocking"""
+        handler = NonBlockingQueueHandler(queue.Queue(2))
+        dropped = log_records_dropped.value()
+
+        for _ in range(5):
+            handler.handle(_record())
+
+        assert handler.queue.qsize() == 2
+        assert log_records_dropped.value() == dropped + 3
+
+    @pytest.mark.unit
+    def test_prepared_record_keeps_extra_fields(self):
+        """Test the queued record is pre-rendered but keeps its extra= fields"""
+        handler = NonBlockingQueueHandler(queue.Queue())
+        handler.handle(_record(provider="ollama"))
+
+        queued = handler.queue.get_nowait()
+        assert queued.msg == "Provider groq answered"
+        assert queued.args is None
+        assert queued.provider == "ollama"
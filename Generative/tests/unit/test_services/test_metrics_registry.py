@@ -0,0 +1,48 @@
+"""
+Unit tests for the metrics registry
+"""
+import pytest
+
+from services.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """Test cases for Prometheus-format metrics"""
+    
+    @pytest.mark.unit
+    def test_counter_renders_labels(self):
+        """Test counters render one sample per label set"""
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests", ["provider", "outcome"])
+        counter.inc(provider="groq", outcome="success")
+        counter.inc(2, provider="groq", outcome="success")
+        
+        output = registry.render()
+        
+        assert "# TYPE requests_total counter" in output
+        assert 'requests_total{provider="groq",outcome="success"} 3' in output
+    
+    @pytest.mark.unit
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", ["provider"], buckets=(0.5, 1.0))
+        histogram.observe(0.2, provider="groq")
+        histogram.observe(0.7, provider="groq")
+        histogram.observe(3.0, provider="groq")
+        
+        output = registry.render()
+        
+        assert 'latency_seconds_bucket{provider="groq",le="0.5"} 1' in output
+        assert 'latency_seconds_bucket{provider="groq",le="1"} 2' in output
+        assert 'latency_seconds_bucket{provider="groq",le="+Inf"} 3' in output
+        assert 'latency_seconds_sum{provider="groq"} 3.9' in output
+        assert 'latency_seconds_count{provider="groq"} 3' in output
+    
+    @pytest.mark.unit
+    def test_label_values_are_escaped(self):
+        """Test quotes in label values don't break the exposition format"""
+        registry = MetricsRegistry()
+        registry.counter("errors_total", "Errors", ["reason"]).inc(reason='bad "json"')
+        
+        assert 'errors_total{reason="bad \\"json\\""} 1' in registry.render()
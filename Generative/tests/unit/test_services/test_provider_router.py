@@ -0,0 +1,75 @@
+"""
+Unit tests for adaptive provider ordering
+"""
+import pytest
+
+from services.provider_router import ProviderRouter
+
+
+class TestProviderRouter:
+    """Test cases for ProviderRouter"""
+    
+    def _router(self, **kwargs):
+        kwargs.setdefault("pinned_order", [])
+        kwargs.setdefault("pinned_transport", "auto")
+        return ProviderRouter(["google_genai", "ollama", "groq"], window=10, min_samples=3, **kwargs)
+    
+    @pytest.mark.unit
+    def test_static_order_until_measured(self):
+        """Test the default order is kept on cold start"""
+        assert self._router().order() == ["google_genai", "ollama", "groq"]
+    
+    @pytest.mark.unit
+    def test_fastest_reliable_provider_goes_first(self):
+        """Test providers are ranked by latency and success once measured"""
+        router = self._router()
+        for _ in range(3):
+            router.record("google_genai", 4.0, True)
+            router.record("ollama", 0.5, False)
+            router.record("groq", 0.8, True)
+        
+        assert router.order() == ["groq", "google_genai", "ollama"]
+    
+    @pytest.mark.unit
+    def test_unmeasured_providers_are_tried_first(self):
+        """Test a provider without enough samples gets explored"""
+        router = self._router()
+        for _ in range(3):
+            router.record("google_genai", 0.2, True)
+        
+        assert router.order()[0] == "ollama"
+    
+    @pytest.mark.unit
+    def test_window_forgets_old_samples(self):
+        """Test only the most recent calls count"""
+        router = self._router()
+        for _ in range(10):
+            router.record("groq", 0.1, False)
+        for _ in range(10):
+            router.record("groq", 0.3, True)
+        
+        assert router.stats("groq")["success_rate"] == 1.0
+    
+    @pytest.mark.unit
+    def test_pinned_order(self):
+        """Test operators can pin the cascade order"""
+        router = self._router(pinned_order=["groq", "google_genai"])
+        for _ in range(3):
+            router.record("ollama", 0.1, True)
+        
+        assert router.order() == ["groq", "google_genai", "ollama"]
+        assert router.snapshot()["mode"] == "pinned"
+    
+    @pytest.mark.unit
+    def test_gemini_transport_choice(self):
+        """Test both Gemini transports are measured, then the faster one is used"""
+        router = self._router()
+        assert router.choose_transport() == "sdk"
+        for _ in range(3):
+            router.record_transport("sdk", 2.0, True)
+        assert router.choose_transport() == "rest"
+        for _ in range(3):
+            router.record_transport("rest", 0.5, True)
+        
+        assert router.choose_transport() == "rest"
+        assert self._router(pinned_transport="sdk").choose_transport() == "sdk"
@@ -0,0 +1,81 @@
+"""
+Unit tests for the daily quota ledger
+"""
+import pytest
+from unittest.mock import patch
+
+from services.quota_ledger import QuotaLedger
+
+
+class TestQuotaLedger:
+    """Test cases for QuotaLedger"""
+    
+    def _ledger(self, path=""):
+        quotas = {"groq": {"requests": 100, "tokens": 0}, "google_genai": {"requests": 10, "tokens": 1000}}
+        return QuotaLedger(path=path, quotas=quotas, stop_ratio=0.9, low_ratio=0.5, utc_offset_hours=0)
+    
+    @pytest.mark.unit
+    def test_usage_is_tallied(self):
+        """Test requests and tokens add up per provider"""
+        ledger = self._ledger()
+        ledger.record("groq", tokens=100)
+        ledger.record("groq", tokens=50)
+        
+        assert ledger.usage("groq") == {"requests": 2, "tokens": 150}
+        assert ledger.usage("ollama") == {"requests": 0, "tokens": 0}
+    
+    @pytest.mark.unit
+    def test_headroom_uses_tightest_quota(self):
+        """Test headroom reflects whichever of requests or tokens is closest to the cap"""
+        ledger = self._ledger()
+        ledger.record("google_genai", tokens=800)
+        
+        assert ledger.headroom("google_genai") == pytest.approx(0.2)
+        assert ledger.headroom("ollama") == 1.0
+    
+    @pytest.mark.unit
+    def test_rank_spreads_load_and_skips_capped_providers(self):
+        """Test low providers move back and capped ones are left out"""
+        ledger = self._ledger()
+        for _ in range(60):
+            ledger.record("groq")
+        assert ledger.rank(["groq", "google_genai", "ollama"]) == ["google_genai", "ollama", "groq"]
+        
+        for _ in range(9):
+            ledger.record("google_genai")
+        assert ledger.rank(["groq", "google_genai", "ollama"]) == ["ollama", "groq"]
+    
+    @pytest.mark.unit
+    def test_usage_survives_restart(self, tmp_path):
+        """Test today's usage is reloaded from SQLite"""
+        path = str(tmp_path / "quota.db")
+        ledger = self._ledger(path)
+        ledger.record("groq", tokens=10)
+        ledger.close()
+        
+        assert self._ledger(path).usage("groq") == {"requests": 1, "tokens": 10}
+    
+    @pytest.mark.unit
+    def test_usage_is_written_in_batches(self, tmp_path):
+        """Test recording stays in memory until a flush writes it in one go"""
+        path = str(tmp_path / "quota.db")
+        ledger = QuotaLedger(path=path, quotas={}, flush_interval=3600)
+        for _ in range(5):
+            ledger.record("groq", tokens=10)
+        assert ledger.usage("groq") == {"requests": 5, "tokens": 50}
+        assert self._ledger(path).usage("groq") == {"requests": 0, "tokens": 0}
+        
+        ledger.flush()
+        assert self._ledger(path).usage("groq") == {"requests": 5, "tokens": 50}
+        ledger.record("groq")
+        ledger.close()
+        assert self._ledger(path).usage("groq") == {"requests": 6, "tokens": 50}
+    
+    @pytest.mark.unit
+    def test_new_day_resets_usage(self):
+        """Test the tally starts over when the quota day changes"""
+        ledger = self._ledger()
+        ledger.record("groq")
+        
+        with patch.object(ledger, '_today', return_value="2999-01-01"):
+            assert ledger.usage("groq") == {"requests": 0, "tokens": 0}
@@ -0,0 +1,86 @@
+"""
+Unit tests for client-side provider rate limiting
+"""
+import asyncio
+import pytest
+
+from services.rate_limiter import ProviderRateLimiter
+from services.deadline import Deadline
+
+
+class TestProviderRateLimiter:
+    """Test cases for ProviderRateLimiter"""
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_unlimited_provider_always_admits(self):
+        """Test a provider with no limits is never held back"""
+        limiter = ProviderRateLimiter("ollama")
+        
+        assert all([await limiter.acquire(10000) for _ in range(100)])
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_request_limit_skips_when_wait_is_too_long(self):
+        """Test calls beyond the RPM burst are rejected instead of waiting a long time"""
+        limiter = ProviderRateLimiter("groq", rpm=2, max_wait=0.1)
+        
+        assert await limiter.acquire(10)
+        assert await limiter.acquire(10)
+        assert not await limiter.acquire(10)
+        assert limiter.snapshot()["rejected"] == 1
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_short_wait_is_queued(self):
+        """Test a call that fits after a brief wait is held and then admitted"""
+        limiter = ProviderRateLimiter("groq", rpm=600, max_wait=0.5)
+        for _ in range(600):
+            await limiter.acquire(1)
+        
+        assert await limiter.acquire(1)
+        assert limiter.snapshot()["waited"] == 1
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_queue_is_bounded(self):
+        """Test callers beyond the queue length skip straight to the next provider"""
+        limiter = ProviderRateLimiter("groq", rpm=60, max_wait=2, max_queue=1)
+        for _ in range(60):
+            await limiter.acquire(1)
+        
+        waiter = asyncio.create_task(limiter.acquire(1))
+        await asyncio.sleep(0)
+        assert not await limiter.acquire(1)
+        assert await waiter
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_wait_respects_deadline(self):
+        """Test the wait never exceeds what is left of the request's latency budget"""
+        limiter = ProviderRateLimiter("groq", rpm=60, max_wait=5)
+        for _ in range(60):
+            await limiter.acquire(1)
+        
+        assert not await limiter.acquire(1, Deadline(0.2, "chat"))
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_token_limit_and_settle(self):
+        """Test the token bucket is charged the estimate and corrected to actual usage"""
+        limiter = ProviderRateLimiter("groq", tpm=1000, max_wait=0)
+        
+        assert await limiter.acquire(900)
+        assert not await limiter.acquire(500)
+        limiter.settle(900, 100)
+        assert await limiter.acquire(500)
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_settle_never_refunds_more_than_was_taken(self):
+        """Test a reservation clamped to the bucket's capacity can't push it over capacity when settled"""
+        limiter = ProviderRateLimiter("groq", tpm=1000, max_wait=0)
+        
+        assert await limiter.acquire(3000)
+        limiter.settle(3000, 100)
+        assert limiter.snapshot()["available_tokens"] == 900
@@ -0,0 +1,98 @@
+"""
+Unit tests for the provider retry policy
+"""
+import httpx
+import pytest
+from unittest.mock import patch
+
+from services.retry_policy import RetryPolicy, parse_retry_after
+from services.deadline import Deadline
+
+
+class FakeProviderError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TestRetryPolicy:
+    """Test cases for RetryPolicy"""
+    
+    def _policy(self, max_retries=2):
+        return RetryPolicy("test", max_retries=max_retries, base_delay=0.01, max_delay=0.02, max_retry_after=1)
+    
+    @pytest.mark.unit
+    def test_error_classification(self):
+        """Test only transient failures are retried"""
+        policy = self._policy()
+        
+        for status in (429, 500, 502, 503, 504, 408):
+            assert policy.is_retryable(FakeProviderError(status))
+        for status in (400, 401, 403, 404):
+            assert not policy.is_retryable(FakeProviderError(status))
+        assert policy.is_retryable(httpx.ConnectError("refused"))
+        assert not policy.is_retryable(httpx.ReadTimeout("slow"))
+        assert not policy.is_retryable(ValueError("bad"))
+        assert RetryPolicy.reason(FakeProviderError(503)) == "503"
+        assert RetryPolicy.reason(httpx.ConnectError("refused")) == "connect_error"
+    
+    @pytest.mark.unit
+    def test_backoff_is_capped_and_jittered(self):
+        """Test delays grow exponentially with full jitter up to the cap"""
+        policy = RetryPolicy("test", max_retries=10, base_delay=1, max_delay=4)
+        
+        with patch('services.retry_policy.random.uniform', side_effect=lambda low, high: high):
+            assert [policy.backoff(attempt) for attempt in range(5)] == [1, 2, 4, 4, 4]
+        assert all(0 <= policy.backoff(3) <= 4 for _ in range(50))
+    
+    @pytest.mark.unit
+    def test_retry_after_and_deadline(self):
+        """Test Retry-After is honoured, too-long waits give up and the deadline is respected"""
+        policy = self._policy()
+        
+        assert policy.next_delay(0, FakeProviderError(429, retry_after=0.5)) == 0.5
+        assert policy.next_delay(0, FakeProviderError(429, retry_after=30)) is None
+        assert policy.next_delay(0, FakeProviderError(429, retry_after=0.5), Deadline(0.1)) is None
+        assert policy.next_delay(2, FakeProviderError(503)) is None
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_call_retries_until_success(self):
+        """Test transient failures are retried and every retry reported"""
+        policy = self._policy()
+        outcomes = [FakeProviderError(503), httpx.ConnectError("reset"), "answer"]
+        retries = []
+        
+        async def work():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        
+        result = await policy.call(work, on_retry=lambda attempt, error, delay: retries.append((attempt, type(error).__name__)))
+        
+        assert result == "answer"
+        assert retries == [(1, "FakeProviderError"), (2, "ConnectError")]
+    
+    @pytest.mark.unit
+    def test_call_sync_does_not_retry_auth_errors(self):
+        """Test a 401 fails on the first attempt"""
+        policy = self._policy()
+        calls = []
+        
+        def work():
+            calls.append(1)
+            raise FakeProviderError(401)
+        
+        with pytest.raises(FakeProviderError):
+            policy.call_sync(work)
+        assert len(calls) == 1
+    
+    @pytest.mark.unit
+    def test_parse_retry_after(self):
+        """Test both Retry-After formats are understood"""
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
@@ -0,0 +1,98 @@
+"""
+Unit tests for Server-Timing instrumentation
+"""
+import os
+import httpx
+import pytest
+from unittest.mock import patch
+
+from services.ai_service import AIService
+from services.server_timing import RequestTiming, activate, current_timing, record, timed
+
+
+class TestRequestTiming:
+    """Test cases for RequestTiming and the span helpers"""
+    
+    @pytest.mark.unit
+    def test_header_sums_repeated_spans(self):
+        """Test spans with one name add up and list their details"""
+        timing = RequestTiming()
+        timing.record("provider", 0.2, "groq")
+        timing.record("provider", 0.3, "ollama")
+        timing.record("json", 0.0015)
+        
+        header = timing.header(total=1.0)
+        assert header == (
+            'provider;desc="Provider network (groq, ollama) x2";dur=500.0, '
+            'json;desc="JSON extraction";dur=1.5, '
+            'total;desc="Total";dur=1000.0'
+        )
+        assert timing.summary()["provider"] == {"dur_ms": 500.0, "count": 2, "details": ["groq", "ollama"]}
+    
+    @pytest.mark.unit
+    def test_spans_only_recorded_inside_a_request(self):
+        """Test the helpers are no-ops when nothing is being timed"""
+        record("auth", 1.0)
+        with timed("json"):
+            pass
+        assert current_timing() is None
+        
+        with activate() as timing:
+            with timed("json"):
+                pass
+            record("auth", 0.01)
+        assert list(timing.spans) == ["json", "auth"]
+        assert current_timing() is None
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_provider_calls_record_network_time(self):
+        """Test each provider call adds to the provider span"""
+        with patch.dict(os.environ, {'GROQ_API_KEY': 'test-groq-key'}):
+            with patch('services.ai_service.VERTEX_AI_AVAILABLE', False):
+                ai_service = AIService()
+        
+        def handler(request):
+            return httpx.Response(200, json={"choices": [{"message": {"content": "Hi"}}]})
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(ai_service, '_get_http_client', return_value=client), activate() as timing:
+            assert await ai_service._call_provider_async('groq', "Test prompt") == "Hi"
+        await client.aclose()
+        
+        assert timing.spans["provider"]["count"] == 1
+        assert timing.spans["provider"]["details"] == ["groq"]
+
+
+class TestServerTimingMiddleware:
+    """Test cases for the Server-Timing response header"""
+    
+    @pytest.mark.unit
+    def test_analyze_reports_phases(self, client):
+        """Test /analyze returns auth, validation, serialization and total spans"""
+        async def fake_analysis(self, skills, expertise, deadline=None):
+            return AIService._create_enhanced_fallback_response(self, skills, expertise)
+        
+        token = client.post("/auth/register", json={
+            "email": "timing@example.com", "password": "secret", "full_name": "Timing Test"
+        }).json()["access_token"]
+        with patch('services.ai_service.AIService.generate_career_analysis_async', fake_analysis):
+            response = client.post(
+                "/analyze",
+                json={"skills": "Python", "expertise": "Beginner"},
+                headers={"Authorization": f"Bearer {token}", "Origin": "http://localhost:3000"}
+            )
+        
+        assert response.status_code == 200
+        names = [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+        assert names[-1] == "total"
+        assert {"auth", "ai_service", "validate", "serialize"} <= set(names)
+        assert response.headers["Timing-Allow-Origin"] == "http://localhost:3000"
+    
+    @pytest.mark.unit
+    def test_disabled_header(self, client):
+        """Test the header can be switched off"""
+        with patch('services.server_timing.settings.SERVER_TIMING_ENABLED', False):
+            response = client.get("/health")
+        assert "Server-Timing" not in response.headers
+        assert "Timing-Allow-Origin" not in response.headers
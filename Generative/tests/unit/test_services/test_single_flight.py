@@ -0,0 +1,136 @@
+"""
+Unit tests for single-flight request coalescing
+"""
+import asyncio
+import threading
+import time
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight"""
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test callers with the same key await a single in-flight call"""
+        flight = SingleFlight()
+        calls = []
+        
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"questions": ["q1"]}
+        
+        results = await asyncio.gather(*(flight.run("key", work) for _ in range(5)))
+        
+        assert len(calls) == 1
+        assert all(result == {"questions": ["q1"]} for result in results)
+        assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_followers_get_independent_copies(self):
+        """Test one caller mutating its result doesn't affect another"""
+        flight = SingleFlight()
+        
+        async def work():
+            await asyncio.sleep(0.01)
+            return {"items": []}
+        
+        first, second = await asyncio.gather(flight.run("key", work), flight.run("key", work))
+        first["items"].append("changed")
+        
+        assert second == {"items": []}
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_every_caller(self):
+        """Test a failing call raises for the leader and its followers"""
+        flight = SingleFlight()
+        
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+        
+        results = await asyncio.gather(flight.run("key", work), flight.run("key", work), return_exceptions=True)
+        
+        assert all(isinstance(result, ValueError) for result in results)
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_completed_calls_are_not_reused(self):
+        """Test a key runs again once its previous call has finished"""
+        flight = SingleFlight()
+        calls = []
+        
+        async def work():
+            calls.append(1)
+            return len(calls)
+        
+        assert await flight.run("key", work) == 1
+        assert await flight.run("key", work) == 2
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_work_is_cancelled_when_every_caller_leaves(self):
+        """Test one caller leaving keeps the work running, and the last one leaving stops it"""
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = []
+        
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+        
+        first = asyncio.create_task(flight.run("key", work))
+        second = asyncio.create_task(flight.run("key", work))
+        await started.wait()
+        
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert cancelled == []
+        
+        second.cancel()
+        await asyncio.gather(second, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert cancelled == [1]
+        assert flight.stats()["in_flight"] == 0
+    
+    @pytest.mark.unit
+    def test_run_sync_coalesces_threads(self):
+        """Test the blocking variant shares one call between threads"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+        
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(1)
+            return "done"
+        
+        leader = threading.Thread(target=lambda: results.append(flight.run_sync("key", work)))
+        leader.start()
+        started.wait(1)
+        follower = threading.Thread(target=lambda: results.append(flight.run_sync("key", work)))
+        follower.start()
+        for _ in range(100):
+            if flight.stats()["coalesced"]:
+                break
+            time.sleep(0.01)
+        release.set()
+        leader.join(1)
+        follower.join(1)
+        
+        assert calls == [1]
+        assert results == ["done", "done"]
@@ -0,0 +1,63 @@
+"""
+Unit tests for skill-profile canonicalisation
+"""
+import pytest
+
+from services.skill_profile import normalize_skill_profile, normalize_skills, normalize_expertise
+
+
+class TestSkillProfile:
+    """Test cases for the skill-profile normaliser"""
+    
+    @pytest.mark.unit
+    def test_equivalent_skill_lists_share_a_key(self):
+        """Test ordering, case, spacing and aliases don't change the profile key"""
+        keys = {
+            normalize_skill_profile(skills, "Intermediate").key
+            for skills in ["Python, React", "react,python", "python , React.js", "Python; reactjs, python"]
+        }
+        
+        assert len(keys) == 1
+    
+    @pytest.mark.unit
+    def test_aliases_map_to_canonical_names(self):
+        """Test common abbreviations are expanded"""
+        assert normalize_skills("JS, k8s, golang, ML") == ["Go", "JavaScript", "Kubernetes", "Machine Learning"]
+    
+    @pytest.mark.unit
+    def test_unknown_skills_are_kept_lowercase(self):
+        """Test skills without a canonical spelling survive normalisation"""
+        assert normalize_skills("Python and  Quantum   Computing") == ["Python", "quantum computing"]
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("expertise,expected", [
+        ("beginner", "Beginner"),
+        ("Junior developer", "Beginner"),
+        ("mid-level", "Intermediate"),
+        ("Senior engineer", "Advanced"),
+        ("3 years", "Intermediate"),
+        ("10+ yrs", "Advanced"),
+        ("  Self   taught ", "Self taught"),
+        # Keywords only count as whole words
+        ("Leading small projects", "Leading small projects"),
+        ("seniority: 3 years", "Intermediate"),
+        ("middleware, 1 year", "Beginner"),
+    ])
+    def test_expertise_buckets(self, expertise, expected):
+        """Test free-form expertise is bucketed"""
+        assert normalize_expertise(expertise) == expected
+    
+    @pytest.mark.unit
+    def test_empty_profile_is_falsy(self):
+        """Test a profile with no usable skills is rejected"""
+        assert not normalize_skill_profile(" , ;", "Beginner")
+        assert not normalize_skill_profile("Python", "")
+    
+    @pytest.mark.unit
+    def test_canonical_text_is_idempotent(self):
+        """Test normalising the canonical text again gives the same profile"""
+        profile = normalize_skill_profile("react.js, JS, docker", "expert")
+        again = normalize_skill_profile(profile.skills_text, profile.expertise)
+        
+        assert again == profile
+        assert profile.skills_text == "Docker, JavaScript, React"
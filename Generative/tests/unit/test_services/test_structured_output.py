@@ -0,0 +1,141 @@
+"""
+Unit tests for structured output schemas, JSON repair and partial validation
+"""
+import json
+import pytest
+
+from services.structured_output import (
+    repair_json, gemini_schema, openai_schema, parse_career_analysis, parse_mock_test_questions,
+    IncrementalJSONParser, CareerAnalysisStream
+)
+
+
+def _path(title):
+    return {
+        "title": title,
+        "description": "desc",
+        "required_skills": ["Python"],
+        "salary_range": "₹5-10 lakhs",
+        "growth_prospect": "High"
+    }
+
+
+class TestRepairJson:
+    """Test cases for repair_json"""
+    
+    @pytest.mark.unit
+    def test_valid_json_surrounded_by_prose(self):
+        """Test well-formed JSON is found inside a chatty response"""
+        text = 'Sure! Here it is:\n```json\n{"a": [1, 2], "b": "x}"}\n```\nHope that helps.'
+        assert repair_json(text) == {"a": [1, 2], "b": "x}"}
+    
+    @pytest.mark.unit
+    def test_common_llm_mistakes(self):
+        """Test trailing commas, comments, single quotes, unquoted keys and Python literals"""
+        text = "{title: 'Dev', // main role\n 'skills': ['a', 'b',], ok: True, none: None, n: 2.5,}"
+        assert repair_json(text) == {"title": "Dev", "skills": ["a", "b"], "ok": True, "none": None, "n": 2.5}
+    
+    @pytest.mark.unit
+    def test_truncated_output_is_closed(self):
+        """Test output cut off mid-document keeps everything that arrived"""
+        text = '{"items": [{"q": "one", "a": "1"}, {"q": "two", "a": "trunc'
+        assert repair_json(text) == {"items": [{"q": "one", "a": "1"}, {"q": "two", "a": "trunc"}]}
+    
+    @pytest.mark.unit
+    def test_expect_and_nothing_to_parse(self):
+        """Test the expected document kind is honoured and plain text yields None"""
+        assert repair_json('[1] then {"a": 1}', "{") == {"a": 1}
+        assert repair_json("no json here") is None
+        assert repair_json("") is None
+
+
+class TestSchemas:
+    """Test cases for provider response schemas"""
+    
+    @pytest.mark.unit
+    def test_openai_schema_is_self_contained(self):
+        """Test $refs are inlined so the schema can be sent on its own"""
+        schema = openai_schema("career_analysis")
+        assert "$defs" not in schema and "$ref" not in str(schema)
+        assert schema["properties"]["career_paths"]["items"]["properties"]["title"] == {"type": "string"}
+    
+    @pytest.mark.unit
+    def test_gemini_schema_uses_openapi_types(self):
+        """Test types are upper-cased and Optional fields become nullable"""
+        schema = gemini_schema("career_analysis")
+        course = schema["properties"]["courses"]["items"]
+        assert schema["type"] == "OBJECT"
+        assert course["properties"]["type"] == {"type": "STRING", "nullable": True}
+        assert "anyOf" not in str(schema)
+
+
+class TestPartialValidation:
+    """Test cases for parse_career_analysis and parse_mock_test_questions"""
+    
+    @pytest.mark.unit
+    def test_invalid_items_are_dropped_individually(self):
+        """Test valid career paths and roadmap steps survive next to malformed ones"""
+        text = str({
+            "career_paths": [_path("Data Engineer"), {"title": "missing fields"}],
+            "roadmap": [
+                {"step": "1", "title": "Basics", "description": "d", "duration": "1 month", "resources": []},
+                {"step": "two", "title": "Bad"}
+            ],
+            "courses": "not a list"
+        })
+        result = parse_career_analysis(text)
+        
+        assert [path["title"] for path in result["career_paths"]] == ["Data Engineer"]
+        assert result["selected_path"]["title"] == "Data Engineer"
+        assert [step["step"] for step in result["roadmap"]] == [1]
+        assert result["courses"] == [] and result["certifications"] == []
+    
+    @pytest.mark.unit
+    def test_no_usable_career_path(self):
+        """Test an analysis without a single valid career path is rejected"""
+        assert parse_career_analysis('{"career_paths": [{"title": "x"}]}') is None
+        assert parse_career_analysis("I cannot help with that") is None
+    
+    @pytest.mark.unit
+    def test_mock_test_questions_from_array_or_object(self):
+        """Test questions are accepted bare or wrapped, keeping only valid ones"""
+        wrapped = '{"questions": [{"question": "Q1", "answer": "A1"}, {"question": "Q2"}]}'
+        bare = '[{"question": "Q1", "answer": "A1"}]'
+        
+        assert [q.question for q in parse_mock_test_questions(wrapped)] == ["Q1"]
+        assert [q.answer for q in parse_mock_test_questions(bare)] == ["A1"]
+
+
+class TestIncrementalParsing:
+    """Test cases for IncrementalJSONParser and CareerAnalysisStream"""
+    
+    @pytest.mark.unit
+    def test_objects_are_reported_as_soon_as_they_close(self):
+        """Test each nested object is emitted by the chunk that closes it"""
+        parser = IncrementalJSONParser()
+        
+        assert parser.feed('```json\n{"career_paths": [{"title": "A ]}\\" tricky"}, {"ti') == [
+            (("career_paths", 0), {"title": 'A ]}" tricky'})
+        ]
+        assert parser.feed('tle": "B", "tags": [{"x": 1}]}], "selected_path": {"title": "B"') == [
+            (("career_paths", 1), {"title": "B", "tags": [{"x": 1}]})
+        ]
+        assert parser.feed('}}') == [(("selected_path",), {"title": "B"})]
+        assert parser.feed(' and {"trailing": {}}') == []
+    
+    @pytest.mark.unit
+    def test_analysis_stream_validates_items(self):
+        """Test invalid items are skipped and valid ones numbered per section"""
+        stream = CareerAnalysisStream()
+        doc = json.dumps({
+            "career_paths": [{"title": "broken"}, _path("Analyst")],
+            "roadmap": [{"step": 1, "title": "Start", "description": "d", "duration": "1 month", "resources": []}]
+        })
+        items = [item for char in doc for item in stream.feed(char)]
+        
+        assert [(section, index, item["title"]) for section, index, item in items] == [
+            ("career_paths", 0, "Analyst"),
+            ("roadmap", 0, "Start")
+        ]
+        assert stream.selected_path is None
+        assert stream.text == doc
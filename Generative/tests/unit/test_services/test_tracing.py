@@ -0,0 +1,206 @@
+"""
+Unit tests for request tracing and the OTLP/JSON span exporter
+"""
+import json
+import os
+import httpx
+import pytest
+from unittest.mock import patch
+
+from services.ai_service import AIService
+from services.tracing import (
+    NOOP_SPAN, SPAN_KIND_CLIENT, SPAN_KIND_SERVER, STATUS_ERROR, SpanExporter,
+    current_request_id, current_span, propagation_headers, span, start_trace, traced
+)
+
+
+def _exported_spans(path):
+    spans = []
+    with open(path) as file:
+        for line in file:
+            for resource in json.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    spans.extend(scope["spans"])
+    return spans
+
+def _attributes(exported):
+    return {item["key"]: next(iter(item["value"].values())) for item in exported["attributes"]}
+
+
+class TestSpans:
+    """Test cases for spans, traces and their OTLP/JSON export"""
+
+    @pytest.mark.unit
+    def test_spans_are_noops_outside_a_trace(self):
+        """Test the helpers record nothing when no request is being traced"""
+        with span("ai.generate") as current:
+            current.set_attribute("ai.cache_hit", True)
+        assert current is NOOP_SPAN
+        assert current_span() is NOOP_SPAN
+        assert propagation_headers("http://localhost:11434/api/generate") == {}
+
+    @pytest.mark.unit
+    def test_trace_exports_nested_spans(self, tmp_path):
+        """Test child spans nest under the root and the trace is written as OTLP/JSON"""
+        path = str(tmp_path / "traces.jsonl")
+        exporter = SpanExporter(path=path, endpoint="")
+
+        @traced()
+        def lookup():
+            return "user"
+
+        with start_trace("GET /me", request_id="req-1", exporter=exporter) as root:
+            with span("get_current_user") as auth:
+                lookup()
+            with pytest.raises(ValueError):
+                with span("ai.parse_json"):
+                    raise ValueError("bad json")
+            assert current_request_id() == "req-1"
+        exporter.flush()
+        exporter.shutdown()
+
+        spans = {exported["name"]: exported for exported in _exported_spans(path)}
+        assert set(spans) == {"GET /me", "get_current_user", "ai.parse_json", lookup.__qualname__}
+        assert spans["GET /me"]["kind"] == SPAN_KIND_SERVER
+        assert "parentSpanId" not in spans["GET /me"]
+        assert _attributes(spans["GET /me"])["request.id"] == "req-1"
+        assert spans["get_current_user"]["parentSpanId"] == root.span_id
+        assert spans[lookup.__qualname__]["parentSpanId"] == auth.span_id
+        assert {exported["traceId"] for exported in spans.values()} == {root.trace.trace_id}
+        assert spans["ai.parse_json"]["status"] == {"code": STATUS_ERROR, "message": "ValueError: bad json"}
+        assert spans["ai.parse_json"]["events"][0]["name"] == "exception"
+
+    @pytest.mark.unit
+    def test_traceparent_continues_callers_trace(self):
+        """Test a W3C traceparent sets the trace id and parent, and is propagated onwards"""
+        exporter = SpanExporter(path="", endpoint="")
+        traceparent = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+        with start_trace("POST /analyze", request_id="req-2", traceparent=traceparent, exporter=exporter) as root:
+            headers = propagation_headers("http://localhost:11434/api/generate")
+
+        assert root.trace.trace_id == "a" * 32
+        assert root.parent_id == "b" * 16
+        assert headers == {"traceparent": f"00-{'a' * 32}-{root.span_id}-01", "X-Request-ID": "req-2"}
+
+        with start_trace("POST /analyze", traceparent="garbage", exporter=exporter) as root:
+            pass
+        assert root.parent_id is None and len(root.trace.trace_id) == 32
+
+    @pytest.mark.unit
+    def test_ids_only_go_to_internal_hosts(self):
+        """Test third-party APIs never get our traceparent or request ID"""
+        with start_trace("POST /chat/", request_id="req-5", exporter=SpanExporter(path="", endpoint="")):
+            assert propagation_headers("https://api.groq.com/openai/v1/chat/completions") == {}
+            assert propagation_headers("http://127.0.0.1:9100/api/generate")["X-Request-ID"] == "req-5"
+
+    @pytest.mark.unit
+    def test_unsampled_parent_is_not_exported(self, tmp_path):
+        """Test a caller's not-sampled flag is propagated and the trace is not exported"""
+        path = tmp_path / "traces.jsonl"
+        exporter = SpanExporter(path=str(path), endpoint="")
+        traceparent = "00-" + "a" * 32 + "-" + "b" * 16 + "-00"
+        with start_trace("POST /analyze", traceparent=traceparent, exporter=exporter) as root:
+            headers = propagation_headers("http://localhost:11434/api/generate")
+        exporter.flush()
+        exporter.shutdown()
+
+        assert headers["traceparent"] == f"00-{'a' * 32}-{root.span_id}-00"
+        assert not path.exists()
+
+    @pytest.mark.unit
+    def test_full_export_queue_drops_and_counts(self, tmp_path):
+        """Test traces that don't fit in the queue are dropped instead of blocking"""
+        from services.metrics import trace_spans_dropped
+        exporter = SpanExporter(path=str(tmp_path / "traces.jsonl"), endpoint="", queue_size=1)
+        dropped = trace_spans_dropped.value()
+        with patch.object(exporter, '_ensure_started'):
+            for _ in range(3):
+                with start_trace("GET /health", exporter=exporter):
+                    pass
+        assert trace_spans_dropped.value() == dropped + 2
+
+
+class TestProviderSpans:
+    """Test cases for spans around the provider cascade"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_each_provider_attempt_is_a_span(self, tmp_path):
+        """Test attempts and their HTTP calls nest under ai.generate with their outcome"""
+        with patch.dict(os.environ, {
+            'GROQ_API_KEY': 'test-groq-key', 'OPENAI_FREE_API_KEY': 'test-openai-key', 'OPENAI_FREE_API_URL': 'http://llm.local'
+        }):
+            with patch('services.ai_service.VERTEX_AI_AVAILABLE', False):
+                ai_service = AIService()
+
+        seen_headers = []
+        def handler(request):
+            seen_headers.append(request.headers)
+            if len(seen_headers) == 1:
+                return httpx.Response(401, json={"error": "bad key"})
+            return httpx.Response(200, json={"choices": [{"message": {"content": "Hi"}}]})
+
+        path = str(tmp_path / "traces.jsonl")
+        exporter = SpanExporter(path=path, endpoint="")
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(ai_service, '_get_http_client', return_value=client), \
+             patch.object(ai_service, '_provider_order', return_value=['groq', 'openai_free']), \
+             patch.object(ai_service, '_is_provider_usable', return_value=True), \
+             patch('services.tracing.settings.TRACING_PROPAGATE_HOSTS', ['llm.local']):
+            with start_trace("POST /chat/", request_id="req-3", exporter=exporter):
+                text = await ai_service._generate_with_fallback_ai_async("Test prompt", use_cache=False)
+        await client.aclose()
+        exporter.flush()
+        exporter.shutdown()
+
+        assert text == "Hi"
+        spans = _exported_spans(path)
+        generate = next(exported for exported in spans if exported["name"] == "ai.generate")
+        attempts = [exported for exported in spans if exported["name"] == "ai.provider_attempt"]
+        calls = [exported for exported in spans if exported["name"] == "ai.provider_call"]
+
+        assert [(_attributes(a)["ai.provider"], _attributes(a)["ai.outcome"]) for a in attempts] == [
+            ("groq", "http_error"), ("openai_free", "success")
+        ]
+        assert all(attempt["parentSpanId"] == generate["spanId"] for attempt in attempts)
+        assert {call["parentSpanId"] for call in calls} == {attempt["spanId"] for attempt in attempts}
+        assert all(call["kind"] == SPAN_KIND_CLIENT for call in calls)
+        # Groq is a third-party API; only the internal host gets the IDs
+        assert "X-Request-ID" not in seen_headers[0] and "traceparent" not in seen_headers[0]
+        assert seen_headers[1]["X-Request-ID"] == "req-3"
+        assert seen_headers[1]["traceparent"].split("-")[1] == generate["traceId"]
+
+
+class TestTracingMiddleware:
+    """Test cases for request IDs and per-request traces"""
+
+    @pytest.mark.unit
+    def test_request_id_is_echoed_or_generated(self, client):
+        """Test a usable X-Request-ID is kept and anything else is replaced"""
+        assert client.get("/health", headers={"X-Request-ID": "abc-123"}).headers["X-Request-ID"] == "abc-123"
+        generated = client.get("/health", headers={"X-Request-ID": "bad id\n"}).headers["X-Request-ID"]
+        assert generated != "bad id\n" and len(generated) == 32
+
+    @pytest.mark.unit
+    def test_request_trace_covers_auth_and_user_lookup(self, client, tmp_path):
+        """Test a traced request has a root span per route with auth and storage spans under it"""
+        from services.tracing import span_exporter
+        token = client.post("/auth/register", json={
+            "email": "tracing@example.com", "password": "secret", "full_name": "Tracing Test"
+        }).json()["access_token"]
+
+        path = str(tmp_path / "traces.jsonl")
+        with patch('services.tracing.settings.TRACING_ENABLED', True), \
+             patch.object(span_exporter, 'path', path), patch.object(span_exporter, 'endpoint', ""):
+            response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}", "X-Request-ID": "req-4"})
+            span_exporter.flush()
+
+        assert response.status_code == 200
+        spans = {exported["name"]: exported for exported in _exported_spans(path)}
+        root = spans["GET /auth/me"]
+        assert _attributes(root)["request.id"] == "req-4"
+        assert _attributes(root)["http.route"] == "/auth/me"
+        assert _attributes(root)["http.status_code"] == "200"
+        assert spans["get_current_user"]["parentSpanId"] == root["spanId"]
+        assert _attributes(spans["get_current_user"])["auth.result"] == "ok"
+        assert spans["MockUserService.get_user_by_email"]["parentSpanId"] == spans["get_current_user"]["spanId"]
@@ -0,0 +1,71 @@
+"""
+Unit tests for the load benchmark harness
+"""
+import pytest
+from httpx import AsyncClient
+
+from main import app
+from tools.load_benchmark import Workload, parse_mix, percentile, summarize, compare, run_load
+
+
+def _sample(route, latency, ok=True, status=200):
+    return {"route": route, "latency": latency, "ok": ok, "status": status}
+
+
+class TestLoadBenchmark:
+    """Test cases for the load benchmark"""
+    
+    @pytest.mark.unit
+    def test_parse_mix(self):
+        """Test weights are parsed, defaulted and validated"""
+        assert parse_mix("analyze=2, chat,me=0") == {"analyze": 2.0, "chat": 1.0}
+        with pytest.raises(ValueError):
+            parse_mix("analyse=1")
+        with pytest.raises(ValueError):
+            parse_mix("me=0")
+    
+    @pytest.mark.unit
+    def test_percentile_interpolates(self):
+        """Test percentiles interpolate between ranks"""
+        values = [10.0, 20.0, 30.0, 40.0]
+        assert percentile(values, 50) == 25.0
+        assert percentile(values, 100) == 40.0
+        assert percentile([], 99) == 0.0
+    
+    @pytest.mark.unit
+    def test_summarize_and_compare(self):
+        """Test per-route stats and the comparison against a previous run"""
+        samples = [_sample("me", 0.01), _sample("me", 0.03), _sample("chat", 0.5, ok=False, status=500)]
+        summary = summarize(samples, elapsed=2.0)
+        assert summary["overall"]["requests"] == 3
+        assert summary["overall"]["throughput_rps"] == 1.5
+        assert summary["me"]["p50_ms"] == 20.0
+        assert summary["chat"]["error_rate"] == 1.0
+        assert summary["chat"]["error_statuses"] == {"500": 1}
+        
+        faster = summarize([_sample("me", 0.01), _sample("me", 0.01)], elapsed=1.0)
+        rows = compare({"routes": faster}, {"routes": summary})
+        me = next(row for row in rows if row["route"] == "me")
+        assert me["p50_ms_change"] == -0.5
+        assert me["throughput_rps_change"] == 1.0
+    
+    @pytest.mark.unit
+    def test_unique_profiles_never_repeat(self):
+        """Test unique profiles defeat the completion cache"""
+        workload = Workload(seed=1, unique_profiles=True)
+        profiles = {workload.profile()["skills"] for _ in range(50)}
+        assert len(profiles) == 50
+    
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_run_load_against_app(self):
+        """Test a short run logs in and measures every request in the mix"""
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            results = await run_load(
+                client, {"suggest_skills": 1, "me": 1}, concurrency=2, duration=30, max_requests=10,
+                workload=Workload(seed=3)
+            )
+        overall = results["routes"]["overall"]
+        assert overall["requests"] == 10
+        assert overall["errors"] == 0
+        assert set(results["routes"]) == {"overall", "suggest_skills", "me"}
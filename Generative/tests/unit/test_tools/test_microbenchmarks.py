@@ -0,0 +1,67 @@
+"""
+Unit tests for the microbenchmark suite
+"""
+import json
+import pytest
+
+from tools.microbenchmarks import (
+    Benchmark, BASELINE_PATH, build_benchmarks, measure, compare, make_baseline
+)
+
+
+def _result(best_us, peak_kib=10.0):
+    return {"best_us": best_us, "median_us": best_us, "spread": 0.0, "loops": 1, "peak_kib": peak_kib}
+
+
+class TestMicrobenchmarks:
+    """Test cases for the microbenchmark suite"""
+    
+    @pytest.mark.unit
+    def test_measure_reports_time_and_memory(self):
+        """Test a measurement has per-call timings and the peak allocation"""
+        result = measure(lambda: [0] * 10000, repeat=2, min_time=0.001)
+        assert 0 < result["best_us"] <= result["median_us"]
+        assert result["loops"] >= 1
+        assert result["peak_kib"] >= 70
+    
+    @pytest.mark.unit
+    def test_compare_applies_budgets(self):
+        """Test slowdowns and memory growth beyond the budget are regressions"""
+        baseline = {"calibration_us": 100, "benchmarks": {
+            "fast": {**_result(10), "time_budget": 1.5, "memory_budget": 1.25},
+            "lean": {**_result(10, peak_kib=10), "time_budget": 1.5, "memory_budget": 1.25},
+            "quick": {**_result(10), "time_budget": 1.5, "memory_budget": 1.25},
+        }}
+        current = {"calibration_us": 100, "benchmarks": {
+            "fast": _result(16), "lean": _result(10, peak_kib=13), "quick": _result(6), "brand_new": _result(1)
+        }}
+        statuses = {row["name"]: row["status"] for row in compare(current, baseline)}
+        assert statuses == {"fast": "regression", "lean": "regression", "quick": "improved", "brand_new": "new"}
+    
+    @pytest.mark.unit
+    def test_compare_normalizes_by_calibration(self):
+        """Test a uniformly slower machine does not count as a regression"""
+        baseline = {"calibration_us": 100, "benchmarks": {"fast": {**_result(10), "time_budget": 1.5}}}
+        current = {"calibration_us": 200, "benchmarks": {"fast": _result(20)}}
+        assert compare(current, baseline)[0]["status"] == "ok"
+        assert compare(current, baseline, normalize=False)[0]["status"] == "regression"
+    
+    @pytest.mark.unit
+    def test_make_baseline_keeps_tuned_budgets(self):
+        """Test re-recording a baseline keeps hand-edited budgets"""
+        benchmarks = [Benchmark("a", lambda: None, "A"), Benchmark("b", lambda: None, "B")]
+        previous = {"benchmarks": {"a": {**_result(1), "time_budget": 3.0, "memory_budget": 2.0}}}
+        baseline = make_baseline({"calibration_us": 1, "benchmarks": {"a": _result(2), "b": _result(3)}}, benchmarks, previous)
+        assert baseline["benchmarks"]["a"]["best_us"] == 2
+        assert baseline["benchmarks"]["a"]["time_budget"] == 3.0
+        assert baseline["benchmarks"]["b"]["time_budget"] == benchmarks[1].time_budget
+    
+    @pytest.mark.unit
+    def test_suite_runs_and_has_a_baseline(self):
+        """Test every benchmark still runs and is covered by the stored baseline"""
+        with open(BASELINE_PATH) as f:
+            stored = json.load(f)["benchmarks"]
+        for benchmark in build_benchmarks():
+            benchmark.func()
+            assert benchmark.name in stored
+            assert stored[benchmark.name]["time_budget"] > 1
@@ -0,0 +1,98 @@
+"""
+Unit tests for the stub LLM server used in load tests
+"""
+import os
+import pytest
+from unittest.mock import patch
+from urllib.parse import urlsplit
+from fastapi.testclient import TestClient
+
+from services.ai_service import AIService
+from services.structured_output import parse_career_analysis, parse_mock_test_questions
+from tools.stub_llm_server import StubLLMServer, StubConfig
+
+
+def _path_of(url):
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+class TestStubLLMServer:
+    """Test cases for StubLLMServer"""
+    
+    def setup_method(self):
+        """Setup an AIService that builds requests for every provider and a fast stub"""
+        with patch.dict(os.environ, {
+            'GROQ_API_KEY': 'stub',
+            'OPENAI_FREE_API_KEY': 'stub',
+            'OPENAI_FREE_API_URL': 'http://stub',
+            'OLLAMA_BASE_URL': 'http://stub'
+        }):
+            with patch('services.ai_service.VERTEX_AI_AVAILABLE', False):
+                self.ai_service = AIService()
+        self.ai_service.google_genai_url = "http://stub/v1beta/models/gemini-1.5-flash-latest:generateContent?key=stub"
+        self.ai_service.groq_url = "http://stub/openai/v1/chat/completions"
+        self.server = StubLLMServer(StubConfig(latency_ms=0, stream_chunk_delay_ms=0), seed=1)
+        self.client = TestClient(self.server.app)
+        self.prompt = self.ai_service._build_mock_test_prompt("Python, SQL", "Intermediate")
+    
+    def _post(self, provider, prompt, stream=False, schema=None):
+        if stream:
+            request = self.ai_service._build_stream_request(provider, prompt, schema)
+        else:
+            request = self.ai_service._build_provider_request(provider, prompt, schema)
+        return self.client.post(_path_of(request["url"]), json=request["json"])
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("provider", ["google_genai", "ollama", "groq", "openai_free"])
+    def test_each_wire_format_returns_valid_mock_test(self, provider):
+        """Test every provider format parses into five valid mock test questions"""
+        response = self._post(provider, self.prompt, schema="mock_test")
+        assert response.status_code == 200
+        text = self.ai_service._parse_provider_response(provider, response.json())
+        assert len(parse_mock_test_questions(text)) == 5
+    
+    @pytest.mark.unit
+    @pytest.mark.parametrize("provider", ["google_genai", "ollama", "groq", "openai_free"])
+    def test_streamed_career_analysis_is_complete(self, provider):
+        """Test streamed chunks reassemble into a schema-valid career analysis"""
+        prompt = "Based on the following skills and expertise, provide a comprehensive career analysis:\nSkills: Go\nExpertise: Advanced"
+        response = self._post(provider, prompt, stream=True, schema="career_analysis")
+        text = "".join(self.ai_service._parse_stream_chunk(provider, line) for line in response.text.splitlines())
+        analysis = parse_career_analysis(text)
+        assert analysis["career_paths"][0]["title"] == "Go Developer"
+        assert len(analysis["roadmap"]) == 5
+    
+    @pytest.mark.unit
+    def test_huggingface_and_model_listings(self):
+        """Test the Hugging Face endpoint and the health check listings"""
+        response = self.client.post("/models/gpt2", json={"inputs": "How do I learn Rust?"})
+        assert self.ai_service._parse_provider_response("huggingface", response.json())
+        for path in ("/v1beta/models", "/api/tags", "/v1/models", "/openai/v1/models", "/api/whoami-v2"):
+            assert self.client.get(path).status_code == 200
+    
+    @pytest.mark.unit
+    def test_rate_limit_sends_retry_after(self):
+        """Test injected 429s carry a Retry-After header"""
+        self.client.post("/_stub/config", json={"rate_limit_rate": 1, "retry_after_seconds": 2})
+        response = self._post("groq", self.prompt)
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
+        assert self.server.stats["groq"]["rate_limited"] == 1
+    
+    @pytest.mark.unit
+    def test_errors_can_target_one_provider(self):
+        """Test a per-provider override leaves other providers healthy"""
+        self.client.post("/_stub/config?provider=ollama", json={"error_rate": 1, "error_status": 502})
+        assert self._post("ollama", self.prompt).status_code == 502
+        assert self._post("openai_free", self.prompt).status_code == 200
+    
+    @pytest.mark.unit
+    def test_truncated_json_is_partially_recoverable(self):
+        """Test truncated responses are cut short but keep their valid items"""
+        self.client.post("/_stub/config", json={"truncate_rate": 1})
+        response = self._post("openai_free", self.prompt)
+        text = self.ai_service._parse_provider_response("openai_free", response.json())
+        assert not text.endswith("}")
+        assert len(parse_mock_test_questions(text)) < 5
+        assert self.server.stats["openai"]["truncated"] == 1
@@ -0,0 +1,75 @@
+"""
+Unit tests for the trace collector stand-in and trace report
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from tools.trace_collector import create_app, critical_path, fan_out, format_trace, load_spans, report
+
+
+def _span(span_id, name, start_ms, end_ms, parent=None, **attributes):
+    span = {
+        "traceId": "t" * 32,
+        "spanId": span_id,
+        "name": name,
+        "startTimeUnixNano": str(int(start_ms * 1e6)),
+        "endTimeUnixNano": str(int(end_ms * 1e6)),
+        "attributes": [{"key": key, "value": {"stringValue": value}} for key, value in attributes.items()],
+        "status": {"code": 0}
+    }
+    if parent:
+        span["parentSpanId"] = parent
+    return span
+
+def _hedged_trace():
+    return [
+        _span("root", "POST /analyze", 0, 900),
+        _span("auth", "get_current_user", 1, 5, "root"),
+        _span("gen", "ai.generate", 6, 880, "root"),
+        _span("a1", "ai.provider_attempt", 7, 850, "gen", **{"ai.provider": "groq", "ai.outcome": "cancelled"}),
+        _span("a2", "ai.provider_attempt", 300, 870, "gen", **{"ai.provider": "ollama", "ai.outcome": "success"}),
+        _span("c2", "ai.provider_call", 301, 860, "a2", **{"ai.provider": "ollama"}),
+        _span("json", "ai.parse_json", 881, 890, "root"),
+    ]
+
+
+class TestTraceReport:
+    """Test cases for the critical path and fan-out report"""
+
+    @pytest.mark.unit
+    def test_critical_path_follows_the_last_child_to_finish(self):
+        """Test the path goes through the span each parent was waiting on"""
+        path = [span["spanId"] for span in critical_path(_hedged_trace())]
+        assert path == ["root", "json"]
+
+        trace = [span for span in _hedged_trace() if span["spanId"] != "json"]
+        assert [span["spanId"] for span in critical_path(trace)] == ["root", "gen", "a2", "c2"]
+
+    @pytest.mark.unit
+    def test_fan_out_and_tree(self):
+        """Test provider attempts are counted and the tree marks the critical path"""
+        trace = _hedged_trace()
+        assert fan_out(trace)["ai.provider_attempt"] == 2
+        assert fan_out(trace)["ai.provider_call"] == 1
+
+        lines = format_trace(trace)
+        assert lines[0] == "* POST /analyze 900.0ms"
+        assert "      ai.provider_attempt 843.0ms [ai.provider=groq, ai.outcome=cancelled]" in lines
+        assert report(trace, slowest=1)[1].startswith("  POST /analyze: 1 requests, median 900.0ms, ai.provider_attempt=2.00")
+        assert report(trace, route="GET /health") == ["No traces found."]
+
+
+class TestCollector:
+    """Test cases for the OTLP/HTTP collector stand-in"""
+
+    @pytest.mark.unit
+    def test_exports_are_appended_and_readable(self, tmp_path):
+        """Test POSTed OTLP/JSON lands in the file in a form the report reads"""
+        output = str(tmp_path / "collector.jsonl")
+        payload = {"resourceSpans": [{"resource": {"attributes": []}, "scopeSpans": [{"scope": {"name": "test"}, "spans": _hedged_trace()}]}]}
+
+        with TestClient(create_app(output)) as client:
+            assert client.post("/v1/traces", json=payload).status_code == 200
+            assert client.post("/v1/traces", content=b"not json").status_code == 400
+
+        assert [span["spanId"] for span in load_spans(output)] == [span["spanId"] for span in _hedged_trace()]
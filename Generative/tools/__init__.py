@@ -0,0 +1 @@
+# Development and load-testing tools
@@ -0,0 +1,388 @@
+"""
+End-to-end load and latency benchmark for the API.
+
+Boots tools/stub_llm_server.py and main.app with uvicorn, points AIService at the stub and
+drives /analyze, /chat/, /mock-test, /ai/suggest-skills, /auth/login and /auth/me from
+concurrent clients with a weighted request mix. Reports throughput, p50/p95/p99 latency and
+error rate per route, and saves the results as JSON so runs can be compared across releases.
+
+    python tools/load_benchmark.py --concurrency 32 --duration 60 \\
+        --mix analyze=2,chat=3,mock_test=1,suggest_skills=4,login=1,me=3 --stub-latency-ms 400
+    python tools/load_benchmark.py --target http://localhost:8001 --duration 30
+    python tools/load_benchmark.py --duration 60 --compare benchmarks/results/load-1.0.0.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.stub_llm_server import StubLLMServer, StubConfig
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "results")
+
+DEFAULT_MIX = "analyze=2,chat=3,mock_test=1,suggest_skills=4,login=1,me=3"
+
+SKILL_POOL = [
+    "Python", "JavaScript", "React", "SQL", "Docker", "AWS", "Java", "Go",
+    "Machine Learning", "Node.js", "Kubernetes", "TypeScript", "Django", "Rust"
+]
+EXPERTISE_LEVELS = ["Beginner", "Intermediate", "Advanced"]
+CHAT_MESSAGES = [
+    "How do I become a backend developer?",
+    "I just learned Docker and Kubernetes, what should I learn next?",
+    "Which certifications are worth it for cloud roles?",
+    "I know React and TypeScript. Am I ready for a frontend job?",
+    "How long does it take to learn Machine Learning?",
+]
+SUGGEST_QUERIES = ["py", "java", "react", "data", "cloud", "ml", "dev", "sec", "go", "ku"]
+
+BENCHMARK_USER = {
+    "email": "loadtest@example.com",
+    "password": "loadtest-password",
+    "full_name": "Load Test",
+    "skills": "Python, SQL",
+    "expertise": "Intermediate"
+}
+
+RequestSpec = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+# ---------------------------------------------------------------------------
+# Request mix
+# ---------------------------------------------------------------------------
+
+class Workload:
+    """Builds the next request for each route, drawing profiles from a shared skill pool"""
+
+    def __init__(self, seed: Optional[int] = None, unique_profiles: bool = False):
+        self.random = random.Random(seed)
+        self.unique_profiles = unique_profiles
+        self.sequence = 0
+        self.routes: Dict[str, Callable[[], RequestSpec]] = {
+            "analyze": lambda: ("POST", "/analyze", self.profile()),
+            "chat": lambda: ("POST", "/chat/", {"message": self.random.choice(CHAT_MESSAGES)}),
+            "mock_test": lambda: ("POST", "/mock-test", {**self.profile(), "topic": self.random.choice(["", "interviews"])}),
+            "suggest_skills": lambda: ("POST", "/ai/suggest-skills", {"query": self.random.choice(SUGGEST_QUERIES)}),
+            "login": lambda: ("POST", "/auth/login", {"email": BENCHMARK_USER["email"], "password": BENCHMARK_USER["password"]}),
+            "me": lambda: ("GET", "/auth/me", None),
+        }
+
+    def profile(self) -> Dict[str, str]:
+        """Skills and expertise for an analysis or mock test; unique profiles defeat the completion cache"""
+        skills = self.random.sample(SKILL_POOL, self.random.randint(1, 3))
+        if self.unique_profiles:
+            self.sequence += 1
+            skills.append(f"Skill{self.sequence}")
+        return {"skills": ", ".join(skills), "expertise": self.random.choice(EXPERTISE_LEVELS)}
+
+    def next(self, mix: Dict[str, float]) -> Tuple[str, RequestSpec]:
+        route = self.random.choices(list(mix), weights=list(mix.values()))[0]
+        return route, self.routes[route]()
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Route weights from "analyze=2,chat=1"; unknown routes and non-positive totals are rejected"""
+    mix = {}
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        route, _, weight = part.partition("=")
+        if route not in Workload().routes:
+            raise ValueError(f"Unknown route '{route}'. Choose from {', '.join(Workload().routes)}")
+        mix[route] = float(weight or 1)
+    if sum(mix.values()) <= 0:
+        raise ValueError("The request mix needs at least one route with a positive weight")
+    return {route: weight for route, weight in mix.items() if weight > 0}
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linearly interpolated percentile of already sorted values"""
+    if not values:
+        return 0.0
+    rank = (len(values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+def summarize(samples: List[Dict[str, Any]], elapsed: float) -> Dict[str, Dict[str, Any]]:
+    """Per-route and overall throughput, latency percentiles (ms) and error counts"""
+    groups: Dict[str, List[Dict[str, Any]]] = {"overall": samples}
+    for sample in samples:
+        groups.setdefault(sample["route"], []).append(sample)
+
+    summary = {}
+    for route, group in groups.items():
+        latencies = sorted(sample["latency"] * 1000 for sample in group)
+        errors = [sample for sample in group if not sample["ok"]]
+        statuses: Dict[str, int] = {}
+        for sample in errors:
+            statuses[str(sample["status"])] = statuses.get(str(sample["status"]), 0) + 1
+        summary[route] = {
+            "requests": len(group),
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(group), 4) if group else 0.0,
+            "error_statuses": statuses,
+            "throughput_rps": round(len(group) / elapsed, 2) if elapsed > 0 else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        }
+    return summary
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-route change in throughput, p95 and error rate against an earlier results file"""
+    rows = []
+    for route, stats in current["routes"].items():
+        before = baseline.get("routes", {}).get(route)
+        if not before:
+            continue
+        row = {"route": route}
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            row[metric] = stats[metric]
+            row[f"{metric}_change"] = round((stats[metric] - before[metric]) / before[metric], 4) if before[metric] else None
+        row["error_rate"] = stats["error_rate"]
+        row["error_rate_before"] = before["error_rate"]
+        rows.append(row)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+async def _login(client: httpx.AsyncClient) -> str:
+    """Register the benchmark user if needed and return a bearer token"""
+    await client.post("/auth/register", json=BENCHMARK_USER)
+    response = await client.post("/auth/login", json={"email": BENCHMARK_USER["email"], "password": BENCHMARK_USER["password"]})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+async def run_load(
+    client: httpx.AsyncClient,
+    mix: Dict[str, float],
+    concurrency: int = 8,
+    duration: float = 30,
+    max_requests: Optional[int] = None,
+    warmup: float = 0,
+    workload: Optional[Workload] = None,
+    anonymous: bool = False
+) -> Dict[str, Any]:
+    """Drive the request mix from `concurrency` clients and summarize what came back after warmup"""
+    workload = workload or Workload()
+    headers = {} if anonymous else {"Authorization": f"Bearer {await _login(client)}"}
+    samples: List[Dict[str, Any]] = []
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + duration
+    issued = 0
+
+    async def user():
+        nonlocal issued
+        while time.perf_counter() < stop_at and (max_requests is None or issued < max_requests):
+            issued += 1
+            route, (method, path, body) = workload.next(mix)
+            sent = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, headers=headers)
+                status, ok = response.status_code, response.status_code < 400
+            except httpx.HTTPError as e:
+                status, ok = type(e).__name__, False
+            finished = time.perf_counter()
+            if sent >= measure_from:
+                samples.append({"route": route, "status": status, "ok": ok, "latency": finished - sent})
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = max(0.0, time.perf_counter() - measure_from)
+    return {"elapsed_seconds": round(elapsed, 3), "routes": summarize(samples, elapsed)}
+
+
+# ---------------------------------------------------------------------------
+# Servers
+# ---------------------------------------------------------------------------
+
+class ServerThread:
+    """An ASGI app served by uvicorn on a background thread"""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: Optional[int] = None):
+        import uvicorn
+        self.host = host
+        self.port = port or _free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host=host, port=self.port, log_level="warning", lifespan="on"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self) -> "ServerThread":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError(f"Server on port {self.port} failed to start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def stub_environment(stub_url: str) -> Dict[str, str]:
+    """Environment that points every AIService provider at the stub and keeps state off disk"""
+    return {
+        "GOOGLE_GENAI_API_KEY": "stub",
+        "GOOGLE_GENAI_BASE_URL": stub_url,
+        "GROQ_API_KEY": "stub",
+        "GROQ_BASE_URL": f"{stub_url}/openai",
+        "OPENAI_FREE_API_KEY": "stub",
+        "OPENAI_FREE_API_URL": stub_url,
+        "OLLAMA_BASE_URL": stub_url,
+        "HUGGINGFACE_API_KEY": "stub",
+        "HUGGINGFACE_INFERENCE_URL": stub_url,
+        "HUGGINGFACE_HUB_URL": stub_url,
+        "AI_QUOTA_DB_PATH": "",
+        "AI_CACHE_SQLITE_PATH": "",
+        "JOB_QUEUE_DB_PATH": "",
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def print_report(results: Dict[str, Any]) -> None:
+    print(f"\n{'route':<16}{'reqs':>8}{'rps':>9}{'err%':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for route, stats in results["routes"].items():
+        print(
+            f"{route:<16}{stats['requests']:>8}{stats['throughput_rps']:>9.1f}{stats['error_rate'] * 100:>8.2f}"
+            f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}"
+        )
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    def change(value):
+        return "n/a" if value is None else f"{value * 100:+.1f}%"
+    print(f"\n{'route':<16}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'err% now/before':>18}")
+    for row in rows:
+        print(
+            f"{row['route']:<16}{change(row['throughput_rps_change']):>10}{change(row['p50_ms_change']):>10}"
+            f"{change(row['p95_ms_change']):>10}{change(row['p99_ms_change']):>10}"
+            f"{row['error_rate'] * 100:>9.2f}/{row['error_rate_before'] * 100:.2f}"
+        )
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted routes (default {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of load before measuring")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--unique-profiles", action="store_true", help="Never repeat a skill profile (no cache hits)")
+    parser.add_argument("--anonymous", action="store_true", help="Send no bearer token (/auth/me will fail)")
+    parser.add_argument("--target", default=None, help="Benchmark an already running API instead of booting one")
+    parser.add_argument("--output", default=None, help="Results file (default benchmarks/results/load-<version>-<time>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results file to compare against")
+    for name, field in StubConfig.model_fields.items():
+        parser.add_argument(f"--stub-{name.replace('_', '-')}", dest=f"stub_{name}", type=type(field.default), default=field.default)
+    return parser.parse_args(argv)
+
+async def _drive(base_url: str, args: argparse.Namespace, mix: Dict[str, float]) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        return await run_load(
+            client, mix,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            max_requests=args.requests,
+            warmup=args.warmup,
+            workload=Workload(args.seed, args.unique_profiles),
+            anonymous=args.anonymous
+        )
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = _parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    stub_config = StubConfig(**{name: getattr(args, f"stub_{name}") for name in StubConfig.model_fields})
+
+    if args.target:
+        results = asyncio.run(_drive(args.target.rstrip("/"), args, mix))
+        api_version, stub_stats = None, None
+    else:
+        stub = StubLLMServer(stub_config, seed=args.seed)
+        with ServerThread(stub.app) as stub_server:
+            # Settings are read at import, so the environment has to be in place before main is imported
+            os.environ.update(stub_environment(stub_server.url))
+            from main import app
+            from config.settings import settings
+            api_version = settings.API_VERSION
+            with ServerThread(app) as api_server:
+                results = asyncio.run(_drive(api_server.url, args, mix))
+            stub_stats = stub.stats
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "api_version": api_version,
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "target": args.target or "in-process main.app with stub providers",
+        "config": {
+            "mix": mix,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "requests": args.requests,
+            "seed": args.seed,
+            "unique_profiles": args.unique_profiles,
+            "stub": None if args.target else stub_config.model_dump(),
+        },
+        "stub_stats": stub_stats,
+        **results,
+    }
+
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(compare(report, json.load(f)))
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load-{api_version or 'remote'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Microbenchmarks for the pure-Python code that runs on every request.
+
+Each benchmark is timed with timeit (GC off, auto-ranged loop count, best of several
+repeats) and its peak allocation is measured with tracemalloc. Results are checked
+against the stored baseline in benchmarks/microbenchmarks.json, where every benchmark
+also has a budget: the slowdown and memory growth it is allowed before it counts as a
+regression. Times are normalised by a calibration loop so a baseline recorded on one
+machine stays meaningful on another.
+
+    python tools/microbenchmarks.py run                 # print timings
+    python tools/microbenchmarks.py compare             # exit 1 if any budget is exceeded
+    python tools/microbenchmarks.py baseline            # record a new baseline (keeps budgets)
+    python tools/microbenchmarks.py compare --filter json --repeat 9
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "microbenchmarks.json"
+)
+
+# Allowed slowdown / memory growth relative to the baseline before a benchmark regresses
+DEFAULT_TIME_BUDGET = 1.5
+DEFAULT_MEMORY_BUDGET = 1.25
+
+
+class Benchmark:
+    """One callable to time, with its regression budget"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        description: str,
+        time_budget: float = DEFAULT_TIME_BUDGET,
+        memory_budget: float = DEFAULT_MEMORY_BUDGET
+    ):
+        self.name = name
+        self.func = func
+        self.description = description
+        self.time_budget = time_budget
+        self.memory_budget = memory_budget
+
+
+def _run_coroutine(coro):
+    """Run a coroutine that never suspends without paying for an event loop"""
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    coro.close()
+    raise RuntimeError("Benchmarked coroutine awaited something; use an event loop instead")
+
+def _calibration() -> int:
+    """Fixed pure-Python workload used to normalise timings across machines"""
+    total = 0
+    for i in range(2000):
+        total += i * i % 7
+    return total
+
+def build_benchmarks() -> List[Benchmark]:
+    """The benchmark suite; imports are deferred so --help stays fast"""
+    from models.schemas import AnalyzeResponse
+    from routes.ai_search import suggest_skills, SkillSuggestionRequest
+    from routes.analyze import _build_analyze_response
+    from services.ai_service import AIService, convert_usd_to_inr
+
+    ai_service = AIService()
+    skills, expertise = "Python, React, SQL, Docker", "Intermediate"
+    analysis = ai_service._create_enhanced_fallback_response(skills, expertise)
+    response = _build_analyze_response(analysis)
+    analysis_json = json.dumps(analysis, indent=2)
+    # What a chatty model cut off mid-answer looks like: prose, a code fence and truncated JSON
+    messy_json = "Sure! Here is the analysis:\n```json\n" + analysis_json[:int(len(analysis_json) * 0.8)].replace("}", "},", 3)
+    message = "I have been learning Python and Docker, and I worked with React and PostgreSQL during my internship"
+
+    return [
+        Benchmark(
+            "fallback_response",
+            lambda: ai_service._create_enhanced_fallback_response(skills, expertise),
+            "AIService._create_enhanced_fallback_response for a four-skill profile"
+        ),
+        Benchmark(
+            "suggest_skills",
+            lambda: _run_coroutine(suggest_skills(SkillSuggestionRequest(query="java"))),
+            "POST /ai/suggest-skills handler scanning the skill database"
+        ),
+        Benchmark(
+            "convert_usd_to_inr",
+            lambda: convert_usd_to_inr("$60,000 - $120,000"),
+            "convert_usd_to_inr on a typical salary range"
+        ),
+        Benchmark(
+            "fix_json_format",
+            lambda: ai_service._fix_json_format(messy_json),
+            "AIService._fix_json_format on a truncated career analysis wrapped in prose"
+        ),
+        Benchmark(
+            "keyword_skill_extraction",
+            lambda: ai_service._build_skill_extraction_result("", message, "Python, SQL"),
+            "Keyword fallback of extract_skills_from_message"
+        ),
+        Benchmark(
+            "analyze_response_build",
+            lambda: _build_analyze_response(analysis),
+            "Pydantic conversion of a career analysis into AnalyzeResponse"
+        ),
+        Benchmark(
+            "analyze_response_validate",
+            lambda: AnalyzeResponse.model_validate(analysis),
+            "AnalyzeResponse.model_validate on a career analysis dict"
+        ),
+        Benchmark(
+            "analyze_response_serialize",
+            lambda: response.model_dump_json(),
+            "AnalyzeResponse JSON serialization"
+        ),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def measure(func: Callable[[], Any], repeat: int = 7, min_time: float = 0.2) -> Dict[str, float]:
+    """Per-call time (best and median of `repeat` runs, in microseconds) and peak allocation (KiB)"""
+    func()  # Warm caches, lazy imports and compiled regexes
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    runs = [total / number * 1e6 for total in timer.repeat(repeat, number)]
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(runs)
+    return {
+        "best_us": round(best, 3),
+        "median_us": round(statistics.median(runs), 3),
+        "spread": round((max(runs) - best) / best, 4) if best else 0.0,
+        "loops": number,
+        "peak_kib": round(peak / 1024, 2),
+    }
+
+def run_suite(benchmarks: List[Benchmark], repeat: int = 7, min_time: float = 0.2) -> Dict[str, Any]:
+    """Measure the calibration loop and every benchmark"""
+    return {
+        "calibration_us": measure(_calibration, repeat, min_time)["best_us"],
+        "benchmarks": {benchmark.name: measure(benchmark.func, repeat, min_time) for benchmark in benchmarks},
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], normalize: bool = True) -> List[Dict[str, Any]]:
+    """
+    Check each benchmark against its baseline and budget.
+
+    A benchmark regresses when its best time, scaled by the calibration ratio when
+    normalising, exceeds baseline * time_budget, or its peak allocation exceeds
+    baseline * memory_budget.
+    """
+    scale = 1.0
+    if normalize and current.get("calibration_us") and baseline.get("calibration_us"):
+        scale = baseline["calibration_us"] / current["calibration_us"]
+
+    rows = []
+    for name, result in current["benchmarks"].items():
+        stored = baseline.get("benchmarks", {}).get(name)
+        if not stored:
+            rows.append({"name": name, "status": "new", "best_us": result["best_us"]})
+            continue
+        time_ratio = result["best_us"] * scale / stored["best_us"]
+        memory_ratio = result["peak_kib"] / stored["peak_kib"] if stored["peak_kib"] else 1.0
+        time_budget = stored.get("time_budget", DEFAULT_TIME_BUDGET)
+        memory_budget = stored.get("memory_budget", DEFAULT_MEMORY_BUDGET)
+        if time_ratio > time_budget or memory_ratio > memory_budget:
+            status = "regression"
+        elif time_ratio < 1 / time_budget:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({
+            "name": name,
+            "status": status,
+            "best_us": result["best_us"],
+            "baseline_us": stored["best_us"],
+            "time_ratio": round(time_ratio, 3),
+            "time_budget": time_budget,
+            "peak_kib": result["peak_kib"],
+            "baseline_peak_kib": stored["peak_kib"],
+            "memory_ratio": round(memory_ratio, 3),
+            "memory_budget": memory_budget,
+        })
+    return rows
+
+def make_baseline(current: Dict[str, Any], benchmarks: List[Benchmark], previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Baseline file contents; budgets already in the previous file win over the defaults"""
+    previous_benchmarks = (previous or {}).get("benchmarks", {})
+    entries = {}
+    for benchmark in benchmarks:
+        if benchmark.name not in current["benchmarks"]:
+            if benchmark.name in previous_benchmarks:
+                entries[benchmark.name] = previous_benchmarks[benchmark.name]
+            continue
+        before = previous_benchmarks.get(benchmark.name, {})
+        entries[benchmark.name] = {
+            "description": benchmark.description,
+            **current["benchmarks"][benchmark.name],
+            "time_budget": before.get("time_budget", benchmark.time_budget),
+            "memory_budget": before.get("memory_budget", benchmark.memory_budget),
+        }
+    return {
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "calibration_us": current["calibration_us"],
+        "benchmarks": entries,
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def print_results(current: Dict[str, Any]) -> None:
+    print(f"\n{'benchmark':<28}{'best us':>12}{'median us':>12}{'spread':>9}{'peak KiB':>11}")
+    for name, result in current["benchmarks"].items():
+        print(f"{name:<28}{result['best_us']:>12.2f}{result['median_us']:>12.2f}{result['spread'] * 100:>8.1f}%{result['peak_kib']:>11.1f}")
+    print(f"(calibration loop: {current['calibration_us']:.2f} us)")
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    print(f"\n{'benchmark':<28}{'time':>9}{'budget':>8}{'memory':>9}{'budget':>8}  status")
+    for row in rows:
+        if row["status"] == "new":
+            print(f"{row['name']:<28}{'':>34}  new (no baseline)")
+            continue
+        print(
+            f"{row['name']:<28}{row['time_ratio']:>8.2f}x{row['time_budget']:>7.2f}x"
+            f"{row['memory_ratio']:>8.2f}x{row['memory_budget']:>7.2f}x  {row['status'].upper() if row['status'] == 'regression' else row['status']}"
+        )
+
+def _load(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["run", "compare", "baseline"])
+    parser.add_argument("--filter", default="", help="Only benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing run")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--no-normalize", action="store_true", help="Compare raw times without calibration scaling")
+    parser.add_argument("--json", default=None, help="Also write the raw results to this file")
+    args = parser.parse_args(argv)
+
+    benchmarks = [benchmark for benchmark in build_benchmarks() if args.filter in benchmark.name]
+    current = run_suite(benchmarks, args.repeat, args.min_time)
+    print_results(current)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.command == "baseline":
+        baseline = make_baseline(current, build_benchmarks() if args.filter else benchmarks, _load(args.baseline))
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+    elif args.command == "compare":
+        baseline = _load(args.baseline)
+        if baseline is None:
+            print(f"\nNo baseline at {args.baseline}; record one with the 'baseline' command")
+            return 1
+        rows = compare(current, baseline, normalize=not args.no_normalize)
+        print_comparison(rows)
+        regressions = [row["name"] for row in rows if row["status"] == "regression"]
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) over budget: {', '.join(regressions)}")
+            return 1
+        print("\nAll benchmarks within budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
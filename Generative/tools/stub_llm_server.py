@@ -0,0 +1,366 @@
+"""
+Stand-in LLM server for load tests and local development.
+
+Speaks the wire formats AIService uses - Gemini REST (generateContent and SSE
+streamGenerateContent), Ollama /api/generate, OpenAI-compatible /v1/chat/completions
+(also under /openai for Groq) and the Hugging Face inference API - and answers with
+canned, schema-valid career analyses, mock tests, skill extractions and chat replies.
+Latency, error rate, 429s, truncated JSON and slow streaming are all configurable,
+globally or per provider, at startup or at runtime through /_stub/config.
+
+Run it:
+    python tools/stub_llm_server.py --port 9100 --latency-ms 800 --latency-distribution lognormal \\
+        --error-rate 0.02 --rate-limit-rate 0.05 --truncate-rate 0.05 --stream-chunk-delay-ms 40
+
+Point the backend at it:
+    GOOGLE_GENAI_API_KEY=stub GOOGLE_GENAI_BASE_URL=http://localhost:9100
+    GROQ_API_KEY=stub GROQ_BASE_URL=http://localhost:9100/openai
+    OPENAI_FREE_API_KEY=stub OPENAI_FREE_API_URL=http://localhost:9100
+    OLLAMA_BASE_URL=http://localhost:9100
+    HUGGINGFACE_INFERENCE_URL=http://localhost:9100 HUGGINGFACE_HUB_URL=http://localhost:9100
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sys
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.schemas import AnalyzeResponse, MockTestQuestion
+
+PROVIDERS = ("gemini", "ollama", "openai", "groq", "huggingface")
+
+
+class StubConfig(BaseModel):
+    """Behaviour of the stub for one provider (or the default for all of them)"""
+    latency_ms: float = 300
+    # fixed, uniform (latency_ms +/- spread fraction), lognormal (sigma = spread) or exponential
+    latency_distribution: str = "lognormal"
+    latency_spread: float = 0.4
+    error_rate: float = 0.0
+    error_status: int = 503
+    rate_limit_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+    truncate_rate: float = 0.0
+    stream_chunk_chars: int = 24
+    stream_chunk_delay_ms: float = 30
+
+
+# ---------------------------------------------------------------------------
+# Canned content
+# ---------------------------------------------------------------------------
+
+def _profile(prompt: str) -> Dict[str, str]:
+    """Skills and expertise named in one of AIService's prompts"""
+    skills = re.search(r"Skills:\s*(.+)", prompt) or re.search(r"skills (.+?) and expertise", prompt)
+    expertise = re.search(r"Expertise:\s*(\w+)", prompt) or re.search(r"expertise (\w+)", prompt)
+    return {
+        "skills": skills.group(1).strip() if skills else "Python",
+        "expertise": expertise.group(1).strip() if expertise else "Intermediate",
+    }
+
+def career_analysis(skills: str, expertise: str) -> Dict[str, Any]:
+    """A complete career analysis matching AnalyzeResponse"""
+    first_skill = skills.split(",")[0].strip() or "Python"
+    paths = [
+        {
+            "title": title,
+            "description": f"{title} role building on {skills} at {expertise} level",
+            "required_skills": [first_skill, *extra],
+            "salary_range": salary,
+            "growth_prospect": "High - strong hiring demand"
+        }
+        for title, extra, salary in [
+            (f"{first_skill} Developer", ["Git", "Testing"], "₹6 lakhs - ₹18 lakhs"),
+            ("Data Engineer", ["SQL", "Airflow"], "₹8 lakhs - ₹24 lakhs"),
+            ("Solutions Architect", ["Cloud", "System Design"], "₹15 lakhs - ₹40 lakhs"),
+        ]
+    ]
+    return {
+        "career_paths": paths,
+        "selected_path": paths[0],
+        "roadmap": [
+            {
+                "step": step,
+                "title": title,
+                "description": f"{title} with a focus on {first_skill}",
+                "duration": duration,
+                "resources": ["Official documentation", "Project-based course"]
+            }
+            for step, (title, duration) in enumerate([
+                ("Strengthen fundamentals", "1-2 months"),
+                ("Build portfolio projects", "2-3 months"),
+                ("Learn tooling and testing", "1-2 months"),
+                ("Contribute to open source", "2 months"),
+                ("Prepare for interviews", "1 month"),
+            ], start=1)
+        ],
+        "courses": [
+            {
+                "title": f"{first_skill} {level} Course",
+                "provider": provider,
+                "duration": "6 weeks",
+                "difficulty": level,
+                "url": f"https://example.com/{provider.lower()}/{first_skill.lower()}"
+            }
+            for provider, level in [("Coursera", "Beginner"), ("Udemy", "Intermediate"), ("edX", "Advanced")]
+        ],
+        "certifications": [
+            {
+                "name": f"{first_skill} Professional Certificate",
+                "provider": "Coursera",
+                "description": f"Validates practical {first_skill} skills",
+                "difficulty": expertise,
+                "duration": "3 months",
+                "url": "https://example.com/certification"
+            }
+        ]
+    }
+
+def mock_test(skills: str) -> Dict[str, Any]:
+    """Five mock test questions in the structured-output wire format"""
+    return {
+        "questions": [
+            {"question": f"Question {number} about {skills}?", "answer": f"Model answer {number} covering {skills}."}
+            for number in range(1, 6)
+        ]
+    }
+
+def skill_extraction(prompt: str) -> Dict[str, Any]:
+    """Skills mentioned in the quoted chat message of a skill extraction prompt"""
+    message = re.search(r'message: "(.*?)"', prompt, re.S)
+    words = re.findall(r"[A-Z][A-Za-z+#.]+", message.group(1) if message else "")
+    return {"extracted_skills": [{"skill": word, "expertise_level": "Intermediate"} for word in dict.fromkeys(words)][:5]}
+
+def completion_for(prompt: str) -> str:
+    """The canned completion AIService expects for this prompt"""
+    if "comprehensive career analysis" in prompt:
+        profile = _profile(prompt)
+        return json.dumps(career_analysis(profile["skills"], profile["expertise"]))
+    if "-question mock test" in prompt:
+        return json.dumps(mock_test(_profile(prompt)["skills"]))
+    if "Extract specific technical skills" in prompt:
+        return json.dumps(skill_extraction(prompt))
+    return (
+        "Great question! Focus on one core skill at a time, build a small project with it, "
+        "and share it publicly. Consistent practice beats cramming - you've got this!"
+    )
+
+# Fail fast if the canned content drifts from the API models
+AnalyzeResponse.model_validate(career_analysis("Python", "Intermediate"))
+[MockTestQuestion.model_validate(question) for question in mock_test("Python")["questions"]]
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class StubLLMServer:
+    """Fault-injecting LLM stand-in; `app` is the ASGI application"""
+
+    def __init__(self, config: Optional[StubConfig] = None, seed: Optional[int] = None):
+        self.default = config or StubConfig()
+        self.overrides: Dict[str, Dict[str, Any]] = {}
+        self.random = random.Random(seed)
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.app = self._build_app()
+
+    def config_for(self, provider: str) -> StubConfig:
+        return self.default.model_copy(update=self.overrides.get(provider, {}))
+
+    def _count(self, provider: str, outcome: str) -> None:
+        counts = self.stats.setdefault(provider, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    def _latency(self, config: StubConfig) -> float:
+        base = max(0.0, config.latency_ms / 1000)
+        if base == 0 or config.latency_distribution == "fixed":
+            return base
+        if config.latency_distribution == "uniform":
+            return max(0.0, self.random.uniform(base * (1 - config.latency_spread), base * (1 + config.latency_spread)))
+        if config.latency_distribution == "exponential":
+            return self.random.expovariate(1 / base)
+        return self.random.lognormvariate(math.log(base), config.latency_spread)
+
+    def _fault(self, provider: str, config: StubConfig) -> Optional[JSONResponse]:
+        """An injected 429 or error response, or None to answer normally"""
+        roll = self.random.random()
+        if roll < config.rate_limit_rate:
+            self._count(provider, "rate_limited")
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"code": 429, "message": "stub rate limit", "status": "RESOURCE_EXHAUSTED"}},
+                headers={"Retry-After": f"{config.retry_after_seconds:g}"}
+            )
+        if roll < config.rate_limit_rate + config.error_rate:
+            self._count(provider, "error")
+            return JSONResponse(
+                status_code=config.error_status,
+                content={"error": {"code": config.error_status, "message": "stub injected failure", "status": "UNAVAILABLE"}}
+            )
+        return None
+
+    def _text(self, provider: str, prompt: str, config: StubConfig) -> str:
+        text = completion_for(prompt)
+        if text.startswith("{") and self.random.random() < config.truncate_rate:
+            self._count(provider, "truncated")
+            return text[:int(len(text) * self.random.uniform(0.3, 0.9))]
+        self._count(provider, "ok")
+        return text
+
+    async def _respond(self, provider: str, prompt: str, render, stream_render=None, media_type: str = "text/event-stream"):
+        """Wait out the latency, inject faults, then answer whole or as a slow stream"""
+        config = self.config_for(provider)
+        await asyncio.sleep(self._latency(config))
+        fault = self._fault(provider, config)
+        if fault is not None:
+            return fault
+        text = self._text(provider, prompt, config)
+        if stream_render is None:
+            return JSONResponse(render(text))
+        return StreamingResponse(stream_render(self._chunks(text, config)), media_type=media_type)
+
+    async def _chunks(self, text: str, config: StubConfig) -> AsyncIterator[str]:
+        size = max(1, config.stream_chunk_chars)
+        for start in range(0, len(text), size):
+            if start:
+                await asyncio.sleep(config.stream_chunk_delay_ms / 1000)
+            yield text[start:start + size]
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Stub LLM server")
+
+        # Gemini REST
+        @app.get("/v1beta/models")
+        async def gemini_models():
+            return {"models": [{"name": "models/gemini-1.5-flash-latest"}]}
+
+        @app.post("/v1beta/models/{model_action}")
+        async def gemini_generate(model_action: str, request: Request):
+            body = await request.json()
+            prompt = "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+
+            def render(text):
+                return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}]}
+
+            async def stream(chunks):
+                async for chunk in chunks:
+                    yield f"data: {json.dumps(render(chunk))}\r\n\r\n"
+
+            streaming = model_action.endswith(":streamGenerateContent")
+            return await self._respond("gemini", prompt, render, stream if streaming else None)
+
+        # Ollama
+        @app.get("/api/tags")
+        async def ollama_tags():
+            return {"models": [{"name": "llama2:latest"}]}
+
+        @app.post("/api/generate")
+        async def ollama_generate(request: Request):
+            body = await request.json()
+
+            def render(text):
+                return {"model": body.get("model", "llama2"), "response": text, "done": True}
+
+            async def stream(chunks):
+                async for chunk in chunks:
+                    yield json.dumps({"model": body.get("model", "llama2"), "response": chunk, "done": False}) + "\n"
+                yield json.dumps(render("")) + "\n"
+
+            streaming = body.get("stream", True)
+            return await self._respond("ollama", body.get("prompt", ""), render, stream if streaming else None, "application/x-ndjson")
+
+        # OpenAI-compatible (Groq is served under /openai)
+        async def chat_completions(provider: str, request: Request):
+            body = await request.json()
+            prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+
+            def render(text):
+                return {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "model": body.get("model", "stub"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}]
+                }
+
+            async def stream(chunks):
+                async for chunk in chunks:
+                    yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': {'content': chunk}}]})}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return await self._respond(provider, prompt, render, stream if body.get("stream") else None)
+
+        @app.get("/v1/models")
+        @app.get("/openai/v1/models")
+        async def openai_models():
+            return {"object": "list", "data": [{"id": "stub-model", "object": "model"}]}
+
+        @app.post("/v1/chat/completions")
+        async def openai_chat(request: Request):
+            return await chat_completions("openai", request)
+
+        @app.post("/openai/v1/chat/completions")
+        async def groq_chat(request: Request):
+            return await chat_completions("groq", request)
+
+        # Hugging Face inference
+        @app.get("/api/whoami-v2")
+        async def huggingface_whoami():
+            return {"name": "stub", "type": "user"}
+
+        @app.post("/models/{model:path}")
+        async def huggingface_generate(model: str, request: Request):
+            body = await request.json()
+            return await self._respond("huggingface", body.get("inputs", ""), lambda text: [{"generated_text": text}])
+
+        # Control endpoints
+        @app.get("/_stub/config")
+        async def get_config():
+            return {"default": self.default.model_dump(), "overrides": self.overrides}
+
+        @app.post("/_stub/config")
+        async def set_config(update: Dict[str, Any], provider: Optional[str] = None):
+            """Change behaviour at runtime, for every provider or just ?provider=gemini"""
+            known = {key: value for key, value in update.items() if key in StubConfig.model_fields}
+            if provider:
+                self.overrides.setdefault(provider, {}).update(known)
+            else:
+                self.default = self.default.model_copy(update=known)
+            return await get_config()
+
+        @app.get("/_stub/stats")
+        async def get_stats():
+            return self.stats
+
+        @app.post("/_stub/reset")
+        async def reset():
+            self.stats = {}
+            self.overrides = {}
+            return {"status": "reset"}
+
+        return app
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible latency and faults")
+    for name, field in StubConfig.model_fields.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(field.default), default=field.default)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    import uvicorn
+    args = _parse_args()
+    config = StubConfig(**{name: getattr(args, name) for name in StubConfig.model_fields})
+    uvicorn.run(StubLLMServer(config, seed=args.seed).app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,192 @@
+"""
+Stand-in OTLP/HTTP trace collector and a report of the slowest traces.
+
+The backend exports each request's spans as OTLP/JSON (services/tracing.py), either
+appended to TRACING_EXPORT_PATH or POSTed to TRACING_EXPORT_ENDPOINT. `serve` accepts
+those POSTs on /v1/traces like an OpenTelemetry collector would and appends them to a
+file; `report` reads either file and prints the slowest requests as span trees with
+their critical path marked, plus how many provider attempts and calls each route fans
+out to.
+
+    TRACING_ENABLED=true TRACING_EXPORT_ENDPOINT=http://localhost:4318/v1/traces uvicorn main:app
+    python tools/trace_collector.py serve --port 4318 --output traces/collector.jsonl
+    python tools/trace_collector.py report traces/collector.jsonl --slowest 5
+    python tools/trace_collector.py report traces/traces.jsonl --route "POST /analyze"
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+from typing import Any, Dict, List, Optional
+
+# Spans counted in the fan-out summary
+FAN_OUT_SPANS = ("ai.provider_attempt", "ai.provider_call", "ai.provider_stream", "ai.static_fallback")
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    """Every span in an OTLP/JSON lines file"""
+    spans = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    spans.extend(scope.get("spans", []))
+    return spans
+
+def group_traces(spans: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    for span in spans:
+        traces.setdefault(span["traceId"], []).append(span)
+    return traces
+
+def duration_ms(span: Dict[str, Any]) -> float:
+    return (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+
+def attributes(span: Dict[str, Any]) -> Dict[str, Any]:
+    return {item["key"]: next(iter(item["value"].values()), None) for item in span.get("attributes", [])}
+
+def find_root(spans: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The span whose parent isn't in the trace (the server span of the request)"""
+    ids = {span["spanId"] for span in spans}
+    roots = [span for span in spans if span.get("parentSpanId") not in ids]
+    return min(roots, key=lambda span: int(span["startTimeUnixNano"])) if roots else None
+
+def _children(spans: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    children: Dict[str, List[Dict[str, Any]]] = {}
+    for span in spans:
+        if span.get("parentSpanId"):
+            children.setdefault(span["parentSpanId"], []).append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda span: int(span["startTimeUnixNano"]))
+    return children
+
+def critical_path(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    From the root, repeatedly follow the child that finished last - the one its parent
+    was still waiting on - so the path ends at the work that held the response up.
+    """
+    root = find_root(spans)
+    if root is None:
+        return []
+    children = _children(spans)
+    path = [root]
+    while children.get(path[-1]["spanId"]):
+        path.append(max(children[path[-1]["spanId"]], key=lambda span: int(span["endTimeUnixNano"])))
+    return path
+
+def fan_out(spans: List[Dict[str, Any]]) -> Dict[str, int]:
+    """How many of each provider-level span the trace contains"""
+    counts = {name: 0 for name in FAN_OUT_SPANS}
+    for span in spans:
+        if span["name"] in counts:
+            counts[span["name"]] += 1
+    return counts
+
+def _describe(span: Dict[str, Any]) -> str:
+    details = attributes(span)
+    shown = [f"{key}={details[key]}" for key in ("ai.provider", "ai.outcome", "ai.kind", "http.status_code", "auth.result") if key in details]
+    if details.get("cancelled"):
+        shown.append("cancelled")
+    if span.get("status", {}).get("code") == 2:
+        shown.append(f"error={span['status'].get('message', '')}")
+    return f"{span['name']} {duration_ms(span):.1f}ms" + (f" [{', '.join(shown)}]" if shown else "")
+
+def format_trace(spans: List[Dict[str, Any]]) -> List[str]:
+    """The trace as an indented span tree; spans on the critical path are starred"""
+    root = find_root(spans)
+    if root is None:
+        return []
+    on_path = {span["spanId"] for span in critical_path(spans)}
+    children = _children(spans)
+    lines = []
+
+    def walk(span: Dict[str, Any], depth: int) -> None:
+        marker = "*" if span["spanId"] in on_path else " "
+        lines.append(f"{marker} {'  ' * depth}{_describe(span)}")
+        for child in children.get(span["spanId"], []):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return lines
+
+def report(spans: List[Dict[str, Any]], slowest: int = 5, route: Optional[str] = None) -> List[str]:
+    """Fan-out per route and the slowest traces as span trees"""
+    traces = [trace for trace in group_traces(spans).values() if find_root(trace) is not None]
+    if route:
+        traces = [trace for trace in traces if find_root(trace)["name"] == route]
+    if not traces:
+        return ["No traces found."]
+
+    lines = ["Fan-out per request (mean):"]
+    by_route: Dict[str, List[List[Dict[str, Any]]]] = {}
+    for trace in traces:
+        by_route.setdefault(find_root(trace)["name"], []).append(trace)
+    for name, route_traces in sorted(by_route.items()):
+        counts = [fan_out(trace) for trace in route_traces]
+        latencies = [duration_ms(find_root(trace)) for trace in route_traces]
+        means = ", ".join(f"{span_name}={statistics.mean(count[span_name] for count in counts):.2f}" for span_name in FAN_OUT_SPANS)
+        lines.append(f"  {name}: {len(route_traces)} requests, median {statistics.median(latencies):.1f}ms, {means}")
+
+    traces.sort(key=lambda trace: duration_ms(find_root(trace)), reverse=True)
+    for trace in traces[:slowest]:
+        root = find_root(trace)
+        lines.append("")
+        lines.append(f"Trace {root['traceId']} (request {attributes(root).get('request.id', '?')}):")
+        lines.extend(format_trace(trace))
+    return lines
+
+
+def create_app(output: str):
+    """FastAPI app accepting OTLP/JSON on /v1/traces and appending each export to `output`"""
+    from fastapi import FastAPI, HTTPException, Request
+
+    app = FastAPI(title="Trace collector stand-in")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    @app.post("/v1/traces")
+    async def export_traces(request: Request):
+        try:
+            payload = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Expected an OTLP/JSON ExportTraceServiceRequest")
+        with open(output, "a", encoding="utf-8") as file:
+            file.write(json.dumps(payload, separators=(",", ":")) + "\n")
+        return {"partialSuccess": {}}
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="accept OTLP/HTTP JSON exports and append them to a file")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=4318)
+    serve.add_argument("--output", default=os.path.join("traces", "collector.jsonl"))
+
+    show = commands.add_parser("report", help="print the slowest traces with their critical path")
+    show.add_argument("path", nargs="?", default=os.path.join("traces", "traces.jsonl"))
+    show.add_argument("--slowest", type=int, default=5)
+    show.add_argument("--route", help='only traces of this root span, e.g. "POST /analyze"')
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        import uvicorn
+        uvicorn.run(create_app(args.output), host=args.host, port=args.port)
+        return 0
+
+    if not os.path.exists(args.path):
+        print(f"No trace file at {args.path}", file=sys.stderr)
+        return 1
+    print("\n".join(report(load_spans(args.path), args.slowest, args.route)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())